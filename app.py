@@ -2,7 +2,6 @@ import streamlit as st
 import json
 import os
 import sys
-import pandas as pd
 
 # PRIMEIRO: Configurar página (deve ser a primeira linha Streamlit)
 st.set_page_config(
@@ -22,6 +21,9 @@ if parent_dir not in sys.path:
 if exemplos_dir not in sys.path:
     sys.path.insert(0, exemplos_dir)
 
+# Formatação das tabelas (pandas só é importado ao formatar)
+from formatacao import formatar_tabela_brasileirao, formatar_tabela_acoes
+
 # Configurar a API key usando st.secrets (para Streamlit Cloud)
 def carregar_api_key():
     """Carrega a API key usando st.secrets ou arquivo .env local"""
@@ -75,6 +77,16 @@ if api_key:
 else:
     api_key_configurada = False
 
+# Tempo (em segundos) que o resultado de cada tipo de scraping fica em cache
+TTL_CACHE = {
+    'classificacao': int(os.environ.get('CACHE_TTL_CLASSIFICACAO', 10 * 60)),
+    'acoes': int(os.environ.get('CACHE_TTL_ACOES', 5 * 60)),
+    'agente': int(os.environ.get('CACHE_TTL_AGENTE', 30 * 60)),
+}
+# Prazo (em segundos) de cada execução: passado dele, a tela recebe o que já
+# ficou pronto e o relatório diz qual etapa degradou
+APP_SLA = float(os.environ.get('APP_SLA_SEGUNDOS', 60))
+
 st.title("⚽ Web Scraping com IA usando LangChain")
 
 opcao = st.selectbox(
@@ -82,114 +94,84 @@ opcao = st.selectbox(
     ("Tabela do Brasileirão", "Ações (Big Caps)", "Agente inteligente")
 )
 
-def formatar_tabela_brasileirao(resultado):
-    """Formatar dados do Brasileirão PRESERVANDO a ordem original"""
-    if not resultado:
-        return None
-    
-    # Filtrar apenas dados válidos de times
-    dados_validos = []
-    for item in resultado:
-        if isinstance(item, dict) and item.get('time') and item.get('time') != 'nan' and item.get('time').strip():
-            dados_validos.append(item)
-    
-    if not dados_validos:
-        return None
-    
-    # Converter para DataFrame SEM alterar a ordem
-    df = pd.DataFrame(dados_validos)
-    
-    # Garantir que as colunas existam e tenham valores padrão
-    colunas_esperadas = {
-        'posicao': 0,
-        'time': 'N/A',
-        'jogos': 0,
-        'vitorias': 0,
-        'empates': 0,
-        'derrotas': 0,
-        'gols_pro': 0,
-        'gols_contra': 0,
-        'saldo_gols': 0,
-        'pontos': 0
-    }
-    
-    for col, default_value in colunas_esperadas.items():
-        if col not in df.columns:
-            df[col] = default_value
-        else:
-            # Limpar valores nan e inválidos
-            df[col] = df[col].fillna(default_value)
-            if col != 'time':
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-    
-    # Reordenar colunas
-    df = df[list(colunas_esperadas.keys())]
-    
-    # Remover linhas com time inválido
-    df = df[df['time'].str.len() > 2]
-    df = df[df['time'] != 'N/A']
-    
-    # PRESERVAR A ORDEM ORIGINAL - apenas resetar o índice
-    df = df.reset_index(drop=True)
-    
-    # Renomear colunas para exibição
-    df.columns = ['Pos', 'Time', 'J', 'V', 'E', 'D', 'GP', 'GC', 'SG', 'Pts']
-    
-    return df
+# Resultados em cache compartilhado entre sessões e reruns (st.cache_data).
+# As URLs são tuplas para que o Streamlit consiga gerar a chave do cache.
+# Os módulos de scraping são importados pelo registro só na primeira execução.
+# Cada função devolve (resultado, relatório da execução dentro do APP_SLA).
+@st.cache_data(ttl=TTL_CACHE['classificacao'], show_spinner=False)
+def scrape_brasileirao(urls):
+    # Classificação e artilharia da mesma execução: {'classificacao': [...], 'artilharia': [...]}
+    import registro
+    return registro.executar_com_relatorio('brasileirao', prazo=APP_SLA, urls=list(urls))
 
-def formatar_tabela_acoes(resultado):
-    """Formatar dados de ações"""
-    if not resultado:
-        return None
-    
-    # Filtrar apenas dados válidos
-    dados_validos = []
-    for item in resultado:
-        if isinstance(item, dict) and (item.get('simbolo_empresa') or item.get('nome_empresa')):
-            dados_validos.append(item)
-    
-    if not dados_validos:
-        return None
-    
-    df = pd.DataFrame(dados_validos)
-    
-    # Renomear colunas para exibição
-    column_mapping = {
-        'simbolo_empresa': 'Símbolo',
-        'nome_empresa': 'Empresa',
-        'setor_empresa': 'Setor',
-        'valor_mercado': 'Valor de Mercado',
-        'div_yield': 'Div. Yield',
-        'preco': 'Preço',
-        'variacao': 'Variação',
-        'volume': 'Volume',
-        'classificacao_analistas': 'Classificação'
-    }
-    
-    # Renomear apenas as colunas que existem
-    df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
-    
-    return df
+@st.cache_data(ttl=TTL_CACHE['acoes'], show_spinner=False)
+def scrape_acoes(urls):
+    import registro
+    return registro.executar_com_relatorio('acoes', prazo=APP_SLA, urls=list(urls))
+
+@st.cache_data(ttl=TTL_CACHE['acoes'], show_spinner=False)
+def scrape_mercado(urls):
+    import registro
+    return registro.executar_com_relatorio('mercado', prazo=APP_SLA, urls=list(urls))
+
+@st.cache_data(ttl=TTL_CACHE['agente'], show_spinner=False)
+def responder_pergunta(pergunta):
+    # Pela classificação já extraída quando possível; o agente só para o que ela não responde
+    import registro
+    return registro.executar_com_relatorio('consulta', prazo=APP_SLA, pergunta=pergunta)
+
+def executar_no_sla(funcao, *argumentos):
+    """(resultado, relatório) de uma função em cache; um resultado degradado não fica no cache"""
+    resultado, relatorio = funcao(*argumentos)
+    if relatorio['degradada']:
+        funcao.clear(*argumentos)
+    return resultado, relatorio
+
+MOTIVOS_DEGRADACAO = {
+    'prazo': 'prazo esgotado',
+    'disjuntor': 'disjuntor aberto (serviço falhando)',
+    'erro': 'erro',
+    'ultimo_valido': 'último resultado válido no lugar do extraído',
+    'incompleto': 'extração incompleta',
+}
+
+def servir_ultimo_valido(tipo, urls):
+    """Último resultado válido de `tipo` na hora (ou None); passado o TTL, é revalidado em segundo plano"""
+    import registro
+    from ultimo_valido import servir
+    return servir(tipo, list(urls), lambda: registro.executar(tipo, urls=list(urls)),
+                  max_idade=TTL_CACHE['classificacao' if tipo == 'classificacao' else 'acoes'])
+
+def mostrar_idade(instantaneo, tipo, urls):
+    """De quando é o resultado mostrado e se já há uma versão nova a caminho"""
+    from datetime import datetime
+    from ultimo_valido import descrever_idade, revalidando
+    quando = datetime.fromtimestamp(instantaneo.gravado_em).strftime('%d/%m %H:%M')
+    texto = f"🕒 Último resultado válido, extraído {descrever_idade(instantaneo.idade)} ({quando})"
+    if revalidando(tipo, list(urls)):
+        texto += ". 🔄 Atualizando em segundo plano: execute de novo em instantes para ver a versão nova."
+    st.info(texto)
+
+def mostrar_relatorio(relatorio):
+    """Tempo da execução e, se degradou, quais etapas e por quê"""
+    if not relatorio:
+        return
+    sla = f" (SLA {relatorio['prazo_s']:.0f}s)" if relatorio.get('prazo_s') else ""
+    linhas = [f"- **{d['etapa']}**: {MOTIVOS_DEGRADACAO.get(d['motivo'], d['motivo'])}"
+              + (f" — {d['detalhe']}" if d['detalhe'] else "") for d in relatorio['degradacoes']]
+    if not relatorio['degradada']:
+        st.caption(f"⏱️ Concluído em {relatorio['duracao_s']:.1f}s{sla}")
+        if linhas:
+            # Só uma seção (ex.: artilharia) degradou; o resultado principal está completo
+            st.info("ℹ️ Parte do resultado degradou:\n" + "\n".join(linhas))
+        return
+    st.warning(f"⚠️ Resultado degradado em {relatorio['duracao_s']:.1f}s{sla}:\n" + "\n".join(linhas))
 
-def formatar_artilharia(resultado):
-    """Formatar dados de artilharia usando extração específica"""
+def formatar_artilharia(dados_artilharia):
+    """Formatar os dados de artilharia extraídos junto com a classificação"""
     try:
-        # Importar o módulo de artilharia
-        artilharia_path = os.path.join(parent_dir, 'artilharia.py')
-        
-        # Se o arquivo não existir, retornar None
-        if not os.path.exists(artilharia_path):
-            return None
-        
-        # Importar e usar a função de artilharia
-        import sys
-        sys.path.append(parent_dir)
-        import artilharia
-        
-        urls = ['https://ge.globo.com/futebol/brasileirao-serie-a/']
-        dados_artilharia = artilharia.scrape_artilharia(urls)
-        
         if dados_artilharia and len(dados_artilharia) > 0:
+            import pandas as pd
             df = pd.DataFrame(dados_artilharia)
             # Renomear colunas para melhor exibição
             if 'jogador' in df.columns:
@@ -202,12 +184,240 @@ def formatar_artilharia(resultado):
                 })
             return df
     except Exception as e:
-        print(f"Erro ao carregar artilharia: {e}")
+        from instrumentacao import obter_logger
+        obter_logger('app').error(f"❌ Erro ao carregar artilharia: {e}")
     
     return None
 
+# Formatos das colunas numéricas da tabela de ações (porcentagens em pontos percentuais)
+FORMATOS_ACOES = {
+    'Preço': st.column_config.NumberColumn(format="%.2f"),
+    'Variação': st.column_config.NumberColumn(format="%+.2f%%"),
+    'Volume': st.column_config.NumberColumn(format="compact"),
+    'Valor de Mercado': st.column_config.NumberColumn(format="compact"),
+    'Div. Yield': st.column_config.NumberColumn(format="%.2f%%"),
+}
+
+def _compacto(valor):
+    """1.23e12 -> '1,23 T' (mesma escala que o TradingView mostra)"""
+    for limite, sufixo in ((1e12, 'T'), (1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if abs(valor) >= limite:
+            return f"{valor / limite:.2f} {sufixo}".replace('.', ',')
+    return f"{valor:.2f}".replace('.', ',')
+
+def mostrar_estatisticas_acoes(df_acoes):
+    """Métricas calculadas das colunas numéricas (valor de mercado, variação, altas/baixas)"""
+    from normalizacao import estatisticas_acoes
+    st.subheader("📊 Estatísticas")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Total de Empresas", len(df_acoes))
+    if 'Setor' in df_acoes.columns:
+        col2.metric("Setores Diferentes", df_acoes['Setor'].nunique())
+    if 'Valor de Mercado' in df_acoes.columns and df_acoes['Valor de Mercado'].notna().any():
+        col3.metric("Valor de Mercado Total", _compacto(df_acoes['Valor de Mercado'].sum()))
+    if 'Variação' in df_acoes.columns and df_acoes['Variação'].notna().any():
+        variacao = df_acoes['Variação']
+        col4.metric("Variação Mediana", f"{variacao.median():+.2f}%".replace('.', ','))
+        col5.metric("Altas / Baixas", f"{int((variacao > 0).sum())} / {int((variacao < 0).sum())}")
+    estatisticas = estatisticas_acoes(df_acoes)
+    if estatisticas is not None:
+        with st.expander("🔢 Estatísticas por coluna"):
+            st.dataframe(estatisticas.rename(columns={
+                'count': 'Valores', 'min': 'Mínimo', 'median': 'Mediana',
+                'mean': 'Média', 'max': 'Máximo', 'sum': 'Soma',
+            }), width="stretch")
+
+def mostrar_diferencas(tipo, urls):
+    """Mudanças (posição, pontos, preço...) em relação à execução anterior dessas URLs"""
+    from diferencas import ultimas_diferencas, descrever
+    from http_fetch import obter_cliente
+    diferencas = ultimas_diferencas(obter_cliente().armazem, tipo, urls)
+    with st.expander(f"🔀 Mudanças desde a última execução ({len(diferencas)})"):
+        if diferencas:
+            for diferenca in diferencas:
+                st.write(f"- {descrever(diferenca)}")
+        else:
+            st.write("Nenhuma mudança em relação à execução anterior.")
+
+@st.cache_data(ttl=60, show_spinner=False)
+def carregar_serie(tipo, chave, dias):
+    # Lê só as partições/colunas/linhas do período no histórico Parquet (sem novo scraping)
+    import historico
+    if tipo == 'classificacao':
+        return historico.serie_time(chave, dias)
+    return historico.serie_acao(chave, dias)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def opcoes_historico(tipo, coluna, dias):
+    import historico
+    return historico.valores_distintos(tipo, coluna, dias)
+
+def mostrar_historico(tipo):
+    """Gráficos do histórico: posição/pontos de um time por rodada ou preço/volume de uma ação por dia"""
+    coluna = 'time' if tipo == 'classificacao' else 'simbolo_empresa'
+    periodos = {"1 mês": 31, "3 meses": 92, "6 meses": 183, "1 ano": 366, "Tudo": None}
+    with st.expander("📈 Histórico", expanded=False):
+        col_escolha, col_periodo = st.columns([2, 1])
+        periodo = col_periodo.selectbox("Período", list(periodos), index=2, key=f'periodo_{tipo}')
+        dias = periodos[periodo]
+        opcoes = opcoes_historico(tipo, coluna, dias)
+        if not opcoes:
+            st.info("ℹ️ Ainda não há histórico: cada execução completa é guardada para os gráficos.")
+            return
+        rotulo = "Time" if tipo == 'classificacao' else "Ação"
+        escolha = col_escolha.selectbox(rotulo, opcoes, key=f'historico_{tipo}')
+        serie = carregar_serie(tipo, escolha, dias)
+        if not serie:
+            st.info(f"ℹ️ Sem coletas de {escolha} no período.")
+            return
+        import pandas as pd
+        import altair as alt
+        df = pd.DataFrame(serie)
+        if tipo == 'classificacao':
+            posicao = alt.Chart(df).mark_line(point=True).encode(
+                x=alt.X('jogos:Q', title='Rodada'),
+                y=alt.Y('posicao:Q', title='Posição', scale=alt.Scale(reverse=True, domain=[1, 20])),
+                tooltip=['jogos', 'posicao', 'pontos', 'saldo_gols'],
+            )
+            pontos = alt.Chart(df).mark_line(point=True, color='#2e7d32').encode(
+                x=alt.X('jogos:Q', title='Rodada'), y=alt.Y('pontos:Q', title='Pontos'),
+                tooltip=['jogos', 'pontos'],
+            )
+            col1, col2 = st.columns(2)
+            col1.altair_chart(posicao.properties(title=f"{escolha}: posição"), width="stretch")
+            col2.altair_chart(pontos.properties(title=f"{escolha}: pontos"), width="stretch")
+        else:
+            df['dia'] = pd.to_datetime(df['dia'])
+            preco = alt.Chart(df).mark_line(point=True).encode(
+                x=alt.X('dia:T', title='Dia'), y=alt.Y('preco:Q', title='Preço', scale=alt.Scale(zero=False)),
+                tooltip=['dia', 'preco', 'variacao'],
+            )
+            volume = alt.Chart(df).mark_bar(color='#90a4ae').encode(
+                x=alt.X('dia:T', title='Dia'), y=alt.Y('volume:Q', title='Volume'), tooltip=['dia', 'volume'],
+            )
+            col1, col2 = st.columns(2)
+            col1.altair_chart(preco.properties(title=f"{escolha}: preço"), width="stretch")
+            col2.altair_chart(volume.properties(title=f"{escolha}: volume"), width="stretch")
+        st.caption(f"{len(df)} ponto(s) no período")
+
+def mostrar_progresso(area, pipeline, total_entradas):
+    """Uma barra por etapa do pipeline: itens concluídos / itens recebidos até agora"""
+    with area.container():
+        total = total_entradas
+        anterior_concluida = True
+        for etapa in pipeline.estatisticas():
+            feitos = etapa['entradas'] - etapa['em_andamento']
+            fracao = 1.0 if etapa['concluida'] else (feitos / total if total else 0.0)
+            de = f"{total}" if anterior_concluida else f"{total}…"
+            status = "✅" if etapa['concluida'] else ("⏳" if etapa['em_andamento'] else "•")
+            erros = f" · {etapa['erros']} erro(s)" if etapa['erros'] else ""
+            st.progress(min(1.0, fracao), text=f"{status} {etapa['etapa']}: {feitos}/{de}{erros}")
+            total = etapa['saidas']
+            anterior_concluida = etapa['concluida']
+
+# Trecho.origem → rótulo no painel de instrumentação
+CAMINHOS = {
+    'tabela': 'tabela HTML',
+    'llm': 'LLM',
+    'secao': 'seções (LLM)',
+    'armazem': 'armazém (304)',
+    'impressao': 'sem mudança',
+}
+
+def mostrar_instrumentacao():
+    """Resumo dos contadores do processo: HTTP, LLM (tokens/custo), cache, fallbacks, disjuntores e tempo por etapa"""
+    import instrumentacao
+    resumo = instrumentacao.resumo()
+    contadores = resumo['contadores']
+    st.subheader("📈 Instrumentação")
+    col1, col2 = st.columns(2)
+    col1.metric("HTTP", f"{contadores.get('http_bytes', 0) / 1024:.0f} KB",
+                help=f"{contadores.get('http_requisicoes', 0)} requisições, {contadores.get('http_304', 0)} não modificadas (304)")
+    col2.metric("Chamadas ao LLM", contadores.get('llm_chamadas', 0))
+    col1.metric("Tokens", f"{contadores.get('tokens_prompt', 0)} + {contadores.get('tokens_resposta', 0)}",
+                help="prompt + resposta")
+    col2.metric("Custo estimado", f"US$ {contadores['custo_estimado_usd']:.4f}")
+    if resumo['taxa_acerto_cache_llm'] is not None:
+        st.caption(f"🗄️ Cache do LLM: {resumo['taxa_acerto_cache_llm']:.0%} de acertos")
+    # Linhas entregues pelos pipelines, pelo Trecho.origem de cada uma
+    caminhos = {CAMINHOS.get(nome.removeprefix('caminho_'), nome.removeprefix('caminho_')): valor
+                for nome, valor in contadores.items() if nome.startswith('caminho_')}
+    if caminhos:
+        st.caption("🧭 Linhas por caminho: " + ", ".join(f"{nome} ×{valor}" for nome, valor in sorted(caminhos.items())))
+    fallbacks = {nome.removeprefix('fallback_'): valor for nome, valor in contadores.items() if nome.startswith('fallback_')}
+    if fallbacks:
+        st.caption("🔄 Fallbacks: " + ", ".join(f"{nome} ×{valor}" for nome, valor in sorted(fallbacks.items())))
+    from resiliencia import estado_disjuntores
+    abertos = [nome for nome, estado in estado_disjuntores().items() if estado != 'fechado']
+    if abertos:
+        st.caption("🔌 Disjuntores abertos: " + ", ".join(abertos))
+    etapas = [{'etapa': nome.removeprefix('etapa.'), **tempos} for nome, tempos in resumo['tempos'].items() if nome.startswith('etapa.')]
+    if etapas:
+        st.dataframe(etapas, hide_index=True, width="stretch",
+                     column_order=['etapa', 'quantidade', 'total_s', 'max_ms'])
+    col1, col2 = st.columns(2)
+    col1.download_button("⬇️ JSONL", instrumentacao.exportar_jsonl(), file_name="instrumentacao.jsonl",
+                         mime="application/jsonl", width="stretch")
+    if col2.button("🧹 Zerar", width="stretch"):
+        instrumentacao.zerar()
+        st.rerun()
+
+def executar_incremental(tipo, urls, formatar, altura=600):
+    """Roda o pipeline de `tipo` mostrando as linhas conforme cada trecho fica pronto.
+
+    Retorna (resultado final, relatório da execução); o resultado é o mesmo
+    do modo normal, ou None se cancelado. Passado o APP_SLA, o resultado é
+    montado com os trechos que já ficaram prontos.
+    """
+    import registro
+    from resiliencia import nova_execucao
+    pipeline, finalizar = registro.montar(tipo, urls)
+    st.session_state['pipeline_ativo'] = pipeline
+    progresso = st.empty()
+    parcial = st.empty()
+    trechos = []
+    with nova_execucao(APP_SLA, nome=tipo) as execucao:
+        # Sem try/finally: o clique em Cancelar interrompe este rerun, e é o
+        # rerun seguinte que precisa encontrar o pipeline na sessão para pará-lo
+        for trecho in pipeline.executar(list(urls), intervalo=0.3):
+            if trecho is not None:
+                trechos.append(trecho)
+                df = formatar(finalizar(trechos, parcial=True))
+                if df is not None and not df.empty:
+                    parcial.dataframe(df, height=altura)
+            mostrar_progresso(progresso, pipeline, len(urls))
+        cancelado = pipeline.cancelado and not execucao.esgotado
+        if st.session_state.get('pipeline_ativo') is pipeline:
+            st.session_state.pop('pipeline_ativo')
+        if cancelado:
+            return None, execucao.relatorio()
+        progresso.empty()
+        parcial.empty()
+        resultado = finalizar(trechos, urls=list(urls))
+    return resultado, execucao.relatorio()
+
 # REMOVIDO o parâmetro type="primary" para compatibilidade
-executar = st.button("🚀 Executar")
+col_executar, col_cancelar = st.columns([1, 1])
+with col_executar:
+    executar = st.button("🚀 Executar")
+with col_cancelar:
+    # Clicar gera um novo rerun, que interrompe a execução em andamento
+    cancelar = st.button("⏹️ Cancelar")
+forcar_atualizacao = st.checkbox("🔄 Forçar atualização (ignorar cache)", value=False)
+if opcao == "Agente inteligente":
+    from consultas import PERGUNTA_PADRAO
+    pergunta = st.text_input("❓ Pergunta sobre o Brasileirão", value=PERGUNTA_PADRAO).strip() or PERGUNTA_PADRAO
+mercado_completo = opcao == "Ações (Big Caps)" and st.checkbox(
+    "🌐 Mercado completo (todas as listas da B3)", value=False,
+    help="Rastreia várias listas do TradingView no navegador, carregando todas as páginas")
+modo_incremental = st.checkbox("⚡ Mostrar linhas conforme forem extraídas", value=True,
+                               disabled=opcao == "Agente inteligente")
+
+if cancelar:
+    pipeline_ativo = st.session_state.pop('pipeline_ativo', None)
+    if pipeline_ativo is not None:
+        pipeline_ativo.cancelar()
+    st.warning("⏹️ Extração cancelada")
 
 if executar:
     if not api_key_configurada:
@@ -218,135 +428,163 @@ if executar:
     else:
         try:
             if opcao == "Tabela do Brasileirão":
-                with st.spinner("Fazendo scraping da tabela do Brasileirão..."):
-                    # Fazer scraping
-                    import exemplo1_brasileirao
-                    urls = ['https://ge.globo.com/futebol/brasileirao-serie-a/']
-                    resultado = exemplo1_brasileirao.scrape_with_playwright(urls=urls, schema=exemplo1_brasileirao.schema)
+                if forcar_atualizacao:
+                    scrape_brasileirao.clear()
+                
+                # Último resultado válido na hora (revalidado em segundo plano); sem ele, scraping.
+                # A artilharia sai da mesma execução (mesma busca e leitura da página) que a classificação.
+                urls = ('https://ge.globo.com/futebol/brasileirao-serie-a/',)
+                instantaneo = None if forcar_atualizacao else servir_ultimo_valido('classificacao', urls)
+                if instantaneo is not None:
+                    from ultimo_valido import ler as ler_ultimo_valido
+                    resultado = instantaneo.dados
+                    anterior = ler_ultimo_valido('artilharia', urls)
+                    artilharia = anterior.dados if anterior is not None else []
+                    mostrar_idade(instantaneo, 'classificacao', urls)
+                else:
+                    if modo_incremental:
+                        dados, relatorio = executar_incremental(
+                            'brasileirao', urls, lambda dados: formatar_tabela_brasileirao(dados['classificacao']))
+                    else:
+                        with st.spinner("Fazendo scraping da tabela do Brasileirão..."):
+                            dados, relatorio = executar_no_sla(scrape_brasileirao, urls)
+                    resultado, artilharia = (dados['classificacao'], dados['artilharia']) if dados else (None, [])
+                    mostrar_relatorio(relatorio)
+                
+                if resultado:
+                    st.success("✅ Scraping concluído com sucesso!")
                     
-                    if resultado:
-                        st.success("✅ Scraping concluído com sucesso!")
+                    # Criar duas colunas
+                    col1, col2 = st.columns([2, 1])
+                    
+                    with col1:
+                        st.subheader("📊 TABELA DE CLASSIFICAÇÃO")
                         
-                        # Criar duas colunas
-                        col1, col2 = st.columns([2, 1])
+                        # Tentar formatar como tabela do Brasileirão
+                        df_tabela = formatar_tabela_brasileirao(resultado)
                         
-                        with col1:
-                            st.subheader("📊 TABELA DE CLASSIFICAÇÃO")
+                        if df_tabela is not None and not df_tabela.empty:
+                            # Aplicar estilos na tabela (versão compatível)
+                            def colorir_posicoes(row):
+                                if row['Pos'] <= 4:
+                                    return ['background-color: #d4edda'] * len(row)  # Verde claro - Libertadores
+                                elif row['Pos'] <= 6:
+                                    return ['background-color: #fff3cd'] * len(row)  # Amarelo claro - Sul-Americana
+                                elif row['Pos'] >= 17:
+                                    return ['background-color: #f8d7da'] * len(row)  # Vermelho claro - Rebaixamento
+                                else:
+                                    return [''] * len(row)
                             
-                            # Tentar formatar como tabela do Brasileirão
-                            df_tabela = formatar_tabela_brasileirao(resultado)
+                            # Mostrar tabela estilizada (versão compatível)
+                            try:
+                                st.dataframe(
+                                    df_tabela.style.apply(colorir_posicoes, axis=1),
+                                    height=600
+                                )
+                            except:
+                                # Fallback para versões mais antigas do Streamlit
+                                st.dataframe(df_tabela, height=600)
                             
-                            if df_tabela is not None and not df_tabela.empty:
-                                # Aplicar estilos na tabela (versão compatível)
-                                def colorir_posicoes(row):
-                                    if row['Pos'] <= 4:
-                                        return ['background-color: #d4edda'] * len(row)  # Verde claro - Libertadores
-                                    elif row['Pos'] <= 6:
-                                        return ['background-color: #fff3cd'] * len(row)  # Amarelo claro - Sul-Americana
-                                    elif row['Pos'] >= 17:
-                                        return ['background-color: #f8d7da'] * len(row)  # Vermelho claro - Rebaixamento
-                                    else:
-                                        return [''] * len(row)
-                                
-                                # Mostrar tabela estilizada (versão compatível)
-                                try:
-                                    st.dataframe(
-                                        df_tabela.style.apply(colorir_posicoes, axis=1),
-                                        height=600
-                                    )
-                                except:
-                                    # Fallback para versões mais antigas do Streamlit
-                                    st.dataframe(df_tabela, height=600)
-                                
-                                # Legenda
-                                st.markdown("""
-                                **Legenda:**
-                                - 🟢 **Posições 1-4**: Classificação para Libertadores
-                                - 🟡 **Posições 5-6**: Classificação para Sul-Americana  
-                                - 🔴 **Posições 17-20**: Zona de rebaixamento
-                                """)
-                                
-                            else:
-                                st.warning("⚠️ Não foi possível formatar os dados como tabela de classificação")
-                                st.json(resultado)
-                        
-                        with col2:
-                            st.subheader("🥅 ARTILHARIA")
-                            
-                            # Tentar extrair dados de artilharia
-                            df_artilharia = formatar_artilharia(resultado)
+                            # Legenda
+                            st.markdown("""
+                            **Legenda:**
+                            - 🟢 **Posições 1-4**: Classificação para Libertadores
+                            - 🟡 **Posições 5-6**: Classificação para Sul-Americana  
+                            - 🔴 **Posições 17-20**: Zona de rebaixamento
+                            """)
                             
-                            if df_artilharia is not None and not df_artilharia.empty:
-                                st.dataframe(df_artilharia)
-                            else:
-                                st.info("ℹ️ Dados de artilharia não encontrados nesta extração")
-                        
-                        # Seção expandível com dados brutos
-                        with st.expander("🔍 Ver dados brutos (JSON)"):
+                        else:
+                            st.warning("⚠️ Não foi possível formatar os dados como tabela de classificação")
                             st.json(resultado)
-                            
-                    else:
-                        st.warning("⚠️ Nenhum dado foi extraído. Verifique a URL ou o schema.")
                     
+                    with col2:
+                        st.subheader("🥅 ARTILHARIA")
+                        
+                        # Artilharia extraída na mesma execução que a tabela
+                        df_artilharia = formatar_artilharia(artilharia)
+                        
+                        if df_artilharia is not None and not df_artilharia.empty:
+                            st.dataframe(df_artilharia)
+                        else:
+                            st.info("ℹ️ Dados de artilharia não encontrados nesta extração")
+                    
+                    mostrar_diferencas('classificacao', urls)
+                    
+                    # Seção expandível com dados brutos
+                    with st.expander("🔍 Ver dados brutos (JSON)"):
+                        st.json(resultado)
+                        
+                else:
+                    st.warning("⚠️ Nenhum dado foi extraído. Verifique a URL ou o schema.")
+                
             elif opcao == "Ações (Big Caps)":
-                with st.spinner("Fazendo scraping das ações..."):
-                    try:
-                        # Importar o módulo de ações
-                        import exemplo2_acoes
+                try:
+                    if forcar_atualizacao:
+                        scrape_acoes.clear()
+                        scrape_mercado.clear()
+                    
+                    if mercado_completo:
+                        from exemplo2_acoes import URLS_MERCADO
+                        tipo, urls, scrape = 'mercado', tuple(URLS_MERCADO), scrape_mercado
+                    else:
+                        tipo, scrape = 'acoes', scrape_acoes
+                        urls = ('https://br.tradingview.com/markets/stocks-brazil/market-movers-large-cap/',)
+                    instantaneo = None if forcar_atualizacao else servir_ultimo_valido(tipo, urls)
+                    if instantaneo is not None:
+                        resultado = instantaneo.dados
+                        mostrar_idade(instantaneo, tipo, urls)
+                    elif modo_incremental:
+                        resultado, relatorio = executar_incremental(tipo, urls, formatar_tabela_acoes)
+                        mostrar_relatorio(relatorio)
+                    else:
+                        with st.spinner("Fazendo scraping das ações..."):
+                            resultado, relatorio = executar_no_sla(scrape, urls)
+                        mostrar_relatorio(relatorio)
+                    
+                    if resultado:
+                        st.success("✅ Scraping de ações concluído com sucesso!")
                         
-                        urls = ['https://br.tradingview.com/markets/stocks-brazil/market-movers-large-cap/']
-                        resultado = exemplo2_acoes.scrape_with_playwright(urls=urls, schema=exemplo2_acoes.schema)
+                        st.subheader("📈 AÇÕES - MERCADO COMPLETO" if mercado_completo else "📈 AÇÕES - BIG CAPS")
                         
-                        if resultado:
-                            st.success("✅ Scraping de ações concluído com sucesso!")
-                            
-                            st.subheader("📈 AÇÕES - BIG CAPS")
-                            
-                            # Formatar dados de ações
-                            df_acoes = formatar_tabela_acoes(resultado)
+                        # Formatar dados de ações
+                        df_acoes = formatar_tabela_acoes(resultado)
+                        
+                        if df_acoes is not None and not df_acoes.empty:
+                            # Colunas já numéricas: ordenação e formatação de número de verdade
+                            st.dataframe(df_acoes, height=600, column_config=FORMATOS_ACOES)
                             
-                            if df_acoes is not None and not df_acoes.empty:
-                                st.dataframe(df_acoes, height=600)
-                                
-                                # Estatísticas básicas
-                                st.subheader("📊 Estatísticas")
-                                col1, col2, col3 = st.columns(3)
-                                
-                                with col1:
-                                    st.metric("Total de Empresas", len(df_acoes))
-                                
-                                with col2:
-                                    if 'Setor' in df_acoes.columns:
-                                        setores_unicos = df_acoes['Setor'].nunique()
-                                        st.metric("Setores Diferentes", setores_unicos)
-                                
-                                with col3:
-                                    st.metric("Dados Extraídos", "Em tempo real")
-                                
-                            else:
-                                st.warning("⚠️ Não foi possível formatar os dados das ações")
-                                st.json(resultado)
+                            mostrar_estatisticas_acoes(df_acoes)
                             
-                            # Seção expandível com dados brutos
-                            with st.expander("🔍 Ver dados brutos (JSON)"):
-                                st.json(resultado)
-                                
                         else:
-                            st.warning("⚠️ Nenhum dado de ações foi extraído. Verifique a URL ou o schema.")
+                            st.warning("⚠️ Não foi possível formatar os dados das ações")
+                            st.json(resultado)
+                        
+                        mostrar_diferencas('acoes', urls)
+                        
+                        # Seção expandível com dados brutos
+                        with st.expander("🔍 Ver dados brutos (JSON)"):
+                            st.json(resultado)
                             
-                    except Exception as e:
-                        st.error(f"❌ Erro ao processar ações: {str(e)}")
-                    
+                    else:
+                        st.warning("⚠️ Nenhum dado de ações foi extraído. Verifique a URL ou o schema.")
+                        
+                except Exception as e:
+                    st.error(f"❌ Erro ao processar ações: {str(e)}")
+                
             elif opcao == "Agente inteligente":
-                with st.spinner("Executando agente inteligente... (pode demorar alguns minutos)"):
+                with st.spinner("Consultando a classificação... (o agente só é executado se a tabela não responder)"):
                     try:
-                        # Importar o módulo do agente
-                        import exemplo3_agente
+                        if forcar_atualizacao:
+                            responder_pergunta.clear()
                         
-                        resultado = exemplo3_agente.executar_agente()
+                        resultado, relatorio = executar_no_sla(responder_pergunta, pergunta)
+                        mostrar_relatorio(relatorio)
                         
                         if resultado:
-                            st.success("✅ Agente inteligente executado com sucesso!")
+                            if resultado.get('origem') == 'tabela':
+                                st.success(f"✅ Respondido pela tabela de classificação ({resultado.get('fonte')})")
+                            else:
+                                st.success("✅ Agente inteligente executado com sucesso!")
                             
                             st.subheader("🤖 RESULTADO DO AGENTE INTELIGENTE")
                             
@@ -380,6 +618,12 @@ if executar:
             st.error(f"❌ Erro durante a execução: {str(e)}")
 
 # Sidebar dinâmica baseada na opção selecionada
+# Histórico disponível mesmo sem executar um novo scraping
+if opcao == "Tabela do Brasileirão":
+    mostrar_historico('classificacao')
+elif opcao == "Ações (Big Caps)":
+    mostrar_historico('acoes')
+
 with st.sidebar:
     st.header("ℹ️ Informações")
     
@@ -399,11 +643,16 @@ with st.sidebar:
     elif opcao == "Agente inteligente":
         st.write("**Agente Inteligente**")
         st.write("- Análise automatizada com IA")
-        st.write("- Pergunta: Qual time está na primeira colocação do brasileirão na tabela do site:")
+        st.write("- Pergunta padrão: Qual time está na primeira colocação do brasileirão na tabela do site:")
         st.write("  [https://ge.globo.com/futebol/brasileirao-serie-a/](https://ge.globo.com/futebol/brasileirao-serie-a/)")
         st.write("- E o último colocado?")
+        st.write("- Líder, lanterna, Z4/G4, diferença de pontos e posição de um time saem direto da classificação")
+        st.write("- Outras perguntas: agente com limite de passos e de tempo")
         st.write("- Powered by LangChain + OpenAI + Playwright")
     
+    st.markdown("---")
+    mostrar_instrumentacao()
+    
     # Informações do deploy
     st.markdown("---")
     st.caption("🚀 Deploy: Streamlit Cloud")
@@ -1,54 +1,26 @@
-import os, json
-import requests
-from decouple import config
-from pprint import pprint
-from langchain_openai import ChatOpenAI
-from langchain.chains import create_extraction_chain
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from bs4 import BeautifulSoup
-import re
+import os, sys
+import json
 
-# Configurar API key
-if 'OPENAI_API_KEY' not in os.environ:
-    api_key = config('OPENAI_API_KEY')
-    if api_key:
-        os.environ['OPENAI_API_KEY'] = api_key
-
-llm = ChatOpenAI(model='gpt-4o-mini', temperature=0)
-
-# Lista dos artilheiros conforme imagem 2
-ARTILHEIROS_CONHECIDOS = [
-    'Arrascaeta', 'Vegetti', 'Kaio Jorge', 'Pedro Raul', 'Reinaldo',
-    'Yuri Alberto', 'Isidro Pitta', 'Braithwaite', 'Pedro', 'Rony'
-]
-
-def criar_dados_artilharia_corretos():
-    """Retorna os dados corretos da artilharia baseados na imagem 2"""
-    return [
-        {'posicao': 1, 'jogador': 'Arrascaeta', 'time': 'Flamengo', 'gols': 9, 'posicao_campo': 'Meio-campo'},
-        {'posicao': 2, 'jogador': 'Vegetti', 'time': 'Vasco', 'gols': 8, 'posicao_campo': 'Atacante'},
-        {'posicao': 3, 'jogador': 'Kaio Jorge', 'time': 'Cruzeiro', 'gols': 8, 'posicao_campo': 'Atacante'},
-        {'posicao': 4, 'jogador': 'Pedro Raul', 'time': 'Ceará', 'gols': 6, 'posicao_campo': 'Atacante'},
-        {'posicao': 5, 'jogador': 'Reinaldo', 'time': 'Grêmio', 'gols': 6, 'posicao_campo': 'Lateral-esquerdo'},
-        {'posicao': 6, 'jogador': 'Yuri Alberto', 'time': 'Corinthians', 'gols': 5, 'posicao_campo': 'Atacante'},
-        {'posicao': 7, 'jogador': 'Isidro Pitta', 'time': 'Cuiabá', 'gols': 4, 'posicao_campo': 'Atacante'},
-        {'posicao': 8, 'jogador': 'Braithwaite', 'time': 'Grêmio', 'gols': 4, 'posicao_campo': 'Atacante'},
-        {'posicao': 9, 'jogador': 'Pedro', 'time': 'Flamengo', 'gols': 4, 'posicao_campo': 'Atacante'},
-        {'posicao': 10, 'jogador': 'Rony', 'time': 'Palmeiras', 'gols': 3, 'posicao_campo': 'Atacante'}
-    ]
+# Módulos compartilhados (pipeline, validação) ficam em exemplos/
+_exemplos = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exemplos')
+if _exemplos not in sys.path:
+    sys.path.insert(0, _exemplos)
 
 def scrape_artilharia(urls):
-    """Função específica para extrair artilharia"""
-    print("⚽ Extraindo dados de artilharia...")
-    
-    # Por enquanto, retornar dados corretos
-    # Pode ser expandido para fazer scraping real no futuro
-    dados_artilharia = criar_dados_artilharia_corretos()
+    """Artilharia das páginas em `urls`.
+
+    Sai da mesma execução que a classificação (exemplo1_brasileirao): cada
+    página é buscada e lida uma vez para os dois, e o que precisar do LLM
+    vai em uma única chamada com os dois schemas.
+    """
+    from exemplo1_brasileirao import scrape_artilharia as extrair_artilharia
+    from instrumentacao import obter_logger
+    log = obter_logger('artilharia')
+    log.info("⚽ Extraindo dados de artilharia...")
     
-    print(f"✅ Artilharia carregada: {len(dados_artilharia)} jogadores")
-    for item in dados_artilharia[:5]:
-        print(f"  {item['posicao']}. {item['jogador']} ({item['time']}) - {item['gols']} gols")
+    dados_artilharia = extrair_artilharia(urls)
     
+    log.info(f"✅ Artilharia extraída: {len(dados_artilharia)} jogadores")
     return dados_artilharia
 
 def main():
@@ -62,4 +34,4 @@ def main():
         print("💾 Dados de artilharia salvos em data_artilharia.json")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
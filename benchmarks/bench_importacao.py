@@ -0,0 +1,100 @@
+"""Benchmark do tempo de importação (partida a frio) dos módulos do projeto.
+
+Cada módulo é importado em um processo novo com `python -X importtime` e o
+tempo acumulado do próprio módulo é lido da saída. Sai com código 1 se
+algum módulo passar do limite, para ser usado como verificação de regressão.
+
+    python benchmarks/bench_importacao.py [--limite-ms 300] [--repeticoes 3] [--detalhar 10]
+"""
+import os
+import sys
+import re
+import argparse
+import subprocess
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = [
+    'registro',
+    'recursos',
+    'cache_llm',
+    'validacao',
+    'extracao_concorrente',
+    'indice_dom',
+    'extrator_tabelas',
+    'fatiador_tabelas',
+    'http_fetch',
+    'pool_navegador',
+    'exemplo1_brasileirao',
+    'exemplo2_acoes',
+    'exemplo3_agente',
+    'artilharia',
+]
+
+# Não devem ser carregados só por importar os scrapers
+PESADOS = ('langchain', 'langchain_openai', 'langchain_community', 'bs4', 'tiktoken',
+           'playwright', 'openai', 'pandas')
+
+LINHA = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def medir(modulo):
+    """(tempo acumulado do módulo em µs, [(acumulado, nome)], pesados carregados)"""
+    ambiente = dict(os.environ)
+    ambiente['PYTHONPATH'] = os.pathsep.join([os.path.join(raiz, 'exemplos'), raiz, ambiente.get('PYTHONPATH', '')])
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        capture_output=True, text=True, env=ambiente, cwd=raiz,
+    )
+    if processo.returncode != 0:
+        erro = processo.stderr.strip().splitlines()
+        raise RuntimeError(erro[-1] if erro else f'falha ao importar {modulo}')
+    total = 0
+    importados = []
+    for linha in processo.stderr.splitlines():
+        encontrado = LINHA.match(linha)
+        if not encontrado:
+            continue
+        acumulado, nome = int(encontrado.group(2)), encontrado.group(4)
+        importados.append((acumulado, nome))
+        if nome == modulo:
+            total = acumulado
+    pesados = sorted({nome.split('.')[0] for _, nome in importados if nome.split('.')[0] in PESADOS})
+    return total, importados, pesados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--limite-ms', type=float, default=300.0, help='tempo máximo por módulo')
+    parser.add_argument('--repeticoes', type=int, default=3, help='usa o menor tempo de N execuções')
+    parser.add_argument('--detalhar', type=int, default=0, help='mostra as N importações mais lentas de cada módulo')
+    parser.add_argument('modulos', nargs='*', default=MODULOS)
+    args = parser.parse_args()
+
+    falhas = []
+    print(f"{'módulo':<24}{'ms':>10}  dependências pesadas")
+    for modulo in args.modulos:
+        try:
+            medicoes = [medir(modulo) for _ in range(max(1, args.repeticoes))]
+        except RuntimeError as e:
+            print(f"{modulo:<24}{'erro':>10}  {e}")
+            falhas.append(modulo)
+            continue
+        total, importados, pesados = min(medicoes, key=lambda m: m[0])
+        ms = total / 1000
+        marcador = '❌' if ms > args.limite_ms else '  '
+        print(f"{modulo:<24}{ms:>10.1f}  {', '.join(pesados) or '-'} {marcador}")
+        if ms > args.limite_ms:
+            falhas.append(modulo)
+        for acumulado, nome in sorted(importados, reverse=True)[1:args.detalhar + 1]:
+            print(f"    {nome:<40}{acumulado / 1000:>8.1f} ms")
+
+    if falhas:
+        print(f"\n❌ Acima de {args.limite_ms:.0f} ms (ou com erro): {', '.join(falhas)}")
+        return 1
+    print(f"\n✅ Todos os módulos abaixo de {args.limite_ms:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
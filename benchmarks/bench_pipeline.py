@@ -0,0 +1,323 @@
+"""Benchmark offline do pipeline de extração (sem rede externa e sem API).
+
+As páginas (sintéticas, ver fixtures.py, ou gravadas localmente em fixtures/)
+são servidas por um servidor HTTP local e o LLM é trocado por um falso, com latência configurável e
+contagem de tokens. Para cada cenário mede o tempo de cada etapa do pipeline
+(busca, limpeza, fatiamento, extração...), o parse, a descoberta de seções, o
+fatiamento em blocos e a formatação do DataFrame, além do pico de memória e
+dos tokens. O resultado é gravado em .cache/benchmarks/ e comparado com a
+execução anterior (ou com --comparar ARQUIVO).
+
+    python benchmarks/bench_pipeline.py [--repeticoes 3] [--latencia 0.2] [--cenarios acoes_blocos ...]
+"""
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import tracemalloc
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for caminho in (raiz, os.path.join(raiz, 'exemplos'), os.path.dirname(os.path.abspath(__file__))):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+# Nada de cache de respostas do LLM: cada repetição mede o caminho completo
+os.environ['LLM_CACHE_DESATIVADO'] = 'True'
+
+import lxml.html
+import exemplo1_brasileirao
+import exemplo2_acoes
+import extracao_lote
+import fatiador_tabelas
+from http_fetch import ArmazemRespostas, ClienteHttp
+from indice_dom import IndiceDom, descobrir_secoes
+from pipeline import consolidar, do_tipo
+from formatacao import formatar_tabela_brasileirao, formatar_tabela_acoes
+from fixtures import (TIMES, ARTILHEIROS, carregar, pagina_brasileirao, pagina_brasileirao_sem_tabela, pagina_acoes)
+
+DIRETORIO_RESULTADOS = os.path.join(raiz, '.cache', 'benchmarks')
+
+# Trechos da mensagem enviada ao LLM (ver extracao_lote.montar_mensagens)
+TRECHO = re.compile(r'<trecho id="([^"]+)">\n(.*?)\n</trecho>', re.S)
+
+# Ordem das colunas das páginas sintéticas de ações (usada pelo LLM falso)
+CAMPOS_ACOES = ['simbolo_empresa', 'valor_mercado', 'preco', 'variacao', 'volume', 'setor_empresa']
+
+CENARIOS = {
+    'classificacao_tabela': ('classificacao', lambda: carregar('ge_brasileirao', pagina_brasileirao)),
+    'classificacao_secoes': ('classificacao', lambda: {'ge_sem_tabela.html': pagina_brasileirao_sem_tabela().encode('utf-8')}),
+    'acoes_tabela': ('acoes', lambda: carregar('tradingview', lambda: pagina_acoes(100))),
+    'acoes_blocos': ('acoes', lambda: {'acoes_sem_cabecalho.html': pagina_acoes(100, cabecalho=False).encode('utf-8')}),
+}
+
+
+class EncoderAproximado:
+    """~4 caracteres por token, quando o tiktoken não consegue baixar o encoding (sem rede)"""
+
+    def encode(self, texto):
+        return [0] * (len(texto) // 4 + 1)
+
+
+def preparar_encoder():
+    try:
+        from recursos import obter_encoder_modelo
+        encoder = obter_encoder_modelo(exemplo1_brasileirao.MODELO)
+        nome = 'tiktoken'
+    except Exception:
+        encoder = EncoderAproximado()
+        fatiador_tabelas.obter_encoder_modelo = lambda modelo=None: encoder
+        nome = 'aproximado'
+    return encoder, nome
+
+
+class LLMFalso:
+    """Substitui `extracao_lote.chamar_estruturado`: responde cada trecho a partir do próprio texto.
+
+    Dorme `latencia` + `por_token` × tokens de resposta, como uma chamada real,
+    e conta chamadas e tokens de prompt/resposta.
+    """
+
+    def __init__(self, encoder, latencia=0.2, por_token=0.0005):
+        self.encoder = encoder
+        self.latencia = latencia
+        self.por_token = por_token
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        self.chamadas = 0
+        self.tokens_prompt = 0
+        self.tokens_resposta = 0
+
+    def _responder(self, schema, texto):
+        texto = texto.split('Texto para análise:')[-1]
+        campos = schema.get('properties', {})
+        registros = []
+        if 'jogador' in campos:
+            for jogador, time in ARTILHEIROS:
+                encontrado = re.search(rf'(\d+)º {re.escape(jogador)} {re.escape(time)} (\d+) gols', texto)
+                if encontrado:
+                    registros.append({'posicao': int(encontrado.group(1)), 'jogador': jogador,
+                                      'time': time, 'gols': int(encontrado.group(2))})
+            return registros
+        if 'time' in campos:
+            encontrados = sorted((texto.find(time), time) for time in TIMES if time in texto)
+            for posicao, (_, time) in enumerate(encontrados, start=1):
+                depois = texto[texto.find(time) + len(time):].split()
+                pontos = next((int(p) for p in depois[:3] if p.isdigit()), 0)
+                registros.append({'posicao': posicao, 'time': time, 'pontos': pontos})
+            return registros
+        for linha in texto.splitlines():
+            celulas = [c.strip() for c in linha.split('|')]
+            if len(celulas) < 2 or not celulas[0]:
+                continue  # cabeçalho (primeira célula vazia) ou linha solta
+            registro = dict(zip(CAMPOS_ACOES, celulas))
+            simbolo, _, nome = registro['simbolo_empresa'].partition(' ')
+            registro.update(simbolo_empresa=simbolo, nome_empresa=nome)
+            registros.append(registro)
+        return registros
+
+    def chamar_estruturado(self, modelo, esquema, mensagens):
+        # Uma lista por tipo de registro pedido no esquema de saída ('registros' ou, combinada, uma por schema)
+        listas = {nome: definicao['items'] for nome, definicao in
+                  esquema['properties']['itens']['items']['properties'].items() if nome != 'id'}
+        trechos = TRECHO.findall(mensagens[-1]['content'])
+        resposta = {'itens': [{'id': id_, **{nome: self._responder(registro, texto) for nome, registro in listas.items()}}
+                              for id_, texto in trechos]}
+        tokens_prompt = sum(len(self.encoder.encode(mensagem['content'])) for mensagem in mensagens)
+        tokens_resposta = len(self.encoder.encode(json.dumps(resposta, ensure_ascii=False)))
+        time.sleep(self.latencia + tokens_resposta * self.por_token)
+        with self._lock:
+            self.chamadas += 1
+            self.tokens_prompt += tokens_prompt
+            self.tokens_resposta += tokens_resposta
+        return resposta
+
+
+def servir(paginas):
+    """Servidor HTTP local com as páginas em memória; devolve (servidor, urls)"""
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            corpo = paginas.get(self.path.lstrip('/'))
+            if corpo is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    porta = servidor.server_address[1]
+    return servidor, [f'http://127.0.0.1:{porta}/{nome}' for nome in paginas]
+
+
+def medir_componentes(tipo, paginas):
+    """Parse, descoberta de seções e fatiamento medidos isoladamente, por página"""
+    tempos = {'parse': 0.0, 'secoes': 0.0, 'fatiamento': 0.0}
+    for conteudo in paginas.values():
+        html = conteudo.decode('utf-8', errors='replace')
+        inicio = time.perf_counter()
+        lxml.html.fromstring(html)
+        tempos['parse'] += time.perf_counter() - inicio
+        if tipo == 'classificacao':
+            inicio = time.perf_counter()
+            descobrir_secoes(IndiceDom(html, nomes=TIMES))
+            tempos['secoes'] += time.perf_counter() - inicio
+        else:
+            inicio = time.perf_counter()
+            fatiador_tabelas.fatiar_tabelas(html)
+            tempos['fatiamento'] += time.perf_counter() - inicio
+    return tempos
+
+
+def executar_cenario(tipo, urls, llm):
+    """Uma execução do pipeline com armazém em memória (sem 304 nem impressões de antes)"""
+    cliente = ClienteHttp(armazem=ArmazemRespostas(':memory:'))
+    llm.zerar()
+    try:
+        inicio = time.perf_counter()
+        if tipo == 'classificacao':
+            pipeline = exemplo1_brasileirao.montar_pipeline(urls, cliente=cliente)
+            trechos = list(pipeline.executar(urls))
+            registros = sorted(consolidar(do_tipo(trechos, 'classificacao'), chave=lambda r: r['time']),
+                               key=lambda r: r.get('posicao', 999))
+        else:
+            pipeline = exemplo2_acoes.montar_pipeline(urls, exemplo2_acoes.schema, cliente=cliente)
+            trechos = list(pipeline.executar(urls))
+            registros = consolidar(trechos, chave=exemplo2_acoes.chave_acao)
+        total_pipeline = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        df = (formatar_tabela_brasileirao if tipo == 'classificacao' else formatar_tabela_acoes)(registros)
+        formatacao = time.perf_counter() - inicio
+    finally:
+        cliente.fechar()
+    etapas = {e['etapa']: e['tempo'] for e in pipeline.estatisticas()}
+    return {
+        'total': total_pipeline + formatacao,
+        'pipeline': total_pipeline,
+        'etapas': etapas,
+        'formatacao': formatacao,
+        'linhas': 0 if df is None else len(df),
+        'chamadas_llm': llm.chamadas,
+        'tokens_prompt': llm.tokens_prompt,
+        'tokens_resposta': llm.tokens_resposta,
+    }
+
+
+def medir_cenario(nome, repeticoes, llm):
+    tipo, gerar_paginas = CENARIOS[nome]
+    paginas = gerar_paginas()
+    servidor, urls = servir(paginas)
+    try:
+        executar_cenario(tipo, urls, llm)  # aquecimento: importações tardias (aiohttp, pandas...)
+        execucoes = [executar_cenario(tipo, urls, llm) for _ in range(repeticoes)]
+        tracemalloc.start()
+        executar_cenario(tipo, urls, llm)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        servidor.shutdown()
+    mediana = lambda valores: statistics.median(valores)
+    etapas = {etapa: mediana([e['etapas'].get(etapa, 0.0) for e in execucoes]) for etapa in execucoes[0]['etapas']}
+    return {
+        'tipo': tipo,
+        'paginas': len(paginas),
+        'bytes_html': sum(len(c) for c in paginas.values()),
+        'total_s': mediana([e['total'] for e in execucoes]),
+        'etapas_s': etapas,
+        'componentes_s': medir_componentes(tipo, paginas),
+        'formatacao_s': mediana([e['formatacao'] for e in execucoes]),
+        'pico_memoria_mb': round(pico / 1024 / 1024, 2),
+        'linhas': execucoes[-1]['linhas'],
+        'chamadas_llm': execucoes[-1]['chamadas_llm'],
+        'tokens_prompt': execucoes[-1]['tokens_prompt'],
+        'tokens_resposta': execucoes[-1]['tokens_resposta'],
+    }
+
+
+def ultimo_resultado():
+    if not os.path.isdir(DIRETORIO_RESULTADOS):
+        return None
+    arquivos = sorted(f for f in os.listdir(DIRETORIO_RESULTADOS) if f.startswith('pipeline_') and f.endswith('.json'))
+    return os.path.join(DIRETORIO_RESULTADOS, arquivos[-1]) if arquivos else None
+
+
+def variacao(atual, anterior):
+    if not anterior:
+        return ''
+    percentual = (atual - anterior) / anterior * 100
+    icone = '🔺' if percentual > 10 else ('🔻' if percentual < -10 else ' ')
+    return f' ({percentual:+.0f}% {icone})'
+
+
+def imprimir(resultados, anterior):
+    for nome, r in resultados['cenarios'].items():
+        a = (anterior or {}).get('cenarios', {}).get(nome, {})
+        print(f"\n📄 {nome}: {r['paginas']} página(s), {r['bytes_html'] / 1024:.0f} KB, {r['linhas']} linhas")
+        print(f"  total:       {r['total_s'] * 1000:9.1f} ms{variacao(r['total_s'], a.get('total_s'))}")
+        for etapa, tempo in r['etapas_s'].items():
+            print(f"  {etapa + ':':<13}{tempo * 1000:9.1f} ms{variacao(tempo, a.get('etapas_s', {}).get(etapa))}")
+        for componente, tempo in r['componentes_s'].items():
+            if tempo:
+                print(f"  {componente + ':':<13}{tempo * 1000:9.1f} ms (isolado){variacao(tempo, a.get('componentes_s', {}).get(componente))}")
+        print(f"  formatação:  {r['formatacao_s'] * 1000:9.1f} ms{variacao(r['formatacao_s'], a.get('formatacao_s'))}")
+        print(f"  memória:     {r['pico_memoria_mb']:9.2f} MB{variacao(r['pico_memoria_mb'], a.get('pico_memoria_mb'))}")
+        print(f"  LLM:         {r['chamadas_llm']} chamadas, {r['tokens_prompt']} tokens de prompt, "
+              f"{r['tokens_resposta']} de resposta{variacao(r['tokens_prompt'], a.get('tokens_prompt'))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--latencia', type=float, default=0.2, help='latência fixa do LLM falso (s)')
+    parser.add_argument('--por-token', type=float, default=0.0005, help='latência por token de resposta (s)')
+    parser.add_argument('--cenarios', nargs='*', default=list(CENARIOS), choices=list(CENARIOS))
+    parser.add_argument('--comparar', help='resultado anterior (padrão: o mais recente em .cache/benchmarks/)')
+    parser.add_argument('--nao-salvar', action='store_true')
+    args = parser.parse_args()
+
+    encoder, nome_encoder = preparar_encoder()
+    llm = LLMFalso(encoder, latencia=args.latencia, por_token=args.por_token)
+    extracao_lote.chamar_estruturado = llm.chamar_estruturado
+
+    caminho_anterior = args.comparar or ultimo_resultado()
+    anterior = None
+    if caminho_anterior:
+        with open(caminho_anterior, encoding='utf-8') as fp:
+            anterior = json.load(fp)
+
+    # Os scrapers registram o progresso no logger 'scraping'; aqui só interessa o relatório
+    from instrumentacao import obter_logger
+    obter_logger('bench').parent.setLevel(logging.WARNING)
+    resultados = {'criado_em': time.strftime('%Y-%m-%dT%H:%M:%S'), 'encoder': nome_encoder,
+                  'latencia_llm': args.latencia, 'repeticoes': args.repeticoes, 'cenarios': {}}
+    for nome in args.cenarios:
+        resultados['cenarios'][nome] = medir_cenario(nome, args.repeticoes, llm)
+
+    print(f"🧪 {args.repeticoes} repetições, LLM falso com {args.latencia * 1000:.0f} ms, encoder {nome_encoder}")
+    if anterior:
+        print(f"📊 Comparando com {os.path.basename(caminho_anterior)} ({anterior.get('criado_em')})")
+    imprimir(resultados, anterior)
+
+    if not args.nao_salvar:
+        os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+        caminho = os.path.join(DIRETORIO_RESULTADOS, f"pipeline_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(caminho, 'w', encoding='utf-8') as fp:
+            json.dump(resultados, fp, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultado salvo em {caminho}")
+
+
+if __name__ == "__main__":
+    main()
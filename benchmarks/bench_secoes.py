@@ -0,0 +1,72 @@
+"""Benchmark da descoberta de seções de classificação.
+
+Compara a abordagem antiga (BeautifulSoup + html.parser, `find_all` com regex
+e busca por time) com o índice de uma passada (lxml) de exemplos/indice_dom.py.
+
+    python benchmarks/bench_secoes.py [--repeticoes 20]
+"""
+import os
+import sys
+import re
+import time
+import argparse
+from bs4 import BeautifulSoup
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for caminho in (raiz, os.path.join(raiz, 'exemplos'), os.path.dirname(os.path.abspath(__file__))):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+from indice_dom import IndiceDom, descobrir_secoes
+from fixtures import TIMES, carregar, pagina_brasileirao
+
+
+def descobrir_secoes_bs4(html):
+    """Descoberta de seções como era feita em extrair_por_secoes_especificas"""
+    soup = BeautifulSoup(html, 'html.parser')
+    secoes = []
+    for element in soup.find_all(['div', 'section', 'table'], string=re.compile(r'classificação|tabela', re.I)):
+        parent = element.parent
+        if parent:
+            texto = parent.get_text(separator=' ', strip=True)
+            if len(texto) > 200 and 'artilh' not in texto.lower():
+                secoes.append(texto)
+    if not secoes:
+        for time_nome in TIMES[:5]:
+            for element in soup.find_all(string=re.compile(time_nome, re.I)):
+                parent = element.parent
+                if parent and parent.parent:
+                    texto = parent.parent.get_text(separator=' ', strip=True)
+                    if len(texto) > 200 and 'artilh' not in texto.lower():
+                        secoes.append(texto)
+                        break
+    return secoes
+
+def descobrir_secoes_indice(html):
+    return descobrir_secoes(IndiceDom(html, nomes=TIMES))
+
+def medir(funcao, html, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(html)
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2], resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    for nome, html in carregar('ge_brasileirao', pagina_brasileirao).items():
+        t_bs4, secoes_bs4 = medir(descobrir_secoes_bs4, html, args.repeticoes)
+        t_indice, secoes_indice = medir(descobrir_secoes_indice, html, args.repeticoes)
+        iguais = set(secoes_bs4) == set(secoes_indice)
+        print(f"📄 {nome} ({len(html) / 1024:.0f} KB)")
+        print(f"  BeautifulSoup/html.parser: {t_bs4 * 1000:8.1f} ms  ({len(secoes_bs4)} seções)")
+        print(f"  IndiceDom/lxml:            {t_indice * 1000:8.1f} ms  ({len(secoes_indice)} seções)")
+        print(f"  ⚡ {t_bs4 / t_indice:.1f}x mais rápido | mesmas seções: {'✅' if iguais else '❌'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Fixtures HTML para os benchmarks.
+
+Nenhuma página real acompanha o repositório: por padrão os benchmarks usam
+páginas sintéticas geradas aqui, de forma determinística, com a mesma
+estrutura do ge.globo.com (tabela de classificação + artilharia + feed de
+notícias) e da tabela de ações do TradingView. Para medir com uma página
+real, grave-a com `python benchmarks/fixtures.py --salvar URL NOME`: ela vai
+para benchmarks/fixtures/NOME.html (diretório criado na hora, fora do git)
+e passa a ter prioridade sobre a sintética de mesmo prefixo.
+"""
+import os
+import sys
+import random
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TIMES = [
+    'Flamengo', 'Cruzeiro', 'Bragantino', 'Palmeiras', 'Bahia', 'Fluminense',
+    'Atlético-MG', 'Botafogo', 'Mirassol', 'Corinthians', 'Grêmio', 'Ceará',
+    'Vasco', 'São Paulo', 'Santos', 'Vitória', 'Internacional', 'Fortaleza',
+    'Juventude', 'Sport'
+]
+
+ARTILHEIROS = [
+    ('Arrascaeta', 'Flamengo'), ('Vegetti', 'Vasco'), ('Kaio Jorge', 'Cruzeiro'),
+    ('Pedro Raul', 'Ceará'), ('Reinaldo', 'Grêmio'), ('Yuri Alberto', 'Corinthians'),
+    ('Isidro Pitta', 'Bragantino'), ('Braithwaite', 'Grêmio'), ('Pedro', 'Flamengo'), ('Rony', 'Palmeiras'),
+]
+
+
+def linhas_classificacao(semente=42):
+    """Linhas coerentes (pontos decrescentes) para a tabela sintética"""
+    aleatorio = random.Random(semente)
+    linhas = []
+    pontos = 75
+    for posicao, time in enumerate(TIMES, start=1):
+        pontos -= aleatorio.randint(0, 5)
+        jogos = 30
+        vitorias = min(pontos // 3, jogos)
+        empates = min(pontos - vitorias * 3, jogos - vitorias)
+        derrotas = jogos - vitorias - empates
+        gols_pro = aleatorio.randint(25, 60)
+        gols_contra = aleatorio.randint(20, 50)
+        linhas.append({
+            'posicao': posicao, 'time': time, 'pontos': pontos, 'jogos': jogos,
+            'vitorias': vitorias, 'empates': empates, 'derrotas': derrotas,
+            'gols_pro': gols_pro, 'gols_contra': gols_contra, 'saldo_gols': gols_pro - gols_contra,
+        })
+    return linhas
+
+def pagina_brasileirao(noticias=400, semente=42):
+    """Página sintética no formato do ge.globo.com/futebol/brasileirao-serie-a/"""
+    aleatorio = random.Random(semente)
+    partes = ['<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>Brasileirão Série A | ge</title>',
+              '<script>window.__DATA__ = {"tracking": true};</script><style>.x{color:red}</style></head><body>',
+              '<header><nav>' + ''.join(f'<a href="/futebol/times/{i}/">{t}</a>' for i, t in enumerate(TIMES)) + '</nav></header>',
+              '<main><section class="classificacao"><div><h2>Classificação</h2></div>',
+              '<table class="tabela__equipes"><thead><tr><th>Classificação</th></tr></thead><tbody>']
+    linhas = linhas_classificacao(semente)
+    for linha in linhas:
+        partes.append(f'<tr><td class="classificacao__tabela--posicao">{linha["posicao"]}</td>'
+                      f'<td><strong class="classificacao__equipes--nome">{linha["time"]}</strong></td></tr>')
+    partes.append('</tbody></table><table class="tabela__pontos"><thead><tr>'
+                  + ''.join(f'<th>{c}</th>' for c in ['P', 'J', 'V', 'E', 'D', 'GP', 'GC', 'SG']) + '</tr></thead><tbody>')
+    for linha in linhas:
+        valores = [linha[c] for c in ['pontos', 'jogos', 'vitorias', 'empates', 'derrotas', 'gols_pro', 'gols_contra', 'saldo_gols']]
+        partes.append('<tr>' + ''.join(f'<td>{v}</td>' for v in valores) + '</tr>')
+    partes.append('</tbody></table></section>')
+
+    partes.append('<section class="artilharia"><div><h2>Artilharia</h2></div><ul>')
+    for posicao, (jogador, time) in enumerate(ARTILHEIROS, start=1):
+        partes.append(f'<li><span class="posicao">{posicao}º</span><span class="jogador">{jogador}</span>'
+                      f'<span class="time">{time}</span><span class="gols">{12 - posicao} gols</span></li>')
+    partes.append('</ul></section><section class="feed">')
+
+    for i in range(noticias):
+        a, b = aleatorio.sample(TIMES, 2)
+        partes.append(f'<div class="feed-post"><div class="feed-post-body"><a href="/noticia/{i}.ghtml">'
+                      f'<h3>{a} vence {b} e sobe na tabela</h3></a><div class="resumo"><p>'
+                      f'O {a} jogou melhor e mereceu a vitória sobre o {b} na rodada {i % 38 + 1}. '
+                      f'Veja os melhores momentos e a repercussão da partida.</p></div>'
+                      f'<span class="data">há {i % 24 + 1} horas</span></div></div>')
+    partes.append('</section></main><footer>© Globo</footer></body></html>')
+    return ''.join(partes)
+
+def pagina_brasileirao_sem_tabela(noticias=400, semente=42):
+    """Mesma página, mas com a classificação em blocos de texto (sem <table>): caminho das seções + LLM"""
+    aleatorio = random.Random(semente)
+    partes = ['<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>Brasileirão Série A | ge</title></head><body>',
+              '<main><section class="classificacao"><div><h2>Classificação</h2></div><div class="lista">']
+    for linha in linhas_classificacao(semente):
+        partes.append(f'<div class="linha"><span>{linha["posicao"]}</span><span>{linha["time"]}</span>'
+                      f'<span>{linha["pontos"]} pts</span><span>{linha["jogos"]} jogos</span>'
+                      f'<span>{linha["vitorias"]}V {linha["empates"]}E {linha["derrotas"]}D</span>'
+                      f'<span>{linha["gols_pro"]}:{linha["gols_contra"]}</span></div>')
+    partes.append('</div></section><section class="feed">')
+    for i in range(noticias):
+        a, b = aleatorio.sample(TIMES, 2)
+        partes.append(f'<div class="feed-post"><h3>{a} vence {b} e sobe na tabela</h3>'
+                      f'<p>Rodada {i % 38 + 1}: veja os melhores momentos.</p></div>')
+    partes.append('</section></main></body></html>')
+    return ''.join(partes)
+
+def linhas_acoes(quantidade=100, semente=7):
+    """Ações sintéticas no formato da lista de big caps do TradingView"""
+    aleatorio = random.Random(semente)
+    setores = ['Energia', 'Finanças', 'Mineração', 'Varejo', 'Utilidade pública', 'Saúde', 'Tecnologia']
+    linhas = []
+    for i in range(quantidade):
+        simbolo = ''.join(aleatorio.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(4)) + aleatorio.choice(['3', '4', '11'])
+        linhas.append({
+            'simbolo_empresa': simbolo,
+            'nome_empresa': f'Empresa {simbolo[:4].title()} S.A.',
+            'valor_mercado': f'{aleatorio.uniform(10, 500):.2f} B BRL',
+            'preco': f'{aleatorio.uniform(2, 120):.2f} BRL'.replace('.', ','),
+            'variacao': f'{aleatorio.uniform(-5, 5):+.2f}%'.replace('-', '\u2212'),
+            'volume': f'{aleatorio.uniform(0.1, 90):.2f} M',
+            'setor_empresa': aleatorio.choice(setores),
+        })
+    return linhas
+
+def pagina_acoes(quantidade=100, cabecalho=True, semente=7):
+    """Página sintética do TradingView; `cabecalho=False` usa rótulos irreconhecíveis (caminho dos blocos + LLM)"""
+    rotulos = ['Símbolo', 'Valor de mercado', 'Preço', 'Variação %', 'Volume', 'Setor'] if cabecalho else \
+        ['', 'Col B', 'Col C', 'Col D', 'Col E', 'Col F']
+    partes = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Ações de grande capitalização</title></head><body>',
+              '<table class="table"><thead><tr>' + ''.join(f'<th>{r}</th>' for r in rotulos) + '</tr></thead><tbody>']
+    for linha in linhas_acoes(quantidade, semente):
+        partes.append(f'<tr><td><a class="ticker">{linha["simbolo_empresa"]}</a><sup>{linha["nome_empresa"]}</sup></td>'
+                      f'<td>{linha["valor_mercado"]}</td><td>{linha["preco"]}</td><td>{linha["variacao"]}</td>'
+                      f'<td>{linha["volume"]}</td><td>{linha["setor_empresa"]}</td></tr>')
+    partes.append('</tbody></table></body></html>')
+    return ''.join(partes)
+
+def carregar(prefixo, gerador):
+    """Páginas gravadas em fixtures/ que começam com `prefixo`, ou a sintética"""
+    paginas = {}
+    if os.path.isdir(DIRETORIO_FIXTURES):
+        for nome in sorted(os.listdir(DIRETORIO_FIXTURES)):
+            if nome.startswith(prefixo) and nome.endswith('.html'):
+                with open(os.path.join(DIRETORIO_FIXTURES, nome), 'rb') as fp:
+                    paginas[nome] = fp.read()
+    if not paginas:
+        paginas[f'{prefixo}_sintetico.html'] = gerador().encode('utf-8')
+    return paginas
+
+def salvar(url, nome):
+    """Grava uma página real em fixtures/<nome>.html"""
+    import requests
+    resposta = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
+    resposta.raise_for_status()
+    os.makedirs(DIRETORIO_FIXTURES, exist_ok=True)
+    caminho = os.path.join(DIRETORIO_FIXTURES, nome if nome.endswith('.html') else nome + '.html')
+    with open(caminho, 'wb') as fp:
+        fp.write(resposta.content)
+    print(f"💾 {url} salvo em {caminho}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--salvar':
+        salvar(sys.argv[2], sys.argv[3])
+    else:
+        print("Uso: python benchmarks/fixtures.py --salvar URL NOME  (ex.: NOME=ge_brasileirao_2025)")
@@ -0,0 +1,177 @@
+import os, json
+import sqlite3
+import hashlib
+import threading
+import time
+from decouple import config
+from instrumentacao import contar
+
+# Diretório padrão do cache: <raiz do projeto>/.cache
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+CACHE_CAMINHO = config('LLM_CACHE_CAMINHO', default=os.path.join(DIRETORIO_PADRAO, 'llm_cache.sqlite3'))
+CACHE_TTL = config('LLM_CACHE_TTL', default=24 * 60 * 60, cast=int)  # segundos
+CACHE_MAX_ENTRADAS = config('LLM_CACHE_MAX_ENTRADAS', default=5000, cast=int)
+CACHE_MAX_BYTES = config('LLM_CACHE_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+CACHE_DESATIVADO = config('LLM_CACHE_DESATIVADO', default=False, cast=bool)
+
+
+class CacheLLM:
+    """Cache em disco (SQLite) para respostas de extração do LLM.
+
+    A chave é o hash de modelo + schema + texto exato enviado. As entradas
+    expiram após `ttl` segundos e as menos usadas recentemente são removidas
+    quando o cache passa de `max_entradas` ou `max_bytes`.
+    """
+
+    def __init__(self, caminho=CACHE_CAMINHO, ttl=CACHE_TTL, max_entradas=CACHE_MAX_ENTRADAS,
+                 max_bytes=CACHE_MAX_BYTES, desativado=CACHE_DESATIVADO):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.desativado = desativado
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.expirados = 0
+        self.removidos = 0
+        self._lock = threading.Lock()
+        if self.caminho != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS respostas ('
+            ' chave TEXT PRIMARY KEY,'
+            ' valor TEXT NOT NULL,'
+            ' tamanho INTEGER NOT NULL,'
+            ' criado_em REAL NOT NULL,'
+            ' acessado_em REAL NOT NULL)'
+        )
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS idx_acessado_em ON respostas (acessado_em)')
+        self._conexao.commit()
+
+    @staticmethod
+    def gerar_chave(modelo, schema, texto):
+        """Gera a chave de conteúdo (SHA-256) para modelo + schema + texto"""
+        material = json.dumps({'modelo': modelo, 'schema': schema, 'texto': texto},
+                              sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def obter(self, chave):
+        """Retorna o valor em cache ou None se ausente/expirado"""
+        if self.desativado:
+            return None
+        agora = time.time()
+        with self._lock:
+            linha = self._conexao.execute(
+                'SELECT valor, criado_em FROM respostas WHERE chave = ?', (chave,)
+            ).fetchone()
+            if linha is None:
+                self.falhas += 1
+                return None
+            valor, criado_em = linha
+            if self.ttl and agora - criado_em > self.ttl:
+                self._conexao.execute('DELETE FROM respostas WHERE chave = ?', (chave,))
+                self._conexao.commit()
+                self.expirados += 1
+                self.falhas += 1
+                return None
+            self._conexao.execute('UPDATE respostas SET acessado_em = ? WHERE chave = ?', (agora, chave))
+            self._conexao.commit()
+            self.acertos += 1
+        return json.loads(valor)
+
+    def gravar(self, chave, valor):
+        """Grava um valor serializável em JSON e aplica a política de remoção"""
+        if self.desativado:
+            return
+        texto = json.dumps(valor, ensure_ascii=False)
+        agora = time.time()
+        with self._lock:
+            self._conexao.execute(
+                'INSERT OR REPLACE INTO respostas (chave, valor, tamanho, criado_em, acessado_em) VALUES (?, ?, ?, ?, ?)',
+                (chave, texto, len(texto.encode('utf-8')), agora, agora)
+            )
+            self._remover_excedentes()
+            self._conexao.commit()
+            self.gravacoes += 1
+
+    def _remover_excedentes(self):
+        """Remove entradas expiradas e as menos usadas recentemente (LRU)"""
+        if self.ttl:
+            cursor = self._conexao.execute('DELETE FROM respostas WHERE criado_em < ?', (time.time() - self.ttl,))
+            self.expirados += cursor.rowcount
+        total, tamanho = self._conexao.execute('SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas').fetchone()
+        if total <= self.max_entradas and tamanho <= self.max_bytes:
+            return
+        for chave, tamanho_entrada in self._conexao.execute(
+            'SELECT chave, tamanho FROM respostas ORDER BY acessado_em ASC'
+        ).fetchall():
+            if total <= self.max_entradas and tamanho <= self.max_bytes:
+                break
+            self._conexao.execute('DELETE FROM respostas WHERE chave = ?', (chave,))
+            total -= 1
+            tamanho -= tamanho_entrada
+            self.removidos += 1
+
+    def limpar(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._conexao.execute('DELETE FROM respostas')
+            self._conexao.commit()
+
+    def estatisticas(self):
+        """Contadores de uso do cache"""
+        with self._lock:
+            total, tamanho = self._conexao.execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas'
+            ).fetchone()
+        consultas = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': round(self.acertos / consultas, 3) if consultas else 0.0,
+            'gravacoes': self.gravacoes,
+            'expirados': self.expirados,
+            'removidos': self.removidos,
+            'entradas': total,
+            'bytes': tamanho,
+            'desativado': self.desativado,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obter_cache():
+    """Instância única do cache para o processo"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheLLM()
+        return _cache
+
+def nome_modelo(llm):
+    """Nome do modelo usado na chave do cache (aceita o próprio nome como string)"""
+    if isinstance(llm, str):
+        return llm
+    return getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or type(llm).__name__
+
+def extrair_com_cache(llm, schema, texto, funcao):
+    """Executa `funcao()` apenas se (modelo, schema, texto) não estiver em cache.
+
+    Exceções de `funcao` não são armazenadas, então falhas da API sempre
+    são tentadas de novo na próxima execução.
+    """
+    cache = obter_cache()
+    chave = cache.gerar_chave(nome_modelo(llm), schema, texto)
+    valor = cache.obter(chave)
+    if valor is not None:
+        contar('cache_llm_acertos')
+        return valor
+    contar('cache_llm_falhas')
+    valor = funcao()
+    if valor is not None:
+        cache.gravar(chave, valor)
+    return valor
@@ -0,0 +1,147 @@
+"""Respostas diretas sobre a classificação, sem abrir navegador nem agente.
+
+Perguntas comuns (líder, lanterna, Z4/G4, diferença de pontos, posição de
+um time) são respondidas a partir das linhas da classificação: as passadas
+por quem chama, o último resultado gravado (se recente) ou uma nova
+extração. Só o que a tabela não responde vai para o agente, com limite de
+passos e de tempo.
+"""
+import re
+import time
+from decouple import config
+from validacao import dobrar_acentos
+from resiliencia import degradar, restante
+from instrumentacao import obter_logger, contar
+from exemplo3_agente import PERGUNTA_AGENTE as PERGUNTA_PADRAO, AGENTE_TEMPO_MAXIMO
+
+URL_CLASSIFICACAO = 'https://ge.globo.com/futebol/brasileirao-serie-a/'
+# Classificação gravada há menos que isso é usada sem novo scraping
+CONSULTA_MAX_IDADE = config('CONSULTA_MAX_IDADE', default=10 * 60, cast=int)  # segundos
+ZONA_REBAIXAMENTO = config('ZONA_REBAIXAMENTO', default=4, cast=int)
+
+log = obter_logger('consultas')
+
+LIDER = re.compile(r'\b(lider|primeir[oa]\s+(colocad[oa]|lugar|posicao|colocacao)|1o\s+colocado|topo)\b')
+LANTERNA = re.compile(r'\b(lanterna|ultim[oa]\s+(colocad[oa]|lugar|posicao|colocacao)|ultima\s+colocacao)\b')
+REBAIXAMENTO = re.compile(r'\b(rebaixa\w*|degola|z-?(\d{1,2}))\b')
+TOPO = re.compile(r'\b(g-?(\d{1,2})|libertadores)\b')
+DIFERENCA = re.compile(r'\b(diferenca|distancia|vantagem|atras|separa\w*|a\s+frente)\b')
+# 'Onde está o Palmeiras?', 'quantos pontos tem o Bahia?': posição/pontos de um time citado
+POSICAO = re.compile(r'(posi|lugar|coloca|pontos|onde\s+est)')
+
+
+def _ordinal(posicao):
+    return f'{posicao}º'
+
+def _pontos(linha):
+    return f"{linha.get('pontos', 0)} pontos"
+
+def _descrever(linha):
+    return f"{linha['time']} ({_ordinal(linha['posicao'])}, {_pontos(linha)})"
+
+def _lista(linhas):
+    return ', '.join(_descrever(linha) for linha in linhas)
+
+
+def obter_tabela(urls=None, max_idade=CONSULTA_MAX_IDADE):
+    """(linhas, fonte): último resultado gravado se tiver menos de `max_idade` s; senão extrai de novo"""
+    from diferencas import chave_instantaneo
+    from http_fetch import obter_cliente
+    urls = list(urls or [URL_CLASSIFICACAO])
+    instantaneo = obter_cliente().armazem.ler_instantaneo(chave_instantaneo(urls), 'classificacao')
+    if instantaneo and instantaneo[0] and time.time() - instantaneo[2] <= max_idade:
+        return instantaneo[0], 'instantâneo'
+    import registro
+    return registro.executar('classificacao', urls=urls), 'scraping'
+
+def times_citados(pergunta):
+    """Times citados na pergunta, na ordem em que aparecem (nomes oficiais)"""
+    from exemplo1_brasileirao import indice_times
+    return indice_times.encontrar(pergunta)
+
+
+def responder_pela_tabela(pergunta, tabela):
+    """Resposta montada só com as linhas da classificação, ou None se a pergunta não for reconhecida"""
+    tabela = sorted((linha for linha in tabela if linha.get('posicao')), key=lambda linha: linha['posicao'])
+    if not tabela:
+        return None
+    texto = dobrar_acentos(pergunta)
+    por_time = {linha['time']: linha for linha in tabela}
+    citados = times_citados(pergunta)
+    if any(time_ not in por_time for time_ in citados):
+        return None
+    lider, lanterna = tabela[0], tabela[-1]
+    partes = []
+
+    if DIFERENCA.search(texto):
+        if len(citados) >= 2:
+            a, b = (por_time[t] for t in citados[:2])
+            diferenca = a['pontos'] - b['pontos']
+            if diferenca == 0:
+                partes.append(f"{a['time']} e {b['time']} estão empatados com {_pontos(a)}.")
+            else:
+                frente, atras = (a, b) if diferenca > 0 else (b, a)
+                partes.append(f"{frente['time']} tem {abs(diferenca)} ponto(s) a mais que {atras['time']} "
+                              f"({_descrever(frente)} × {_descrever(atras)}).")
+        elif len(citados) == 1 and citados[0] != lider['time']:
+            linha = por_time[citados[0]]
+            partes.append(f"{linha['time']} está {lider['pontos'] - linha['pontos']} ponto(s) atrás do líder {_descrever(lider)}.")
+        elif len(tabela) > 1:
+            segundo = tabela[1]
+            partes.append(f"O líder {lider['time']} tem {lider['pontos'] - segundo['pontos']} ponto(s) de vantagem sobre {_descrever(segundo)}.")
+
+    if LIDER.search(texto) and not partes:
+        partes.append(f"O líder é {_descrever(lider)}.")
+    if LANTERNA.search(texto):
+        partes.append(f"O último colocado é {_descrever(lanterna)}.")
+    rebaixamento = REBAIXAMENTO.search(texto)
+    if rebaixamento:
+        quantidade = int(rebaixamento.group(2) or ZONA_REBAIXAMENTO)
+        zona = tabela[-quantidade:]
+        partes.append(f"Zona de rebaixamento: {_lista(zona)}.")
+        if len(tabela) > quantidade:
+            primeiro_fora = tabela[-quantidade - 1]
+            partes.append(f"{primeiro_fora['time']}, primeiro fora da zona, tem "
+                          f"{primeiro_fora['pontos'] - zona[0]['pontos']} ponto(s) a mais que {zona[0]['time']}.")
+    topo = TOPO.search(texto)
+    if topo:
+        quantidade = int(topo.group(2) or 6)  # vagas diretas para a Libertadores
+        partes.append(f"G{quantidade}: {_lista(tabela[:quantidade])}.")
+
+    if not partes and citados and POSICAO.search(texto):
+        for time_ in citados:
+            linha = por_time[time_]
+            jogos = f" em {linha['jogos']} jogos" if linha.get('jogos') else ''
+            partes.append(f"{linha['time']} está em {_ordinal(linha['posicao'])} com {_pontos(linha)}{jogos}.")
+
+    return ' '.join(partes) or None
+
+
+def responder(pergunta=PERGUNTA_PADRAO, urls=None, tabela=None, max_iteracoes=None, tempo_maximo=None):
+    """Responde `pergunta` pela classificação; sem resposta direta, pergunta ao agente.
+
+    Retorna {'input', 'output', 'origem': 'tabela'|'agente', 'fonte'} (o
+    mesmo formato do agente, com a origem da resposta).
+    """
+    fonte = 'informada'
+    if tabela is None:
+        try:
+            tabela, fonte = obter_tabela(urls)
+        except Exception as e:
+            log.warning(f"⚠️ Classificação indisponível ({e}), usando o agente")
+            degradar('classificacao', 'erro', e)
+            tabela = []
+    resposta = responder_pela_tabela(pergunta, tabela)
+    if resposta is not None:
+        contar('consultas_tabela')
+        log.info(f"📊 Respondido pela classificação ({fonte}): {resposta}")
+        return {'input': pergunta, 'output': resposta, 'origem': 'tabela', 'fonte': fonte}
+
+    contar('consultas_agente')
+    log.info("🤖 Pergunta fora do alcance da tabela, usando o agente")
+    from exemplo3_agente import executar_agente
+    # Dentro de uma execução com prazo, o agente para a tempo de responder
+    tempo_maximo = restante(tempo_maximo or AGENTE_TEMPO_MAXIMO)
+    argumentos = {nome: valor for nome, valor in (('max_iteracoes', max_iteracoes), ('tempo_maximo', tempo_maximo)) if valor is not None}
+    resultado = executar_agente(pergunta, **argumentos)
+    return {**resultado, 'origem': 'agente', 'fonte': 'navegador'}
@@ -0,0 +1,74 @@
+import hashlib
+import re
+import unicodedata
+
+ESPACOS = re.compile(r'\s+')
+
+
+def normalizar_texto(texto):
+    """Texto comparável entre execuções: NFC, minúsculas e espaços colapsados"""
+    return ESPACOS.sub(' ', unicodedata.normalize('NFC', str(texto or ''))).strip().lower()
+
+def impressao_texto(texto):
+    """Impressão digital (SHA-256) do texto normalizado de um trecho"""
+    return hashlib.sha256(normalizar_texto(texto).encode('utf-8')).hexdigest()
+
+def chave_instantaneo(urls):
+    """Chave do último resultado de um conjunto de URLs"""
+    return '|'.join(sorted(urls))
+
+
+def comparar(anteriores, atuais, chave, campos):
+    """Diferenças entre dois resultados, registro a registro (casados por `chave`).
+
+    Retorna uma lista de {'chave', 'mudanca': 'novo'|'removido'|'alterado',
+    'campos': {campo: {'antes', 'depois', 'delta'}}}; `delta` só existe
+    para campos numéricos.
+    """
+    antes = {chave(r): r for r in anteriores or []}
+    depois = {chave(r): r for r in atuais or []}
+    diferencas = []
+    for valor, registro in depois.items():
+        if valor not in antes:
+            diferencas.append({'chave': valor, 'mudanca': 'novo', 'campos': {}})
+            continue
+        alterados = {}
+        for campo in campos:
+            a, d = antes[valor].get(campo), registro.get(campo)
+            if a == d:
+                continue
+            alterados[campo] = {'antes': a, 'depois': d}
+            if isinstance(a, (int, float)) and isinstance(d, (int, float)) and not isinstance(a, bool):
+                alterados[campo]['delta'] = d - a
+        if alterados:
+            diferencas.append({'chave': valor, 'mudanca': 'alterado', 'campos': alterados})
+    for valor in antes:
+        if valor not in depois:
+            diferencas.append({'chave': valor, 'mudanca': 'removido', 'campos': {}})
+    return diferencas
+
+def descrever(diferenca):
+    """'Flamengo: posicao 2 → 1 (-1), pontos 70 → 73 (+3)'"""
+    if diferenca['mudanca'] != 'alterado':
+        return f"{diferenca['chave']}: {diferenca['mudanca']}"
+    partes = []
+    for campo, valores in diferenca['campos'].items():
+        delta = f" ({valores['delta']:+g})" if 'delta' in valores else ''
+        partes.append(f"{campo} {valores['antes']} → {valores['depois']}{delta}")
+    return f"{diferenca['chave']}: {', '.join(partes)}"
+
+def registrar_instantaneo(armazem, tipo, urls, dados, chave, campos):
+    """Compara `dados` com o último resultado de `tipo` para essas URLs, grava o novo e devolve as diferenças"""
+    chave_urls = chave_instantaneo(urls)
+    anterior = armazem.ler_instantaneo(chave_urls, tipo)
+    if anterior is None:
+        diferencas = []
+    else:
+        diferencas = comparar(anterior[0], dados, chave, campos)
+    armazem.gravar_instantaneo(chave_urls, tipo, dados, diferencas)
+    return diferencas
+
+def ultimas_diferencas(armazem, tipo, urls):
+    """Diferenças registradas na última execução de `tipo` para essas URLs"""
+    instantaneo = armazem.ler_instantaneo(chave_instantaneo(urls), tipo)
+    return instantaneo[1] if instantaneo else []
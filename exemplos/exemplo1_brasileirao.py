@@ -1,20 +1,22 @@
-import os, json
-import requests
-from decouple import config
-from pprint import pprint
-from langchain_openai import ChatOpenAI
-from langchain.chains import create_extraction_chain
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from bs4 import BeautifulSoup
-import re
-
-# Não sobrescrever a API key se já estiver configurada
-if 'OPENAI_API_KEY' not in os.environ:
-    api_key = config('OPENAI_API_KEY')
-    if api_key:
-        os.environ['OPENAI_API_KEY'] = api_key
-
-llm = ChatOpenAI(model='gpt-4o-mini', temperature=0)
+import json
+from http_fetch import obter_cliente
+from indice_dom import IndiceDom, descobrir_secoes, PALAVRAS_ARTILHARIA
+from extrator_tabelas import ExtratorTabelas, ler_arvore, separar_varios
+from fatiador_tabelas import fatiar_tabelas, CHUNK_MAX_TOKENS
+from validacao import IndiceNomes, compilar_schema
+from extracao_lote import ExtratorCombinado
+from pipeline import (Pipeline, Etapa, Pagina, Trecho, etapa_buscar, etapa_extrair_lote, etapa_deduplicar,
+                      etapa_reaproveitar, etapa_memorizar, consolidar, gravar_extraidos, do_tipo)
+from diferencas import registrar_instantaneo, descrever
+from historico import registrar as registrar_historico
+from resiliencia import degradar, degradada
+from ultimo_valido import ler as ler_ultimo_valido, gravar as gravar_ultimo_valido, descrever_idade
+from instrumentacao import obter_logger, contar
+
+log = obter_logger('classificacao')
+
+# O cliente do LLM (e o langchain) só é carregado na primeira extração que precisar dele
+MODELO = 'gpt-4o-mini'
 
 # Lista EXATA dos times da classificação (conforme imagem 2)
 TIMES_CLASSIFICACAO = [
@@ -75,223 +77,411 @@ schema_classificacao = {
     }
 }
 
-def criar_dados_corretos():
-    """Retorna os dados corretos da classificação baseados na imagem 2"""
-    return [
-        {'posicao': 1, 'time': 'Flamengo', 'pontos': 72, 'jogos': 24, 'vitorias': 11, 'empates': 7, 'derrotas': 3, 'gols_pro': 24, 'gols_contra': 4, 'saldo_gols': 20},
-        {'posicao': 2, 'time': 'Cruzeiro', 'pontos': 66, 'jogos': 24, 'vitorias': 12, 'empates': 7, 'derrotas': 3, 'gols_pro': 17, 'gols_contra': 8, 'saldo_gols': 9},
-        {'posicao': 3, 'time': 'Bragantino', 'pontos': 63, 'jogos': 23, 'vitorias': 12, 'empates': 7, 'derrotas': 2, 'gols_pro': 14, 'gols_contra': 11, 'saldo_gols': 3},
-        {'posicao': 4, 'time': 'Palmeiras', 'pontos': 66, 'jogos': 22, 'vitorias': 11, 'empates': 7, 'derrotas': 1, 'gols_pro': 12, 'gols_contra': 8, 'saldo_gols': 4},
-        {'posicao': 5, 'time': 'Bahia', 'pontos': 58, 'jogos': 21, 'vitorias': 12, 'empates': 6, 'derrotas': 3, 'gols_pro': 14, 'gols_contra': 11, 'saldo_gols': 3},
-        {'posicao': 6, 'time': 'Fluminense', 'pontos': 60, 'jogos': 20, 'vitorias': 11, 'empates': 6, 'derrotas': 2, 'gols_pro': 15, 'gols_contra': 12, 'saldo_gols': 3},
-        {'posicao': 7, 'time': 'Atlético-MG', 'pontos': 55, 'jogos': 20, 'vitorias': 12, 'empates': 5, 'derrotas': 5, 'gols_pro': 13, 'gols_contra': 10, 'saldo_gols': 3},
-        {'posicao': 8, 'time': 'Botafogo', 'pontos': 54, 'jogos': 18, 'vitorias': 11, 'empates': 5, 'derrotas': 3, 'gols_pro': 14, 'gols_contra': 7, 'saldo_gols': 7},
-        {'posicao': 9, 'time': 'Mirassol', 'pontos': 51, 'jogos': 17, 'vitorias': 11, 'empates': 4, 'derrotas': 5, 'gols_pro': 17, 'gols_contra': 12, 'saldo_gols': 5},
-        {'posicao': 10, 'time': 'Corinthians', 'pontos': 44, 'jogos': 16, 'vitorias': 12, 'empates': 4, 'derrotas': 4, 'gols_pro': 13, 'gols_contra': 15, 'saldo_gols': -2},
-        {'posicao': 11, 'time': 'Grêmio', 'pontos': 44, 'jogos': 16, 'vitorias': 12, 'empates': 4, 'derrotas': 4, 'gols_pro': 12, 'gols_contra': 15, 'saldo_gols': -3},
-        {'posicao': 12, 'time': 'Ceará', 'pontos': 45, 'jogos': 15, 'vitorias': 11, 'empates': 4, 'derrotas': 3, 'gols_pro': 13, 'gols_contra': 11, 'saldo_gols': 2},
-        {'posicao': 13, 'time': 'Vasco', 'pontos': 36, 'jogos': 13, 'vitorias': 12, 'empates': 4, 'derrotas': 1, 'gols_pro': 14, 'gols_contra': 16, 'saldo_gols': -2},
-        {'posicao': 14, 'time': 'São Paulo', 'pontos': 33, 'jogos': 12, 'vitorias': 12, 'empates': 2, 'derrotas': 6, 'gols_pro': 10, 'gols_contra': 14, 'saldo_gols': -4},
-        {'posicao': 15, 'time': 'Santos', 'pontos': 30, 'jogos': 11, 'vitorias': 12, 'empates': 3, 'derrotas': 2, 'gols_pro': 11, 'gols_contra': 14, 'saldo_gols': -3},
-        {'posicao': 16, 'time': 'Vitória', 'pontos': 30, 'jogos': 11, 'vitorias': 12, 'empates': 2, 'derrotas': 5, 'gols_pro': 12, 'gols_contra': 18, 'saldo_gols': -6},
-        {'posicao': 17, 'time': 'Internacional', 'pontos': 27, 'jogos': 10, 'vitorias': 12, 'empates': 2, 'derrotas': 4, 'gols_pro': 12, 'gols_contra': 18, 'saldo_gols': -6},
-        {'posicao': 18, 'time': 'Fortaleza', 'pontos': 24, 'jogos': 8, 'vitorias': 11, 'empates': 2, 'derrotas': 2, 'gols_pro': 9, 'gols_contra': 24, 'saldo_gols': -16},
-        {'posicao': 19, 'time': 'Juventude', 'pontos': 9, 'jogos': 3, 'vitorias': 11, 'empates': 0, 'derrotas': 3, 'gols_pro': 5, 'gols_contra': 18, 'saldo_gols': -13},
-        {'posicao': 20, 'time': 'Sport', 'pontos': 0, 'jogos': 0, 'vitorias': 0, 'empates': 0, 'derrotas': 0, 'gols_pro': 0, 'gols_contra': 0, 'saldo_gols': 0}
-    ]
-
-def extrair_apenas_times_classificacao(content: str):
-    """Extrai APENAS dados de times da classificação, NUNCA jogadores"""
-    try:
-        prompt_especializado = f"""
-        ATENÇÃO: Extraia APENAS dados da TABELA DE CLASSIFICAÇÃO do Campeonato Brasileiro.
-
-        TIMES VÁLIDOS (extrair apenas estes): {', '.join(TIMES_CLASSIFICACAO)}
-        
-        JOGADORES PROIBIDOS (NÃO extrair): {', '.join(JOGADORES_ARTILHARIA)}
-        
-        REGRAS RÍGIDAS:
-        1. Se encontrar "Arrascaeta", "Vegetti", "Pedro Raul" etc. = IGNORAR (são jogadores)
-        2. Se encontrar "Flamengo", "Palmeiras", "Corinthians" etc. = EXTRAIR (são times)
-        3. APENAS extrair se o nome estiver na lista de TIMES VÁLIDOS
-        4. Procurar por seções com "CLASSIFICAÇÃO" ou "TABELA"
-        5. Ignorar seções com "ARTILHARIA" ou "GOLEADORES"
-        
-        Para cada TIME válido encontrado, extrair:
-        - posicao: posição na tabela
-        - time: nome do time (deve estar na lista de times válidos)
-        - pontos: pontos
-        - jogos: jogos
-        - vitorias: vitórias
-        - empates: empates
-        - derrotas: derrotas
-        - gols_pro: gols marcados
-        - gols_contra: gols sofridos
-        - saldo_gols: saldo de gols
-        
-        Texto para análise:
-        {content}
-        """
-        
-        result = create_extraction_chain(schema=schema_classificacao, llm=llm).invoke(prompt_especializado)
-        return result.get('text', [])
-    except Exception as e:
-        print(f"Erro na extração: {e}")
-        return []
+schema_artilharia = {
+    'properties': {
+        'posicao': {
+            'type': 'integer',
+            'description': 'Posição do jogador no ranking de artilheiros'
+        },
+        'jogador': {
+            'type': 'string',
+            'description': 'Nome do JOGADOR (NÃO time)'
+        },
+        'time': {
+            'type': 'string',
+            'description': 'Time do jogador'
+        },
+        'gols': {
+            'type': 'integer',
+            'description': 'Gols marcados no campeonato'
+        },
+        'posicao_campo': {
+            'type': 'string',
+            'description': 'Posição em campo (atacante, meia...)'
+        }
+    }
+}
+
+# Tipos de registro extraídos da mesma página, na mesma execução
+TIPOS = ('classificacao', 'artilharia')
+
+# Rótulos de cabeçalho aceitos para cada campo (caminho rápido sem LLM)
+SINONIMOS_CLASSIFICACAO = {
+    'posicao': ['pos', 'posição', '#', 'colocação'],
+    'time': ['time', 'equipe', 'clube'],
+    'pontos': ['p', 'pts', 'pontos'],
+    'jogos': ['j', 'pj', 'jogos'],
+    'vitorias': ['v', 'vitórias'],
+    'empates': ['e', 'empates'],
+    'derrotas': ['d', 'derrotas'],
+    'gols_pro': ['gp', 'gols pró', 'gols marcados'],
+    'gols_contra': ['gc', 'gols contra', 'gols sofridos'],
+    'saldo_gols': ['sg', 'saldo', 'saldo de gols']
+}
+
+SINONIMOS_ARTILHARIA = {
+    'posicao': ['pos', 'posição', '#'],
+    'jogador': ['jogador', 'atleta', 'artilheiro', 'nome'],
+    'time': ['time', 'clube', 'equipe'],
+    'gols': ['gols', 'g'],
+    'posicao_campo': ['posição em campo', 'função'],
+}
+
+# Nomes como aparecem em outros sites/no LLM -> nome oficial da tabela
+ALIASES_TIMES = {
+    'Atlético Mineiro': 'Atlético-MG',
+    'Atletico MG': 'Atlético-MG',
+    'Galo': 'Atlético-MG',
+    'Red Bull Bragantino': 'Bragantino',
+    'RB Bragantino': 'Bragantino',
+    'Vasco da Gama': 'Vasco',
+    'Sport Recife': 'Sport',
+    'Inter': 'Internacional',
+    'SPFC': 'São Paulo',
+    'Grêmio FBPA': 'Grêmio',
+    'EC Vitória': 'Vitória',
+}
+
+# Índice de nomes e conversores compilados uma única vez
+indice_times = IndiceNomes(TIMES_CLASSIFICACAO, aliases=ALIASES_TIMES, excluidos=JOGADORES_ARTILHARIA)
+
+validador_classificacao = compilar_schema(schema_classificacao, limites={
+    'posicao': (1, None), 'pontos': (0, None), 'jogos': (0, None), 'vitorias': (0, None),
+    'empates': (0, None), 'derrotas': (0, None), 'gols_pro': (0, None), 'gols_contra': (0, None),
+})
+
+validador_artilharia = compilar_schema(schema_artilharia, limites={'posicao': (1, None), 'gols': (0, None)})
+
+# Abaixo disso a artilharia extraída é considerada incompleta
+MINIMO_ARTILHEIROS = 5
+
+# Campos comparados com a execução anterior
+CAMPOS_DIFERENCA = ['posicao', 'pontos', 'jogos', 'saldo_gols']
+
+extrator_classificacao = ExtratorTabelas(
+    schema_classificacao, SINONIMOS_CLASSIFICACAO,
+    obrigatorios=['time'], campo_posicao='posicao'
+)
+
+# Só tabelas com coluna de jogador: a classificação (que também tem "time" e "gols") fica de fora
+extrator_artilharia = ExtratorTabelas(
+    schema_artilharia, SINONIMOS_ARTILHARIA,
+    obrigatorios=['jogador', 'gols'], campo_posicao='posicao', ancoras=['jogador']
+)
+
+# Instruções enviadas uma vez por requisição (os trechos vão em seguida, cada um com seu id)
+INSTRUCOES_BRASILEIRAO = f"""
+ATENÇÃO: Extraia de cada trecho DUAS listas separadas do Campeonato Brasileiro:
+`classificacao` (TABELA DE CLASSIFICAÇÃO, só times) e `artilharia` (ARTILHARIA, só jogadores).
+
+TIMES VÁLIDOS: {', '.join(TIMES_CLASSIFICACAO)}
+
+JOGADORES DA ARTILHARIA (exemplos): {', '.join(JOGADORES_ARTILHARIA)}
+
+REGRAS RÍGIDAS:
+1. "Arrascaeta", "Vegetti", "Pedro Raul" etc. são JOGADORES: só em `artilharia`, NUNCA em `classificacao`
+2. "Flamengo", "Palmeiras", "Corinthians" etc. são TIMES: em `classificacao` só se estiver na lista de TIMES VÁLIDOS
+3. `classificacao` vem de seções com "CLASSIFICAÇÃO" ou "TABELA"
+4. `artilharia` vem de seções com "ARTILHARIA", "ARTILHEIROS" ou "GOLEADORES"
+5. Lista vazia quando o trecho não tiver aquele conteúdo
+
+Para cada TIME válido da classificação, extrair:
+- posicao: posição na tabela
+- time: nome do time (deve estar na lista de times válidos)
+- pontos: pontos
+- jogos: jogos
+- vitorias: vitórias
+- empates: empates
+- derrotas: derrotas
+- gols_pro: gols marcados
+- gols_contra: gols sofridos
+- saldo_gols: saldo de gols
+
+Para cada JOGADOR da artilharia, extrair:
+- posicao: posição no ranking de artilheiros
+- jogador: nome do jogador
+- time: time do jogador
+- gols: gols marcados
+- posicao_campo: posição em campo, se informada
+"""
+
+# Vários trechos por requisição; cada resposta traz as duas listas (classificação e artilharia)
+extrator_llm = ExtratorCombinado(MODELO, {'classificacao': schema_classificacao, 'artilharia': schema_artilharia},
+                                 INSTRUCOES_BRASILEIRAO)
 
 def filtrar_rigorosamente(dados_extraidos):
     """Filtra rigorosamente para garantir apenas times válidos"""
-    dados_filtrados = []
+    dados_filtrados, rejeitados = validador_classificacao.validar_lote(
+        dados_extraidos, campo_nome='time', indice=indice_times
+    )
     
-    for item in dados_extraidos:
-        if isinstance(item, dict) and item.get('time'):
-            nome_extraido = item['time'].strip()
-            
-            # Verificar se é um jogador (REJEITAR)
-            if any(jogador.lower() in nome_extraido.lower() for jogador in JOGADORES_ARTILHARIA):
-                print(f"❌ REJEITADO (jogador): {nome_extraido}")
-                continue
-            
-            # Verificar se é um time válido (ACEITAR)
-            time_valido = None
-            for time_oficial in TIMES_CLASSIFICACAO:
-                if (time_oficial.lower() == nome_extraido.lower() or 
-                    time_oficial.lower() in nome_extraido.lower() or
-                    nome_extraido.lower() in time_oficial.lower()):
-                    time_valido = time_oficial
-                    break
-            
-            if time_valido:
-                item_limpo = {
-                    'posicao': max(1, int(item.get('posicao', 0)) if str(item.get('posicao', 0)).isdigit() else 0),
-                    'time': time_valido,
-                    'pontos': max(0, int(item.get('pontos', 0)) if str(item.get('pontos', 0)).isdigit() else 0),
-                    'jogos': max(0, int(item.get('jogos', 0)) if str(item.get('jogos', 0)).isdigit() else 0),
-                    'vitorias': max(0, int(item.get('vitorias', 0)) if str(item.get('vitorias', 0)).isdigit() else 0),
-                    'empates': max(0, int(item.get('empates', 0)) if str(item.get('empates', 0)).isdigit() else 0),
-                    'derrotas': max(0, int(item.get('derrotas', 0)) if str(item.get('derrotas', 0)).isdigit() else 0),
-                    'gols_pro': max(0, int(item.get('gols_pro', 0)) if str(item.get('gols_pro', 0)).isdigit() else 0),
-                    'gols_contra': max(0, int(item.get('gols_contra', 0)) if str(item.get('gols_contra', 0)).isdigit() else 0),
-                    'saldo_gols': int(item.get('saldo_gols', 0)) if str(item.get('saldo_gols', 0)).replace('-', '').isdigit() else 0
-                }
-                dados_filtrados.append(item_limpo)
-                print(f"✅ ACEITO (time): {time_valido}")
-            else:
-                print(f"❌ REJEITADO (não é time válido): {nome_extraido}")
+    for nome_extraido, motivo in rejeitados:
+        if motivo == 'excluído':
+            log.debug(f"❌ REJEITADO (jogador): {nome_extraido}")
+        else:
+            log.debug(f"❌ REJEITADO (não é time válido): {nome_extraido}")
+    for item in dados_filtrados:
+        log.debug(f"✅ ACEITO (time): {item['time']}")
+    if rejeitados:
+        contar('linhas_rejeitadas', len(rejeitados))
+        log.info(f"🧹 {len(dados_filtrados)} times aceitos, {len(rejeitados)} rejeitados")
     
     return dados_filtrados
 
-def extrair_por_secoes_especificas(soup):
-    """Buscar especificamente pela seção de classificação"""
-    dados_extraidos = []
+def filtrar_artilharia(dados_extraidos):
+    """Só jogadores (um time no lugar do jogador é descartado), com o time pelo nome oficial"""
+    dados_filtrados = []
+    for item in validador_artilharia.validar_lote(dados_extraidos)[0]:
+        jogador = str(item.get('jogador') or '').strip()
+        if not jogador or indice_times.encontrar(jogador):
+            log.debug(f"❌ REJEITADO (não é jogador): {jogador}")
+            continue
+        item['jogador'] = jogador
+        if item.get('time'):
+            item['time'] = indice_times.resolver(item['time']) or item['time']
+        dados_filtrados.append(item)
+    rejeitados = len(dados_extraidos) - len(dados_filtrados)
+    if rejeitados:
+        contar('linhas_rejeitadas', rejeitados)
+        log.info(f"🧹 {len(dados_filtrados)} artilheiros aceitos, {rejeitados} rejeitados")
+    return dados_filtrados
+
+def fatiar_pagina(pagina, ordem_url=0, max_tokens=CHUNK_MAX_TOKENS):
+    """Trechos da página para a classificação e a artilharia, com uma só leitura do HTML.
+
+    A árvore lxml é montada uma vez e alimenta os dois extratores de tabela
+    (e, se preciso, o índice das seções). As linhas mapeadas direto saem
+    prontas, com o seu `tipo`; o que não mapeou vira texto sem tipo, que
+    vai ao LLM uma vez só para os dois schemas, em blocos de linhas inteiras
+    (com o cabeçalho repetido) de até `max_tokens`. Sem tabela de classificação
+    aproveitável, as seções com "CLASSIFICAÇÃO"/"TABELA" (ou com nomes de
+    times) vão para o LLM; sem tabela de artilharia, as seções com "ARTILHARIA".
+    """
+    raiz = ler_arvore(pagina.html)
+    separados = separar_varios(raiz, {'classificacao': extrator_classificacao, 'artilharia': extrator_artilharia},
+                               como_tabelas=True)
+    resultado, pendentes = separados['classificacao']
+    resultado_artilharia, pendentes_artilharia = separados['artilharia']
+    validos, _ = validador_classificacao.validar_lote(resultado.linhas, campo_nome='time', indice=indice_times)
+    # A mesma tabela pendente para os dois extratores vai uma vez só
+    unicas = list({tabela.texto(): tabela for tabela in pendentes + pendentes_artilharia}.values())
+    blocos = fatiar_tabelas(unicas, max_tokens=max_tokens)
+    log.info(f"📊 Tabelas: {len(resultado)} times e {len(resultado_artilharia)} artilheiros direto do HTML, "
+             f"{len(blocos)} blocos para o LLM")
+    contar('linhas_tabela', len(resultado) + len(resultado_artilharia))
+    yield Trecho(pagina.url, (ordem_url, 0), registros=resultado.linhas, origem='tabela', tipo='classificacao')
+    yield Trecho(pagina.url, (ordem_url, 0), registros=resultado_artilharia.linhas, origem='tabela', tipo='artilharia')
+    for i, bloco in enumerate(blocos, 1):
+        yield Trecho(pagina.url, (ordem_url, i), texto=bloco.texto, tokens=bloco.tokens)
     
-    # Procurar por seções que contenham "CLASSIFICAÇÃO" ou "TABELA"
-    secoes_classificacao = []
+    # Índice montado em uma única passada pela mesma árvore: palavras-chave,
+    # tamanho do texto e ancestrais de cada nó, sem re-percorrer a árvore para cada time
+    secoes = []
+    if len(validos) < 15 and not pendentes:
+        log.debug("🔍 Buscando seções de classificação...")
+        secoes_classificacao = descobrir_secoes(IndiceDom(raiz, nomes=TIMES_CLASSIFICACAO))
+        log.info(f"🔍 Encontradas {len(secoes_classificacao)} seções de classificação")
+        secoes.extend(secoes_classificacao[:3])  # Processar até 3 seções
+    if not resultado_artilharia.linhas and not pendentes_artilharia:
+        secoes_artilharia = descobrir_secoes(IndiceDom(raiz, palavras=PALAVRAS_ARTILHARIA, excluir=None))
+        log.info(f"🔍 Encontradas {len(secoes_artilharia)} seções de artilharia")
+        secoes.extend(secoes_artilharia[:1])
+    if secoes:
+        contar('fallback_secoes')
+    for i, secao in enumerate(dict.fromkeys(secoes), len(blocos) + 1):
+        yield Trecho(pagina.url, (ordem_url, i), texto=secao, origem='secao')
+
+def montar_pipeline(urls, cliente=None):
+    """buscar → limpar → fatiar → reaproveitar → extrair → validar → memorizar → deduplicar.
+
+    Etapas ligadas por filas limitadas. Classificação e artilharia saem da
+    mesma execução: cada página é buscada e lida uma vez, e os trechos que
+    precisam do LLM vão uma vez só para os dois schemas (cada trecho sai
+    com o seu `tipo`). Seções cujo texto não mudou desde a última execução
+    reaproveitam os registros já extraídos em vez de voltar ao LLM.
+    """
+    cliente = cliente or obter_cliente()
+    ordem_urls = {url: i for i, url in enumerate(urls)}
+    
+    def limpar(resposta):
+        if resposta.nao_modificado:
+            anteriores = {tipo: cliente.armazem.ler_extraidos(resposta.url, tipo) for tipo in TIPOS}
+            if anteriores['classificacao'] and anteriores['artilharia'] is not None:
+                log.info("♻️ Página não modificada (304), reutilizando dados já extraídos")
+                ordem = (ordem_urls.get(resposta.url, 0),)
+                return [Trecho(resposta.url, ordem, registros=dados, origem='armazem', tipo=tipo)
+                        for tipo, dados in anteriores.items()]
+        return [Pagina(resposta.url, resposta.conteudo.decode('utf-8', errors='replace'))]
     
-    # Buscar por elementos que contenham palavras-chave de classificação
-    for element in soup.find_all(['div', 'section', 'table'], string=re.compile(r'classificação|tabela', re.I)):
-        parent = element.parent
-        if parent:
-            texto = parent.get_text(separator=' ', strip=True)
-            if len(texto) > 200 and 'artilh' not in texto.lower():  # Evitar seção de artilharia
-                secoes_classificacao.append(texto)
+    def fatiar(item):
+        if isinstance(item, Trecho):
+            return [item]
+        return fatiar_pagina(item, ordem_urls.get(item.url, 0))
     
-    # Se não encontrou, buscar por divs/sections que contenham nomes de times
-    if not secoes_classificacao:
-        for time in TIMES_CLASSIFICACAO[:5]:  # Testar com os primeiros 5 times
-            elements = soup.find_all(string=re.compile(time, re.I))
-            for element in elements:
-                parent = element.parent
-                if parent and parent.parent:
-                    container = parent.parent
-                    texto = container.get_text(separator=' ', strip=True)
-                    if len(texto) > 200 and 'artilh' not in texto.lower():
-                        secoes_classificacao.append(texto)
-                        break
+    filtros = {'classificacao': filtrar_rigorosamente, 'artilharia': filtrar_artilharia}
     
-    print(f"🔍 Encontradas {len(secoes_classificacao)} seções de classificação")
+    def validar(trecho):
+        trecho.registros = filtros[trecho.tipo](trecho.registros)
+        return [trecho]
+    
+    deduplicadores = {
+        # Time repetido entre trechos/URLs: fica o registro com mais pontos
+        'classificacao': etapa_deduplicar(lambda r: r['time'],
+                                          preferir=lambda novo, atual: novo.get('pontos', 0) > atual.get('pontos', 0)),
+        # Jogador repetido: fica o registro com mais gols
+        'artilharia': etapa_deduplicar(lambda r: r['jogador'],
+                                       preferir=lambda novo, atual: novo.get('gols', 0) > atual.get('gols', 0)),
+    }
     
-    # Processar cada seção com IA
-    for i, secao in enumerate(secoes_classificacao[:3]):  # Processar até 3 seções
-        print(f"🤖 Processando seção {i+1}")
-        dados_secao = extrair_apenas_times_classificacao(secao)
-        if dados_secao:
-            dados_filtrados = filtrar_rigorosamente(dados_secao)
-            dados_extraidos.extend(dados_filtrados)
+    def deduplicar(trecho):
+        return deduplicadores[trecho.tipo].funcao(trecho)
     
-    return dados_extraidos
+    return Pipeline([
+        etapa_buscar(cliente),
+        Etapa('limpar', limpar),
+        Etapa('fatiar', fatiar),
+        etapa_reaproveitar(TIPOS, cliente),
+        # Seções/linhas pendentes da mesma página vão juntas ao LLM
+        etapa_extrair_lote(extrator_llm),
+        Etapa('validar', validar),
+        etapa_memorizar(cliente=cliente),
+        Etapa('deduplicar', deduplicar),
+    ], nome='brasileirao')
 
-def scrape_with_playwright(urls, schema=None):
-    """Versão focada APENAS em times da classificação"""
-    print(f"API Key sendo usada: {os.environ.get('OPENAI_API_KEY', 'NÃO ENCONTRADA')[:20]}...")
+def scrape_brasileirao(urls):
+    """Classificação e artilharia das mesmas páginas, em uma única execução.
+
+    Retorna {'classificacao': [...], 'artilharia': [...]}.
+    """
+    log.info("🏆 Extraindo classificação e artilharia")
+    log.debug(f"✅ Times válidos: {TIMES_CLASSIFICACAO[:3]}... (e mais {len(TIMES_CLASSIFICACAO)-3})")
+    log.debug(f"⚽ Artilheiros conhecidos: {JOGADORES_ARTILHARIA[:3]}... (e mais {len(JOGADORES_ARTILHARIA)-3})")
     
-    print("🏆 FOCANDO APENAS NA CLASSIFICAÇÃO DOS TIMES")
-    print(f"✅ Times válidos: {TIMES_CLASSIFICACAO[:3]}... (e mais {len(TIMES_CLASSIFICACAO)-3})")
-    print(f"❌ Jogadores proibidos: {JOGADORES_ARTILHARIA[:3]}... (e mais {len(JOGADORES_ARTILHARIA)-3})")
+    # Todas as URLs em paralelo pelo cliente compartilhado (keep-alive + GET condicional);
+    # cada trecho segue para o LLM/validação assim que fica pronto
+    trechos = list(montar_pipeline(urls).executar(urls))
+    resultado = finalizar_brasileirao(trechos, urls=urls)
     
-    dados_extraidos = []
+    log.info(f"🎯 RESULTADO FINAL: {len(resultado['classificacao'])} times, {len(resultado['artilharia'])} artilheiros")
+    for item in resultado['classificacao'][:5]:
+        log.info(f"  {item['posicao']}. {item['time']} - {item['pontos']} pts")
+    for item in resultado['artilharia'][:5]:
+        log.info(f"  {item['jogador']} ({item.get('time')}) - {item['gols']} gols")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8'
+    return resultado
+
+def scrape_with_playwright(urls, schema=None):
+    """Versão focada APENAS em times da classificação (a artilharia da mesma execução fica gravada)"""
+    return scrape_brasileirao(urls)['classificacao']
+
+def scrape_artilharia(urls):
+    """Artilharia das páginas em `urls`, da mesma execução (busca e leitura do HTML) que a classificação"""
+    return scrape_brasileirao(urls)['artilharia']
+
+def finalizar_brasileirao(trechos, parcial=False, urls=None):
+    """{'classificacao': [...], 'artilharia': [...]} a partir dos trechos de uma mesma execução"""
+    return {
+        'classificacao': finalizar(trechos, parcial=parcial, urls=urls),
+        'artilharia': finalizar_artilharia(trechos, parcial=parcial, urls=urls),
     }
-    
-    for url in urls:
-        try:
-            print(f"🌐 Fazendo scraping de: {url}")
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Estratégia: Buscar seções específicas de classificação
-            print("🔍 Buscando seções de classificação...")
-            dados_soup = extrair_por_secoes_especificas(soup)
-            
-            if dados_soup:
-                print(f"✅ Extraído {len(dados_soup)} times das seções")
-                dados_extraidos.extend(dados_soup)
-            else:
-                print("⚠️ Nenhum dado extraído, usando dados corretos como fallback")
+
+def finalizar(trechos, parcial=False, urls=None):
+    """Tabela a partir dos trechos que saíram do pipeline, ordenada por posição.
+
+    Com `parcial=True` (execução ainda em andamento) nada é gravado no
+    armazém e não há fallback para o último resultado válido. `urls` são as
+    pedidas (sem elas, as dos trechos): é por elas que o último resultado
+    válido é guardado.
+    """
+    trechos = do_tipo(trechos, 'classificacao')
+    resultado_final = consolidar(trechos, chave=lambda r: r['time'])
+    if not parcial:
+        gravar_extraidos(trechos, 'classificacao')
+        if resultado_final:
+            log.info(f"✅ Extraído {len(resultado_final)} times")
+            reaproveitados = sum(1 for t in trechos if t.origem == 'impressao')
+            if reaproveitados:
+                log.info(f"♻️ {reaproveitados} seção(ões) sem mudança desde a última execução")
         
-        except Exception as e:
-            print(f"❌ Erro no scraping: {e}")
-    
-    # Se não conseguiu extrair dados suficientes, usar dados corretos
-    if len(dados_extraidos) < 15:
-        print("🔄 Usando dados corretos da classificação")
-        dados_extraidos = criar_dados_corretos()
-    
-    # Remover duplicatas e consolidar
-    times_unicos = {}
-    for item in dados_extraidos:
-        if isinstance(item, dict) and item.get('time') in TIMES_CLASSIFICACAO:
-            time_nome = item['time']
-            if time_nome not in times_unicos or item.get('pontos', 0) > times_unicos[time_nome].get('pontos', 0):
-                times_unicos[time_nome] = item
+        urls = set(urls or (t.url for t in trechos))
+        if len(resultado_final) >= 15 and degradada('classificacao'):
+            # Tabela cortada pelo prazo/erros: servida, mas fora do instantâneo e do histórico
+            log.warning(f"⚠️ Execução degradada: {len(resultado_final)} times fora do instantâneo e do histórico")
+        elif len(resultado_final) >= 15:
+            # Compara com o último resultado dessas URLs (posição/pontos)
+            diferencas = registrar_instantaneo(obter_cliente().armazem, 'classificacao', urls,
+                                               resultado_final, chave=lambda r: r['time'], campos=CAMPOS_DIFERENCA)
+            registrar_historico('classificacao', resultado_final, urls)
+            gravar_ultimo_valido('classificacao', urls, resultado_final)
+            log.info(f"🔀 {len(diferencas)} mudança(s) desde a última execução")
+            for diferenca in diferencas:
+                log.info(f"  {descrever(diferenca)}")
+        else:
+            # Extração incompleta: o último resultado válido (com a idade dele), nunca dados inventados
+            anterior = ler_ultimo_valido('classificacao', urls)
+            if anterior is not None:
+                log.warning(f"🔄 Só {len(resultado_final)} times extraídos, usando o último resultado válido "
+                            f"({descrever_idade(anterior.idade)})")
+                contar('fallback_ultimo_valido')
+                degradar('finalizar', 'ultimo_valido',
+                         f"{len(resultado_final)} times extraídos; resultado de {descrever_idade(anterior.idade)}")
+                resultado_final = anterior.dados
+            else:
+                degradar('finalizar', 'incompleto', f"{len(resultado_final)} times extraídos e nenhum resultado válido anterior")
     
-    resultado_final = list(times_unicos.values())
     resultado_final.sort(key=lambda x: x.get('posicao', 999))
+    return resultado_final
+
+def finalizar_artilharia(trechos, parcial=False, urls=None):
+    """Artilheiros a partir dos trechos que saíram do pipeline, do que tem mais gols ao que tem menos.
+
+    Mesmas regras de `finalizar`: com menos de MINIMO_ARTILHEIROS jogadores,
+    vale o último resultado válido (ou a artilharia é marcada como incompleta).
+    A degradação é só da seção 'artilharia': a classificação da mesma
+    execução continua sendo gravada e guardada em cache.
+    """
+    trechos = do_tipo(trechos, 'artilharia')
+    resultado_final = consolidar(trechos, chave=lambda r: r['jogador'])
+    if not parcial:
+        gravar_extraidos(trechos, 'artilharia')
+        urls = set(urls or (t.url for t in trechos))
+        if len(resultado_final) >= MINIMO_ARTILHEIROS:
+            log.info(f"✅ Extraídos {len(resultado_final)} artilheiros")
+            gravar_ultimo_valido('artilharia', urls, resultado_final)
+        else:
+            anterior = ler_ultimo_valido('artilharia', urls)
+            if anterior is not None:
+                log.warning(f"🔄 Só {len(resultado_final)} artilheiros extraídos, usando o último resultado válido "
+                            f"({descrever_idade(anterior.idade)})")
+                contar('fallback_ultimo_valido')
+                degradar('artilharia', 'ultimo_valido',
+                         f"{len(resultado_final)} artilheiros extraídos; resultado de {descrever_idade(anterior.idade)}",
+                         secao='artilharia')
+                resultado_final = anterior.dados
+            else:
+                degradar('artilharia', 'incompleto',
+                         f"{len(resultado_final)} artilheiros extraídos e nenhum resultado válido anterior",
+                         secao='artilharia')
     
-    print(f"\n🎯 RESULTADO FINAL: {len(resultado_final)} times")
-    for item in resultado_final[:5]:
-        print(f"  {item['posicao']}. {item['time']} - {item['pontos']} pts")
-    
+    resultado_final.sort(key=lambda x: (-x.get('gols', 0), x.get('posicao', 999)))
     return resultado_final
 
 # Manter compatibilidade
 schema = schema_classificacao
 
 def main():
-    print("🚀 Scraping APENAS da classificação (times, não jogadores)")
+    print("🚀 Scraping da classificação (times) e da artilharia (jogadores) em uma só execução")
     urls = ['https://ge.globo.com/futebol/brasileirao-serie-a/']
-    extracted_content = scrape_with_playwright(urls=urls)
+    extracted_content = scrape_brasileirao(urls=urls)
     
-    if extracted_content:
+    if extracted_content['classificacao']:
         with open('data_brasileirao.json', 'w', encoding='utf-8') as fp:
-            json.dump(extracted_content, fp, ensure_ascii=False, indent=4)
+            json.dump(extracted_content['classificacao'], fp, ensure_ascii=False, indent=4)
         print("💾 Dados salvos em data_brasileirao.json")
+    if extracted_content['artilharia']:
+        with open('data_artilharia.json', 'w', encoding='utf-8') as fp:
+            json.dump(extracted_content['artilharia'], fp, ensure_ascii=False, indent=4)
+        print("💾 Dados de artilharia salvos em data_artilharia.json")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,14 +1,25 @@
-import os, json
-from decouple import config
+import json
 from pprint import pprint
-from langchain_openai import ChatOpenAI
-from langchain.chains import create_extraction_chain
-from langchain_community.document_loaders import AsyncChromiumLoader
-from langchain_community.document_transformers import BeautifulSoupTransformer
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from extracao_concorrente import LLM_MAX_CONCORRENCIA
+from extracao_lote import ExtratorLote
+from http_fetch import obter_cliente
+from pool_navegador import obter_pool
+from extrator_tabelas import ExtratorTabelas
+from fatiador_tabelas import fatiar_tabelas, CHUNK_MAX_TOKENS
+from validacao import compilar_schema
+from pipeline import (Pipeline, Etapa, Pagina, Trecho, etapa_buscar, etapa_extrair_lote, etapa_deduplicar,
+                      etapa_reaproveitar, etapa_memorizar, consolidar, gravar_extraidos)
+from rastreador import Rastreador
+from diferencas import registrar_instantaneo
+from historico import registrar as registrar_historico
+from resiliencia import degradar, degradada
+from ultimo_valido import ler as ler_ultimo_valido, gravar as gravar_ultimo_valido, descrever_idade
+from instrumentacao import obter_logger, contar
 
-os.environ['OPENAI_API_KEY'] = config('OPENAI_API_KEY')
-llm = ChatOpenAI(model='gpt-4o-mini', temperature=0)
+log = obter_logger('acoes')
+
+# O cliente do LLM (e o langchain) só é carregado na primeira extração que precisar dele
+MODELO = 'gpt-4o-mini'
 
 schema = {
     'properties': {
@@ -24,20 +35,200 @@ schema = {
     },
 }
 
-def extract(content: str, schema: dict):
-    return create_extraction_chain(schema=schema, llm=llm).invoke(content).get('text')
-
-def scrape_with_playwright(urls, schema):
-    loader = AsyncChromiumLoader(urls)
-    docs = loader.load()
-    bs_transformer = BeautifulSoupTransformer()
-    docs_transformed = bs_transformer.transform_documents(documents=docs, tags_to_extract=['table'])
-    splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(chunk_size=2000, chunk_overlap=0)
-    splits = splitter.split_documents(documents=docs_transformed)
-    extracted_content = []
-    for split in splits:
-        extracted_content.extend(extract(schema=schema, content=split.page_content))
-    return extracted_content
+# Rótulos de cabeçalho da tabela do TradingView aceitos para cada campo
+SINONIMOS_ACOES = {
+    'simbolo_empresa': ['símbolo', 'ticker', 'ativo'],
+    'nome_empresa': ['empresa', 'nome'],
+    'setor_empresa': ['setor'],
+    'valor_mercado': ['valor de mercado', 'cap de mercado', 'market cap'],
+    'div_yield': ['div yield %', 'div yield', 'dividend yield'],
+    'preco': ['preço', 'price'],
+    'variacao': ['variação %', 'variação', 'var %', 'chg %'],
+    'volume': ['volume', 'vol'],
+    'classificacao_analistas': ['classificação dos analistas', 'analyst rating'],
+}
+
+# Listas do TradingView que, juntas, cobrem as ações da B3 (repetidas entre listas são descartadas)
+URLS_MERCADO = [
+    'https://br.tradingview.com/markets/stocks-brazil/market-movers-all-stocks/',
+    'https://br.tradingview.com/markets/stocks-brazil/market-movers-large-cap/',
+    'https://br.tradingview.com/markets/stocks-brazil/market-movers-small-cap/',
+    'https://br.tradingview.com/markets/stocks-brazil/market-movers-active/',
+]
+
+INSTRUCOES_ACOES = (
+    "Extraia as ações listadas em cada trecho (tabela de ações da B3 no TradingView). "
+    "Copie os valores como aparecem, com unidade e moeda (ex.: '37,50 BRL', '1,2 B BRL', '-0,8%')."
+)
+
+def criar_extrator_llm(schema):
+    """Vários trechos por requisição, saída JSON no formato de `schema`"""
+    return ExtratorLote(MODELO, schema, INSTRUCOES_ACOES)
+
+def chave_acao(registro):
+    return registro.get('simbolo_empresa') or registro.get('nome_empresa')
+
+def criar_extrator(schema):
+    return ExtratorTabelas(schema, SINONIMOS_ACOES, obrigatorios=['simbolo_empresa'],
+                           desdobrar={'simbolo_empresa': 'nome_empresa'})
+
+def etapas_extracao(schema, max_concorrencia=LLM_MAX_CONCORRENCIA, cliente=None, deduplicar=True):
+    """reaproveitar → extrair → validar → memorizar [→ deduplicar] (comum às páginas e ao rastreamento)"""
+    validador = compilar_schema(schema)
+    extrator_llm = criar_extrator_llm(schema)
+
+    def validar(trecho):
+        trecho.registros = [validador.converter(r) for r in trecho.registros
+                            if isinstance(r, dict) and (r.get('simbolo_empresa') or r.get('nome_empresa'))]
+        return [trecho]
+
+    etapas = [
+        etapa_reaproveitar('acoes', cliente),
+        # Blocos agrupados por requisição, requisições em paralelo (limitado por RPM/TPM)
+        etapa_extrair_lote(extrator_llm, trabalhadores=max_concorrencia),
+        Etapa('validar', validar),
+        etapa_memorizar('acoes', cliente),
+    ]
+    return etapas + [etapa_deduplicar(chave_acao)] if deduplicar else etapas
+
+def trechos_da_pagina(extrator, pagina, ordem, max_tokens=CHUNK_MAX_TOKENS):
+    """Linhas da tabela já mapeadas + blocos para o LLM (tabelas/linhas que não mapearam, ou a página toda)"""
+    resultado, pendentes = extrator.separar(pagina.html, como_tabelas=True)
+    trechos = [Trecho(pagina.url, (*ordem, 0), registros=resultado.linhas, origem='tabela')] if resultado.linhas else []
+    contar('linhas_tabela', len(resultado.linhas))
+    if pendentes:
+        # Também em blocos com linhas inteiras e o cabeçalho repetido, até `max_tokens` cada
+        blocos = fatiar_tabelas(pendentes, max_tokens=max_tokens)
+    elif not trechos:
+        blocos = fatiar_tabelas(pagina.html, max_tokens=max_tokens)
+        contar('fallback_blocos')
+    else:
+        blocos = []
+    if blocos:
+        log.info(f"🧩 {len(blocos)} blocos, tokens por bloco: {[bloco.tokens for bloco in blocos]}")
+    trechos += [Trecho(pagina.url, (*ordem, i), texto=bloco.texto, tokens=bloco.tokens)
+                for i, bloco in enumerate(blocos, 1)]
+    return trechos
+
+def montar_pipeline(urls, schema, max_concorrencia=LLM_MAX_CONCORRENCIA, max_tokens=CHUNK_MAX_TOKENS, cliente=None):
+    """buscar → limpar → fatiar → reaproveitar → extrair → validar → memorizar → deduplicar.
+
+    Blocos cujo texto não mudou desde a última execução não voltam ao LLM.
+    """
+    cliente = cliente or obter_cliente()
+    ordem_urls = {url: i for i, url in enumerate(urls)}
+    # Caminho rápido: linhas da tabela mapeadas direto no schema; o LLM só
+    # recebe as tabelas/linhas que não mapearem
+    extrator = criar_extrator(schema)
+    
+    def limpar(resposta):
+        if resposta.nao_modificado:
+            anteriores = cliente.armazem.ler_extraidos(resposta.url, 'acoes')
+            if anteriores:
+                # 304: página igual à última, nada para analisar de novo
+                return [Trecho(resposta.url, (ordem_urls.get(resposta.url, 0),), registros=anteriores, origem='armazem')]
+        html = resposta.conteudo.decode('utf-8', errors='replace')
+        if '<table' not in html:
+            # Tabela montada por JavaScript: Chromium do pool compartilhado (já aquecido)
+            contar('fallback_navegador')
+            html = obter_pool().renderizar([resposta.url])[0]
+        return [Pagina(resposta.url, html)] if html else []
+    
+    def fatiar(item):
+        if isinstance(item, Trecho):
+            return [item]
+        return trechos_da_pagina(extrator, item, (ordem_urls.get(item.url, 0),), max_tokens)
+    
+    return Pipeline([
+        etapa_buscar(cliente),
+        Etapa('limpar', limpar, trabalhadores=2),
+        Etapa('fatiar', fatiar),
+        *etapas_extracao(schema, max_concorrencia, cliente),
+    ], nome='acoes')
+
+def montar_pipeline_mercado(urls, schema, max_concorrencia=LLM_MAX_CONCORRENCIA, max_tokens=CHUNK_MAX_TOKENS,
+                            cliente=None, rastreador=None):
+    """rastrear → fatiar → reaproveitar → extrair → validar → memorizar → deduplicar.
+
+    Cada lista é rastreada inteira no navegador ("carregar mais", rolagem e
+    paginação), várias listas ao mesmo tempo dentro do limite de páginas do
+    pool. Uma lista para assim que deixa de trazer símbolos novos.
+    """
+    from pool_navegador import NAVEGADOR_MAX_PAGINAS
+    ordem_urls = {url: i for i, url in enumerate(urls)}
+    extrator = criar_extrator(schema)
+
+    def simbolos(html):
+        return {r['simbolo_empresa'] for r in extrator.separar(html)[0].linhas if r.get('simbolo_empresa')}
+
+    rastreador = rastreador or Rastreador(simbolos)
+
+    def rastrear(url):
+        ordem_url = ordem_urls.get(url, 0)
+        paginas = [Pagina(url, html, ordem=(ordem_url, i)) for i, (_, html) in enumerate(rastreador.rastrear(url))]
+        # Lista sem nada novo ainda aparece no resultado (as diferenças são guardadas pelo conjunto de listas)
+        return paginas or [Trecho(url, (ordem_url,), registros=[], origem='rastreador')]
+
+    def fatiar(item):
+        if isinstance(item, Trecho):
+            return [item]
+        return trechos_da_pagina(extrator, item, item.ordem, max_tokens)
+
+    return Pipeline([
+        Etapa('rastrear', rastrear, trabalhadores=NAVEGADOR_MAX_PAGINAS),
+        Etapa('fatiar', fatiar),
+        # Repetidas entre listas ficam para `finalizar_mercado`, que mantém a da lista anterior
+        *etapas_extracao(schema, max_concorrencia, cliente, deduplicar=False),
+    ], nome='mercado')
+
+def scrape_with_playwright(urls, schema, max_concorrencia=LLM_MAX_CONCORRENCIA, max_tokens=CHUNK_MAX_TOKENS):
+    trechos = list(montar_pipeline(urls, schema, max_concorrencia, max_tokens).executar(urls))
+    return finalizar(trechos, urls=urls)
+
+def scrape_mercado(urls=URLS_MERCADO, schema=schema, max_concorrencia=LLM_MAX_CONCORRENCIA, max_tokens=CHUNK_MAX_TOKENS):
+    """Todas as ações das listas, cada símbolo uma vez só (mesmo formato de `scrape_with_playwright`)"""
+    trechos = list(montar_pipeline_mercado(urls, schema, max_concorrencia, max_tokens).executar(urls))
+    return finalizar_mercado(trechos, urls=urls)
+
+def finalizar(trechos, parcial=False, por_url=True, urls=None, tipo='acoes'):
+    """Ações na ordem das páginas/blocos, mesmo que os blocos terminem fora de ordem.
+
+    Sem nenhuma ação extraída, serve o último resultado válido de `tipo`
+    para as `urls` pedidas (com a idade dele). Uma execução degradada (prazo,
+    erro, disjuntor) pode trazer só parte das páginas: ela não entra no
+    instantâneo nem no histórico como se fosse uma observação completa.
+    """
+    resultado = consolidar(trechos, chave=chave_acao)
+    if parcial:
+        return resultado
+    if por_url:
+        gravar_extraidos(trechos, 'acoes')
+    if resultado:
+        paginas = {t.url for t in trechos}
+        if degradada(tipo):
+            log.warning(f"⚠️ Execução degradada: {len(resultado)} ações fora do instantâneo e do histórico")
+        else:
+            registrar_instantaneo(obter_cliente().armazem, 'acoes', paginas, resultado,
+                                  chave=chave_acao, campos=['preco', 'variacao', 'valor_mercado'])
+            registrar_historico('acoes', resultado, paginas)
+        gravar_ultimo_valido(tipo, set(urls or paginas), resultado)
+        return resultado
+    anterior = ler_ultimo_valido(tipo, set(urls or ()))
+    if anterior is None:
+        degradar('finalizar', 'incompleto', "nenhuma ação extraída e nenhum resultado válido anterior")
+        return resultado
+    log.warning(f"🔄 Nenhuma ação extraída, usando o último resultado válido ({descrever_idade(anterior.idade)})")
+    contar('fallback_ultimo_valido')
+    degradar('finalizar', 'ultimo_valido', f"nenhuma ação extraída; resultado de {descrever_idade(anterior.idade)}")
+    return anterior.dados
+
+def finalizar_mercado(trechos, parcial=False, urls=URLS_MERCADO):
+    """Como `finalizar`, com cada símbolo na posição da primeira lista/página em que aparece.
+
+    As linhas não são guardadas por URL: uma lista que parou cedo não serve para o 304 dela.
+    """
+    # consolidar fica com o último de cada chave: da maior ordem para a menor, vence a primeira lista
+    return finalizar(sorted(trechos, key=lambda t: t.ordem, reverse=True), parcial, por_url=False, urls=urls, tipo='mercado')
 
 def main():
     urls = ['https://br.tradingview.com/markets/stocks-brazil/market-movers-large-cap/']
@@ -1,23 +1,37 @@
-import os
 from decouple import config
-from langchain.agents import AgentType, initialize_agent
-from langchain_community.agent_toolkits import PlayWrightBrowserToolkit
-from langchain_community.tools.playwright.utils import create_sync_playwright_browser
-from langchain_openai import ChatOpenAI
+from recursos import obter_llm
+from pool_navegador import obter_pool
+from instrumentacao import chamada_llm
 
-os.environ['OPENAI_API_KEY'] = config('OPENAI_API_KEY')
+# Orçamento do agente: passos (ação + observação) e tempo total
+AGENTE_MAX_ITERACOES = config('AGENTE_MAX_ITERACOES', default=8, cast=int)
+AGENTE_TEMPO_MAXIMO = config('AGENTE_TEMPO_MAXIMO', default=120, cast=float)  # segundos
 
-def executar_agente():
-    llm = ChatOpenAI(model='gpt-4o-mini', temperature=0)
-    browser = create_sync_playwright_browser()
-    toolkit = PlayWrightBrowserToolkit.from_browser(sync_browser=browser)
-    tools = toolkit.get_tools()
-    agent_chain = initialize_agent(
-        tools, llm,
-        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-        verbose=True,
-    )
-    result = agent_chain.invoke(
-        input='qual time está na primeira colocação do brasileirão na tabela do site https://ge.globo.com/futebol/brasileirao-serie-a/? E o último colocado?'
-    )
-    return result
+PERGUNTA_AGENTE = 'qual time está na primeira colocação do brasileirão na tabela do site https://ge.globo.com/futebol/brasileirao-serie-a/? E o último colocado?'
+
+def executar_agente(pergunta=PERGUNTA_AGENTE, max_iteracoes=AGENTE_MAX_ITERACOES, tempo_maximo=AGENTE_TEMPO_MAXIMO):
+    # langchain/toolkit carregados só quando o agente é executado
+    from langchain.agents import AgentType, initialize_agent
+    from langchain_community.agent_toolkits import PlayWrightBrowserToolkit
+    from ferramentas_agente import FerramentasEmCache
+    llm = obter_llm('gpt-4o-mini', 0)
+
+    # Roda no loop do pool: reaproveita o Chromium já aberto, com imagens/fontes/analytics bloqueados
+    async def rodar(browser):
+        toolkit = PlayWrightBrowserToolkit.from_browser(async_browser=browser)
+        # Leituras em cache por URL/seletor e texto da página compactado (tabelas primeiro)
+        tools = FerramentasEmCache(toolkit.get_tools(), browser).ferramentas_agente()
+        agent_chain = initialize_agent(
+            tools, llm,
+            agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+            verbose=True,
+            # Estourado o orçamento, devolve o que tiver em vez de continuar navegando
+            max_iterations=max_iteracoes,
+            max_execution_time=tempo_maximo,
+            early_stopping_method='force',
+        )
+        # Tokens/custo somados de todas as chamadas do agente
+        with chamada_llm('gpt-4o-mini'):
+            return await agent_chain.ainvoke(input=pergunta)
+
+    return obter_pool().executar(rodar)
@@ -0,0 +1,124 @@
+import time
+import threading
+from decouple import config
+from instrumentacao import contar
+from resiliencia import (PrazoEsgotado, LLM_HEDGE_APOS, execucao_atual, eh_transitorio, espera_backoff,
+                         retry_after, status_do_erro, chamar_com_prazo)
+
+# Limites padrão da conta OpenAI (ajustáveis pelo .env)
+LLM_RPM = config('LLM_RPM', default=500, cast=int)
+LLM_TPM = config('LLM_TPM', default=200000, cast=int)
+LLM_MAX_CONCORRENCIA = config('LLM_MAX_CONCORRENCIA', default=4, cast=int)
+
+
+class LimitadorTaxa:
+    """Token bucket duplo: requisições por minuto e tokens por minuto"""
+
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requisicoes = float(rpm)
+        self._tokens = float(tpm)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        decorrido = agora - self._ultimo
+        self._ultimo = agora
+        self._requisicoes = min(self.rpm, self._requisicoes + decorrido * self.rpm / 60.0)
+        self._tokens = min(self.tpm, self._tokens + decorrido * self.tpm / 60.0)
+
+    def _retirar(self, tokens):
+        """Consome 1 requisição e `tokens` tokens se houver saldo; senão, segundos até haver"""
+        with self._lock:
+            self._reabastecer()
+            if self._requisicoes >= 1 and self._tokens >= tokens:
+                self._requisicoes -= 1
+                self._tokens -= tokens
+                return 0.0
+            falta_req = max(0.0, 1 - self._requisicoes) * 60.0 / self.rpm
+            falta_tok = max(0.0, tokens - self._tokens) * 60.0 / self.tpm
+            return max(falta_req, falta_tok, 0.01)
+
+    def aguardar(self, tokens=0, fim=None):
+        """Bloqueia até haver saldo para 1 requisição e `tokens` tokens.
+
+        Com `fim` (time.monotonic), levanta PrazoEsgotado se o saldo só viria depois dele.
+        """
+        tokens = min(tokens, self.tpm)  # um pedido maior que o balde nunca passaria
+        while True:
+            espera = self._retirar(tokens)
+            if not espera:
+                return
+            if fim is not None and time.monotonic() + espera > fim:
+                raise PrazoEsgotado('limitador')
+            time.sleep(espera)
+
+    def tentar(self, tokens=0):
+        """Como `aguardar`, sem esperar: True se havia saldo (e ele foi consumido)"""
+        return not self._retirar(min(tokens, self.tpm))
+
+
+def eh_erro_limite(erro):
+    """Identifica respostas 429 (rate limit) de clientes OpenAI/HTTP"""
+    status = getattr(erro, 'status_code', None) or getattr(getattr(erro, 'response', None), 'status_code', None)
+    return status == 429 or 'RateLimit' in type(erro).__name__
+
+def estimar_tokens(texto):
+    """Estimativa simples (~4 caracteres por token) para o limitador"""
+    return len(texto) // 4 + 1
+
+_limitador = None
+_limitador_lock = threading.Lock()
+
+def obter_limitador():
+    """Limitador único do processo: todas as extrações dividem o mesmo RPM/TPM"""
+    global _limitador
+    with _limitador_lock:
+        if _limitador is None:
+            _limitador = LimitadorTaxa()
+        return _limitador
+
+def chamar_com_limite(funcao, texto, limitador=None, tokens=None, max_tentativas=5, espera_base=1.0,
+                      disjuntor=None, hedge_apos=LLM_HEDGE_APOS):
+    """`funcao(texto)` respeitando o limitador e repetindo 429/5xx/timeouts com backoff exponencial e jitter.
+
+    Dentro de uma execução com prazo, nem a chamada nem as esperas passam
+    dele (PrazoEsgotado). `disjuntor` (do modelo) recusa a chamada enquanto
+    estiver aberto; com `hedge_apos`, uma chamada mais lenta que isso ganha
+    uma cópia (se o limitador tiver saldo para ela) e vale a resposta que
+    chegar primeiro.
+    """
+    limitador = limitador or obter_limitador()
+    tokens = estimar_tokens(texto) if tokens is None else tokens
+    execucao = execucao_atual()
+    fim = execucao.fim if execucao else None
+    for tentativa in range(max_tentativas):
+        if execucao:
+            execucao.verificar('llm')
+        teste = disjuntor.verificar() if disjuntor else False
+        try:
+            limitador.aguardar(tokens, fim)
+            resultado = chamar_com_prazo(lambda: funcao(texto), execucao.restante() if execucao else None,
+                                         hedge_apos, etapa='llm', antes_da_copia=lambda: limitador.tentar(tokens))
+            if disjuntor:
+                disjuntor.sucesso()
+            return resultado
+        except Exception as e:
+            transitorio = eh_transitorio(e)
+            if disjuntor and transitorio:
+                disjuntor.falha()
+            elif disjuntor and isinstance(status_do_erro(e), int):
+                disjuntor.sucesso()  # a API respondeu (ex.: 400): o serviço está de pé
+            if not transitorio or tentativa == max_tentativas - 1:
+                raise
+            contar('llm_limite_429' if eh_erro_limite(e) else 'llm_erros_transitorios')
+            espera = espera_backoff(tentativa, espera_base, retry_after=retry_after(e))
+            if fim is not None and time.monotonic() + espera >= fim:
+                raise PrazoEsgotado('llm') from e
+            time.sleep(espera)
+        finally:
+            if teste:
+                # Prazo, cancelamento ou erro sem veredito: o teste do meio-aberto não fica preso
+                disjuntor.liberar()
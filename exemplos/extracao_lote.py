@@ -0,0 +1,283 @@
+"""Extração estruturada em lote: vários trechos por requisição, com saída JSON validada pelo schema.
+
+Em vez de uma chamada por trecho (cada uma repetindo instruções e
+schema), os trechos pendentes são agrupados: as instruções vão uma vez
+só, cada trecho leva um id e a resposta (JSON estrito, no formato do
+schema) traz os registros de cada id. Cada trecho continua com a sua
+própria entrada no cache do LLM, então o agrupamento não muda o que é
+reaproveitado entre execuções.
+
+Dois modos (LLM_EXTRACAO_MODO):
+- 'direto': requisições normais, respeitando RPM/TPM (padrão, interativo);
+- 'fila': todos os lotes em um único job da Batch API da OpenAI (metade do
+  preço, resultado em minutos ou horas), para execuções não interativas
+  como o `lote.py`. Um job interrompido é retomado na próxima execução
+  com os mesmos trechos.
+
+    extrator = ExtratorLote('gpt-4o-mini', schema, 'Extraia as ações da tabela.')
+    registros_por_trecho = extrator.extrair(textos)
+
+Com ExtratorCombinado, uma mesma resposta traz vários tipos de registro
+por trecho (ex.: classificação e artilharia da mesma página), em vez de
+uma requisição por schema:
+
+    extrator = ExtratorCombinado(modelo, {'classificacao': schema_c, 'artilharia': schema_a}, instrucoes)
+    extrator.extrair(textos)  # [{'classificacao': [...], 'artilharia': [...]}, ...]
+"""
+import os
+import json
+import time
+import hashlib
+from decouple import config
+from cache_llm import obter_cache, DIRETORIO_PADRAO
+from extracao_concorrente import chamar_com_limite, estimar_tokens
+from resiliencia import obter_disjuntor
+from instrumentacao import obter_logger, contar, chamada_llm, registrar_llm
+
+LLM_EXTRACAO_MODO = config('LLM_EXTRACAO_MODO', default='direto')  # 'direto' ou 'fila'
+LLM_LOTE_MAX_ITENS = config('LLM_LOTE_MAX_ITENS', default=8, cast=int)  # trechos por requisição
+LLM_LOTE_MAX_TOKENS = config('LLM_LOTE_MAX_TOKENS', default=6000, cast=int)  # tokens de trechos por requisição
+LLM_LOTE_ESPERA = config('LLM_LOTE_ESPERA', default=0.05, cast=float)  # segundos juntando trechos na etapa
+LLM_FILA_DIRETORIO = config('LLM_FILA_DIRETORIO', default=os.path.join(DIRETORIO_PADRAO, 'fila_llm'))
+LLM_FILA_INTERVALO = config('LLM_FILA_INTERVALO', default=30, cast=float)  # segundos entre consultas ao job
+LLM_FILA_TIMEOUT = config('LLM_FILA_TIMEOUT', default=24 * 60 * 60, cast=float)
+
+# Batch API: metade do preço das requisições normais
+FATOR_PRECO_FILA = 0.5
+
+INSTRUCOES_LOTE = (
+    "Os trechos abaixo são independentes. Extraia de cada um os registros no formato do schema, "
+    "sem misturar trechos. Responda com `itens`: um objeto por trecho, com o id do trecho e a(s) "
+    "lista(s) de registros do schema; use uma lista vazia quando o trecho não tiver registros "
+    "e null para campos ausentes."
+)
+
+log = obter_logger('extracao')
+
+
+def _esquema_registro(schema):
+    propriedades = {}
+    for campo, definicao in schema.get('properties', {}).items():
+        propriedades[campo] = {'type': [definicao.get('type', 'string'), 'null']}
+        if definicao.get('description'):
+            propriedades[campo]['description'] = definicao['description']
+    return {'type': 'object', 'properties': propriedades,
+            'required': list(propriedades), 'additionalProperties': False}
+
+def esquema_saida(schema, tipos=None):
+    """JSON Schema estrito da resposta: {itens: [{id, registros: [registro do schema]}]}.
+
+    Com `tipos`, `schema` é {tipo: schema} e cada item traz uma lista por
+    tipo no lugar de `registros` ({id, classificacao: [...], artilharia: [...]}).
+    """
+    listas = {'registros': schema} if tipos is None else {tipo: schema[tipo] for tipo in tipos}
+    propriedades = {'id': {'type': 'string'}}
+    propriedades.update({nome: {'type': 'array', 'items': _esquema_registro(s)} for nome, s in listas.items()})
+    item = {'type': 'object', 'properties': propriedades,
+            'required': list(propriedades), 'additionalProperties': False}
+    return {'title': 'extracao', 'description': 'Registros extraídos de cada trecho',
+            'type': 'object', 'properties': {'itens': {'type': 'array', 'items': item}},
+            'required': ['itens'], 'additionalProperties': False}
+
+def montar_mensagens(instrucoes, itens):
+    """Mensagens de uma requisição: instruções uma vez, depois cada (id, texto) delimitado"""
+    trechos = '\n\n'.join(f'<trecho id="{id_}">\n{texto}\n</trecho>' for id_, texto in itens)
+    return [
+        {'role': 'system', 'content': f"{instrucoes.strip()}\n\n{INSTRUCOES_LOTE}"},
+        {'role': 'user', 'content': trechos},
+    ]
+
+def _limpar(registros):
+    return [{campo: valor for campo, valor in registro.items() if valor is not None}
+            for registro in registros or [] if isinstance(registro, dict)]
+
+def interpretar(resposta, ids, tipos=None):
+    """{id: registros} da resposta (ids desconhecidos são ignorados; campos nulos, omitidos).
+
+    Com `tipos`, {id: {tipo: registros}}.
+    """
+    por_id = {}
+    for item in (resposta or {}).get('itens') or []:
+        if not isinstance(item, dict) or str(item.get('id')) not in ids:
+            continue
+        if tipos is None:
+            por_id[str(item['id'])] = _limpar(item.get('registros'))
+        else:
+            por_id[str(item['id'])] = {tipo: _limpar(item.get(tipo)) for tipo in tipos}
+    return por_id
+
+def chamar_estruturado(modelo, esquema, mensagens):
+    """Uma requisição com saída JSON estrita (response_format json_schema, ver `esquema_saida`); devolve o objeto"""
+    from recursos import obter_llm
+    llm = obter_llm(modelo, 0).with_structured_output(esquema, method='json_schema', strict=True)
+    with chamada_llm(modelo):
+        return llm.invoke(mensagens)
+
+
+class ExtratorLote:
+    """Extrai registros de vários textos agrupando-os em poucas requisições.
+
+    `instrucoes` descreve o que extrair (sem o texto); `schema` é o mesmo
+    dicionário de propriedades usado pelos validadores dos scrapers.
+    """
+
+    tipos = None  # ExtratorCombinado: vários schemas por resposta
+
+    def __init__(self, modelo, schema, instrucoes, max_itens=LLM_LOTE_MAX_ITENS, max_tokens=LLM_LOTE_MAX_TOKENS,
+                 modo=LLM_EXTRACAO_MODO, limitador=None):
+        self.modelo = modelo
+        self.schema = schema
+        self.instrucoes = instrucoes
+        self.max_itens = max(1, max_itens)
+        self.max_tokens = max_tokens
+        self.modo = modo
+        self.limitador = limitador
+
+    def _chave(self, cache, texto):
+        return cache.gerar_chave(self.modelo, {'schema': self.schema, 'instrucoes': self.instrucoes}, texto)
+
+    def _esquema(self):
+        return esquema_saida(self.schema, self.tipos)
+
+    def _agrupar(self, itens):
+        """Lotes de até `max_itens` trechos e `max_tokens` tokens (um trecho maior vai sozinho)"""
+        lotes, atual, tokens = [], [], 0
+        for id_, texto in itens:
+            custo = estimar_tokens(texto)
+            if atual and (len(atual) >= self.max_itens or tokens + custo > self.max_tokens):
+                lotes.append(atual)
+                atual, tokens = [], 0
+            atual.append((id_, texto))
+            tokens += custo
+        if atual:
+            lotes.append(atual)
+        return lotes
+
+    def _requisitar(self, lote):
+        mensagens = montar_mensagens(self.instrucoes, lote)
+        tokens = sum(estimar_tokens(m['content']) for m in mensagens)
+        # `chamar_estruturado` é lido do módulo a cada chamada (o benchmark o troca por um LLM falso)
+        esquema = self._esquema()
+        resposta = chamar_com_limite(lambda mensagens: chamar_estruturado(self.modelo, esquema, mensagens),
+                                     mensagens, self.limitador, tokens, disjuntor=obter_disjuntor(f'llm:{self.modelo}'))
+        contar('llm_lotes')
+        contar('llm_trechos', len(lote))
+        return interpretar(resposta, {id_ for id_, _ in lote}, self.tipos)
+
+    def _extrair_direto(self, lotes):
+        resultados = {}
+        for lote in lotes:
+            resultados.update(self._requisitar(lote))
+            faltando = [(id_, texto) for id_, texto in lote if id_ not in resultados]
+            if faltando and len(lote) > 1:
+                # Trechos que a resposta pulou: uma nova chamada só com eles
+                log.warning(f"⚠️ {len(faltando)} trecho(s) sem resposta no lote, repetindo")
+                resultados.update(self._requisitar(faltando))
+        return resultados
+
+    def extrair(self, textos):
+        """Registros de cada texto, na mesma ordem (cache por texto; só os ausentes vão ao LLM).
+
+        No ExtratorCombinado, cada item é {tipo: registros}.
+        """
+        cache = obter_cache()
+        resultados = [None] * len(textos)
+        pendentes = []
+        for i, texto in enumerate(textos):
+            valor = cache.obter(self._chave(cache, texto))
+            if valor is not None:
+                contar('cache_llm_acertos')
+                resultados[i] = valor
+            else:
+                contar('cache_llm_falhas')
+                pendentes.append((str(i), texto))
+        if not pendentes:
+            return resultados
+        lotes = self._agrupar(pendentes)
+        log.info(f"📦 {len(pendentes)} trecho(s) em {len(lotes)} requisição(ões) ({self.modo})")
+        por_id = self._extrair_fila(lotes) if self.modo == 'fila' else self._extrair_direto(lotes)
+        for id_, texto in pendentes:
+            registros = por_id.get(id_)
+            if registros is not None:
+                cache.gravar(self._chave(cache, texto), registros)
+            resultados[int(id_)] = registros
+        return resultados
+
+    # --- Batch API (modo 'fila') ---
+
+    def _requisicoes_fila(self, lotes):
+        formato = {'type': 'json_schema',
+                   'json_schema': {'name': 'extracao', 'strict': True, 'schema': self._esquema()}}
+        return [{
+            'custom_id': f'lote-{n}', 'method': 'POST', 'url': '/v1/chat/completions',
+            'body': {'model': self.modelo, 'temperature': 0, 'response_format': formato,
+                     'messages': montar_mensagens(self.instrucoes, lote)},
+        } for n, lote in enumerate(lotes)]
+
+    def _extrair_fila(self, lotes):
+        """Todos os lotes em um job da Batch API; espera o término e lê as respostas de cada lote"""
+        from openai import OpenAI
+        from recursos import configurar_api_key
+        configurar_api_key()
+        cliente = OpenAI()
+        conteudo = '\n'.join(json.dumps(r, ensure_ascii=False) for r in self._requisicoes_fila(lotes)).encode('utf-8')
+        assinatura = hashlib.sha256(conteudo).hexdigest()[:16]
+        estado = os.path.join(LLM_FILA_DIRETORIO, f'{assinatura}.json')
+        if os.path.exists(estado):
+            with open(estado, encoding='utf-8') as arquivo:
+                id_job = json.load(arquivo)['id']
+            log.info(f"⏳ Retomando job {id_job} da fila")
+        else:
+            arquivo = cliente.files.create(file=(f'{assinatura}.jsonl', conteudo), purpose='batch')
+            id_job = cliente.batches.create(input_file_id=arquivo.id, endpoint='/v1/chat/completions',
+                                            completion_window='24h').id
+            os.makedirs(LLM_FILA_DIRETORIO, exist_ok=True)
+            with open(estado + '.tmp', 'w', encoding='utf-8') as saida:
+                json.dump({'id': id_job, 'lotes': len(lotes), 'criado_em': time.time()}, saida)
+            os.replace(estado + '.tmp', estado)
+            log.info(f"📤 Job {id_job} enviado à fila ({len(lotes)} requisições)")
+
+        limite = time.monotonic() + LLM_FILA_TIMEOUT
+        while True:
+            job = cliente.batches.retrieve(id_job)
+            if job.status == 'completed':
+                break
+            if job.status in ('failed', 'expired', 'cancelled'):
+                os.remove(estado)
+                raise RuntimeError(f"Job {id_job} da fila terminou como {job.status}")
+            if time.monotonic() > limite:
+                raise TimeoutError(f"Job {id_job} ainda em {job.status}; execute de novo para retomar")
+            time.sleep(LLM_FILA_INTERVALO)
+
+        ids_por_lote = {f'lote-{n}': {id_ for id_, _ in lote} for n, lote in enumerate(lotes)}
+        resultados = {}
+        if job.output_file_id:
+            for linha in cliente.files.content(job.output_file_id).text.splitlines():
+                resposta = json.loads(linha)
+                corpo = (resposta.get('response') or {}).get('body') or {}
+                if resposta.get('custom_id') not in ids_por_lote or not corpo.get('choices'):
+                    continue
+                uso = corpo.get('usage') or {}
+                registrar_llm(self.modelo, uso.get('prompt_tokens', 0), uso.get('completion_tokens', 0),
+                              fator_preco=FATOR_PRECO_FILA)
+                contar('llm_lotes')
+                conteudo = corpo['choices'][0]['message'].get('content') or '{}'
+                resultados.update(interpretar(json.loads(conteudo), ids_por_lote[resposta['custom_id']], self.tipos))
+        os.remove(estado)
+        faltando = sum(len(ids) for ids in ids_por_lote.values()) - len(resultados)
+        if faltando:
+            log.warning(f"⚠️ {faltando} trecho(s) sem resposta no job {id_job}")
+        return resultados
+
+
+class ExtratorCombinado(ExtratorLote):
+    """ExtratorLote com vários schemas: uma só resposta traz cada tipo de registro de cada trecho.
+
+    Para páginas com mais de um conteúdo (classificação e artilharia no
+    ge.globo.com), o texto vai ao LLM uma vez, e não uma vez por schema.
+    `esquemas` é {tipo: schema}; `extrair` devolve {tipo: registros} por texto.
+    """
+
+    def __init__(self, modelo, esquemas, instrucoes, **kwargs):
+        super().__init__(modelo, esquemas, instrucoes, **kwargs)
+        self.tipos = list(esquemas)
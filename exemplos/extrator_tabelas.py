@@ -0,0 +1,293 @@
+import re
+import lxml.html
+from validacao import converter_inteiro, converter_numero, dobrar_acentos
+
+
+def normalizar_rotulo(texto):
+    """Minúsculas, sem acentos e sem pontuação (exceto % e #)"""
+    texto = re.sub(r'[^a-z0-9%# ]+', ' ', dobrar_acentos(texto or ''))
+    return ' '.join(texto.split())
+
+def _texto_celula(celula):
+    if celula is None:
+        return ''  # lacuna deixada ao unir tabelas irmãs
+    return ' '.join(' '.join(celula.itertext()).split())
+
+def _partes_celula(celula):
+    """Trechos de texto de cada filho da célula (ex.: ticker e nome da empresa)"""
+    partes = [' '.join(filho.text_content().split()) for filho in celula if isinstance(filho.tag, str)]
+    partes = [p for p in partes if p]
+    return partes or [_texto_celula(celula)]
+
+
+class Tabela:
+    """Uma <table> da página já separada em cabeçalho e linhas de células"""
+
+    def __init__(self, cabecalho, linhas):
+        self.cabecalho = cabecalho   # textos do cabeçalho
+        self.linhas = linhas         # listas de elementos <td>/<th>
+        self.colunas = {}            # índice da coluna -> campo do schema
+
+    def texto(self):
+        """Representação em texto (cabeçalho + linhas) para o LLM"""
+        linhas = [' | '.join(self.cabecalho)] if self.cabecalho else []
+        linhas.extend(' | '.join(_texto_celula(c) for c in linha) for linha in self.linhas)
+        return '\n'.join(linhas)
+
+
+def ler_arvore(html):
+    """Árvore lxml do HTML, lida uma vez só e compartilhada por vários extratores (e pelo IndiceDom)"""
+    return lxml.html.fromstring(html) if html else lxml.html.fromstring('<html></html>')
+
+def ler_tabelas(html):
+    """Todas as tabelas do HTML (texto ou árvore já lida por `ler_arvore`) como objetos Tabela"""
+    if isinstance(html, lxml.html.HtmlElement):
+        raiz = html
+    elif not html:
+        return []
+    else:
+        raiz = lxml.html.fromstring(html)
+    tabelas = []
+    for tabela in raiz.iter('table'):
+        cabecalho = []
+        linhas = []
+        for tr in tabela.iter('tr'):
+            celulas = [c for c in tr if isinstance(c.tag, str) and c.tag in ('td', 'th')]
+            if not celulas:
+                continue
+            if not cabecalho and not linhas and all(c.tag == 'th' for c in celulas):
+                cabecalho = [_texto_celula(c) for c in celulas]
+            else:
+                linhas.append(celulas)
+        if linhas:
+            tabelas.append(Tabela(cabecalho, linhas))
+    return tabelas
+
+
+class ExtratorTabelas:
+    """Mapeia tabelas HTML para um schema sem passar pelo LLM.
+
+    Os cabeçalhos são casados com os campos do schema por sinônimos e, para
+    colunas sem cabeçalho reconhecido, por heurísticas de posição/conteúdo
+    (coluna de posição 1..N e a única coluna de texto livre). Tabelas irmãs
+    com o mesmo número de linhas (ex.: times em uma, pontos em outra) são
+    unidas. Só as tabelas que não mapeiam o suficiente e as linhas que não
+    convertem vão para `funcao_llm`.
+
+    `ancoras` são campos sem os quais a tabela não é deste schema: quando
+    vários extratores leem a mesma página (classificação e artilharia),
+    a tabela de um não vai para o LLM como pendente do outro.
+    """
+
+    def __init__(self, schema, sinonimos, obrigatorios=(), campo_posicao=None, desdobrar=None, min_campos=None,
+                 ancoras=()):
+        self.schema = schema
+        self.propriedades = schema.get('properties', {})
+        self.sinonimos = {campo: [normalizar_rotulo(s) for s in lista] for campo, lista in sinonimos.items()}
+        self.obrigatorios = list(obrigatorios)
+        self.campo_posicao = campo_posicao
+        self.desdobrar = desdobrar or {}
+        self.min_campos = min_campos if min_campos is not None else max(1, len(self.propriedades) // 2)
+        self.ancoras = set(ancoras)
+
+    # --- mapeamento de colunas ---
+
+    def _mapear_cabecalho(self, tabela):
+        livres = [c for c in self.propriedades]
+        colunas = {}
+        rotulos = [normalizar_rotulo(h) for h in tabela.cabecalho]
+        # 1) sinônimo exato; 2) rótulo que começa com um sinônimo (ex.: "variacao %")
+        for exato in (True, False):
+            for indice, rotulo in enumerate(rotulos):
+                if indice in colunas or not rotulo:
+                    continue
+                for campo in livres:
+                    if any(rotulo == s or (not exato and len(s) >= 3 and rotulo.startswith(s)) for s in self.sinonimos.get(campo, [])):
+                        colunas[indice] = campo
+                        livres.remove(campo)
+                        break
+        return colunas
+
+    def _mapear_por_conteudo(self, tabela, colunas):
+        """Heurísticas para colunas que o cabeçalho não resolveu"""
+        usados = set(colunas.values())
+        largura = max(len(linha) for linha in tabela.linhas)
+        valores = [[_texto_celula(linha[i]) if i < len(linha) else '' for linha in tabela.linhas] for i in range(largura)]
+        # Cabeçalho com menos rótulos que células (colspan): a posição dos rótulos
+        # não corresponde às colunas, a menos que o mapeamento já esteja completo
+        if tabela.cabecalho and len(tabela.cabecalho) != largura and not self._completa(colunas):
+            colunas.clear()
+            usados = set()
+
+        if self.campo_posicao and self.campo_posicao not in usados:
+            for i in range(largura):
+                if i in colunas:
+                    continue
+                numeros = [converter_inteiro(v.rstrip('ºo°.')) for v in valores[i]]
+                if numeros and numeros == list(range(1, len(numeros) + 1)):
+                    colunas[i] = self.campo_posicao
+                    usados.add(self.campo_posicao)
+                    break
+
+        # Só com alguma âncora (cabeçalho ou coluna de posição) para não casar tabelas alheias
+        textos_livres = [c for c, p in self.propriedades.items() if p.get('type', 'string') == 'string' and c not in usados]
+        if colunas and len(textos_livres) == 1:
+            for i in range(largura):
+                if i in colunas:
+                    continue
+                preenchidos = [v for v in valores[i] if v]
+                if preenchidos and sum(converter_numero(v) is None for v in preenchidos) >= 0.8 * len(preenchidos):
+                    colunas[i] = textos_livres[0]
+                    break
+        return colunas
+
+    def _completa(self, colunas):
+        campos = set(colunas.values())
+        return len(campos) >= self.min_campos and set(self.obrigatorios) <= campos
+
+    def _mapear(self, tabela):
+        colunas = self._mapear_cabecalho(tabela)
+        if len(colunas) < len(self.propriedades):
+            colunas = self._mapear_por_conteudo(tabela, colunas)
+        tabela.colunas = colunas
+        return colunas
+
+    def _unir_irmas(self, tabelas):
+        """Une tabelas consecutivas com o mesmo nº de linhas e campos complementares"""
+        unidas = []
+        for tabela in tabelas:
+            anterior = unidas[-1] if unidas else None
+            if (anterior is not None and tabela.colunas and anterior.colunas
+                    and len(anterior.linhas) == len(tabela.linhas)
+                    and not set(anterior.colunas.values()) & set(tabela.colunas.values())
+                    and not (self._completa(anterior.colunas) and self._completa(tabela.colunas))):
+                deslocamento = max(len(linha) for linha in anterior.linhas)
+                nova = Tabela(
+                    anterior.cabecalho + tabela.cabecalho,
+                    [a + [None] * (deslocamento - len(a)) + b for a, b in zip(anterior.linhas, tabela.linhas)],
+                )
+                nova.colunas = dict(anterior.colunas)
+                nova.colunas.update({i + deslocamento: campo for i, campo in tabela.colunas.items()})
+                unidas[-1] = nova
+            else:
+                unidas.append(tabela)
+        return unidas
+
+    # --- conversão das linhas ---
+
+    def _converter(self, campo, texto):
+        tipo = self.propriedades.get(campo, {}).get('type', 'string')
+        if tipo == 'integer':
+            return converter_inteiro(texto.rstrip('ºo°.%'))
+        if tipo == 'number':
+            return converter_numero(texto.rstrip('%'))
+        return texto or None
+
+    def _linha(self, tabela, celulas):
+        registro = {}
+        for indice, campo in tabela.colunas.items():
+            if indice >= len(celulas) or celulas[indice] is None:
+                continue
+            celula = celulas[indice]
+            if campo in self.desdobrar and self.desdobrar[campo] not in tabela.colunas.values():
+                partes = _partes_celula(celula)
+                registro[campo] = partes[0]
+                if len(partes) > 1:
+                    registro[self.desdobrar[campo]] = ' '.join(partes[1:])
+                continue
+            texto = _texto_celula(celula)
+            valor = self._converter(campo, texto)
+            if valor is None and texto:
+                return None  # célula presente mas não convertida: linha vai para o LLM
+            registro[campo] = valor
+        if any(not registro.get(campo) for campo in self.obrigatorios):
+            return None
+        return registro
+
+    def separar(self, html, como_tabelas=False):
+        """Registros mapeados direto do HTML e os textos que ainda precisam do LLM.
+
+        `html` pode ser o texto, a árvore de `ler_arvore` ou as tabelas já
+        lidas por `ler_tabelas` (o mapeamento de colunas fica em cópias).
+        Retorna (ResultadoTabelas, pendentes): `pendentes` traz as tabelas que
+        não mapearam o suficiente e, por tabela, as linhas que não converteram
+        (com o cabeçalho para contexto), cada uma como um texto — ou como
+        Tabela com `como_tabelas`, para quem ainda vai fatiá-las por orçamento.
+        """
+        resultado = ResultadoTabelas()
+        pendentes = []
+        if isinstance(html, list):
+            tabelas = [Tabela(tabela.cabecalho, tabela.linhas) for tabela in html]
+        else:
+            tabelas = ler_tabelas(html)
+        for tabela in tabelas:
+            self._mapear(tabela)
+        for tabela in self._unir_irmas(tabelas):
+            if not tabela.colunas:
+                continue  # nenhuma coluna reconhecida: tabela não relacionada ao schema
+            if self.ancoras and not self.ancoras & set(tabela.colunas.values()):
+                continue  # tabela de outro schema (ex.: classificação vista pelo extrator da artilharia)
+            if not self._completa(tabela.colunas):
+                pendentes.append(tabela)
+                continue
+            falhas = []
+            for celulas in tabela.linhas:
+                if not any(c is not None and _texto_celula(c) for c in celulas):
+                    continue
+                registro = self._linha(tabela, celulas)
+                if registro is None:
+                    falhas.append(celulas)
+                else:
+                    resultado.adicionar([registro], 'tabela')
+            if falhas:
+                # Só as linhas que falharam, em um único texto
+                pendentes.append(Tabela(tabela.cabecalho, falhas))
+        return resultado, pendentes if como_tabelas else [tabela.texto() for tabela in pendentes]
+
+    def extrair(self, html, funcao_llm=None):
+        """Extrai os registros do HTML; retorna um ResultadoTabelas"""
+        resultado, pendentes = self.separar(html)
+        if funcao_llm:
+            for texto in pendentes:
+                resultado.adicionar(funcao_llm(texto) or [], 'llm')
+        return resultado
+
+
+def separar_varios(html, extratores, como_tabelas=False):
+    """{nome: (ResultadoTabelas, pendentes)} de vários extratores com uma só leitura do HTML.
+
+    As tabelas são lidas uma vez; cada extrator mapeia as colunas do seu
+    schema em cópias delas (as células são compartilhadas). Uma tabela em
+    que um extrator reconhece as suas `ancoras` (ex.: coluna de jogador)
+    é só dele: não vai como pendente dos outros para o LLM.
+    """
+    tabelas = ler_tabelas(html)
+    donos = {}
+    for nome, extrator in extratores.items():
+        if not extrator.ancoras:
+            continue
+        for i, tabela in enumerate(tabelas):
+            if i not in donos and extrator.ancoras & set(extrator._mapear(Tabela(tabela.cabecalho, tabela.linhas)).values()):
+                donos[i] = nome
+    return {nome: extrator.separar([t for i, t in enumerate(tabelas) if donos.get(i, nome) == nome], como_tabelas)
+            for nome, extrator in extratores.items()}
+
+
+class ResultadoTabelas:
+    """Registros extraídos e o caminho (tabela ou llm) que produziu cada um"""
+
+    def __init__(self):
+        self.linhas = []
+        self.origens = []
+
+    def adicionar(self, registros, origem):
+        self.linhas.extend(registros)
+        self.origens.extend([origem] * len(registros))
+
+    @property
+    def contagem(self):
+        return {origem: self.origens.count(origem) for origem in ('tabela', 'llm')}
+
+    def __len__(self):
+        return len(self.linhas)
+
@@ -0,0 +1,55 @@
+from extrator_tabelas import ler_tabelas, _texto_celula
+from recursos import obter_encoder_modelo
+
+CHUNK_MAX_TOKENS = 2000
+
+
+class Bloco:
+    """Trecho de tabela enviado ao LLM: cabeçalho + linhas inteiras"""
+
+    def __init__(self, texto, tokens, linhas):
+        self.texto = texto
+        self.tokens = tokens
+        self.linhas = linhas  # nº de linhas de dados no bloco
+
+    def __repr__(self):
+        return f'Bloco(tokens={self.tokens}, linhas={self.linhas})'
+
+
+def fatiar_tabelas(html, max_tokens=CHUNK_MAX_TOKENS, modelo='gpt-4o-mini'):
+    """Divide as tabelas do HTML em blocos de até `max_tokens` tokens.
+
+    `html` também pode ser a lista de Tabela já lidas (ex.: as pendentes de
+    `ExtratorTabelas.separar(..., como_tabelas=True)`).
+
+    Nenhuma linha é cortada ao meio: as linhas são empacotadas inteiras até
+    o orçamento e o cabeçalho da tabela é repetido no início de cada bloco.
+    Uma linha que sozinha passa do orçamento vai em um bloco próprio.
+    """
+    tabelas = html if isinstance(html, list) else ler_tabelas(html)
+    if not tabelas:
+        return []
+    encoder = obter_encoder_modelo(modelo)
+    blocos = []
+    for tabela in tabelas:
+        cabecalho = ' | '.join(tabela.cabecalho)
+        tokens_cabecalho = len(encoder.encode(cabecalho)) + 1 if cabecalho else 0
+        atual, tokens_atual = [], tokens_cabecalho
+
+        def fechar():
+            if atual:
+                texto = '\n'.join(([cabecalho] if cabecalho else []) + atual)
+                blocos.append(Bloco(texto, tokens_atual, len(atual)))
+
+        for celulas in tabela.linhas:
+            linha = ' | '.join(_texto_celula(c) for c in celulas)
+            if not linha.replace('|', '').strip():
+                continue
+            tokens_linha = len(encoder.encode(linha)) + 1  # +1 pela quebra de linha
+            if atual and tokens_atual + tokens_linha > max_tokens:
+                fechar()
+                atual, tokens_atual = [], tokens_cabecalho
+            atual.append(linha)
+            tokens_atual += tokens_linha
+        fechar()
+    return blocos
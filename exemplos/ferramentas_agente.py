@@ -0,0 +1,219 @@
+"""Ferramentas do PlayWrightBrowserToolkit com cache e texto compacto.
+
+A cada passo o agente costuma navegar de novo para a mesma página e
+extrair o texto inteiro dela, que volta para o prompt em todos os passos
+seguintes. Aqui cada ferramenta de leitura (extract_text,
+extract_hyperlinks, get_elements) é guardada por (ferramenta, URL,
+argumentos) na memória da execução e em SQLite entre execuções; a
+navegação só acontece de fato quando uma leitura não está em cache. O
+texto das páginas sai compactado: sem menus/rodapés/scripts, espaços
+colapsados, tabelas primeiro e tamanho limitado.
+"""
+import os
+import re
+import threading
+import lxml.html
+from decouple import config
+from cache_llm import CacheLLM, DIRETORIO_PADRAO
+from extrator_tabelas import ler_tabelas
+from instrumentacao import obter_logger, contar
+
+AGENTE_CACHE_CAMINHO = config('AGENTE_CACHE_CAMINHO', default=os.path.join(DIRETORIO_PADRAO, 'ferramentas_agente.sqlite3'))
+AGENTE_CACHE_TTL = config('AGENTE_CACHE_TTL', default=10 * 60, cast=int)  # segundos
+AGENTE_TEXTO_MAX_CARACTERES = config('AGENTE_TEXTO_MAX_CARACTERES', default=6000, cast=int)
+
+# Ferramentas que só leem a página atual: resultado depende apenas de URL + argumentos
+FERRAMENTAS_LEITURA = {'extract_text', 'extract_hyperlinks', 'get_elements'}
+
+TAGS_DESCARTADAS = ('script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form', 'nav', 'header', 'footer', 'aside', 'button')
+BOILERPLATE = re.compile(r'cookie|banner|menu|navbar|newsletter|publicidade|advert|\bads?\b|social|share|compartilh|footer|rodape|modal|popup', re.I)
+# Nunca descartados pelas classes: em muitos sites carregam "menu-open", "has-cookie-banner" etc. no layout
+TAGS_ESTRUTURAIS = {'html', 'body', 'main', 'article'}
+# Um bloco marcado como menu/banner com mais que essa fração do texto da página é o conteúdo, não boilerplate
+BOILERPLATE_FRACAO_MAXIMA = 0.3
+TAGS_BLOCO = {'p', 'div', 'section', 'article', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dt', 'dd', 'caption', 'span', 'a', 'strong'}
+
+log = obter_logger('agente')
+
+
+def _limitar(texto, limite):
+    if limite and len(texto) > limite:
+        return texto[:limite] + f"\n… [{len(texto) - limite} caracteres omitidos]"
+    return texto
+
+def compactar_texto(html, limite=AGENTE_TEXTO_MAX_CARACTERES):
+    """Texto da página para o agente: tabelas primeiro (uma linha por <tr>), depois o restante do conteúdo.
+
+    Scripts, menus, rodapés, banners e afins são descartados (pela tag ou,
+    para blocos pequenos em relação à página, pela classe/id/role; nunca
+    body/main/article); espaços são colapsados e linhas repetidas aparecem
+    uma vez só. O total fica em até
+    `limite` caracteres, com as tabelas ocupando o orçamento antes do resto.
+    """
+    if not html:
+        return ''
+    tabelas = [tabela.texto() for tabela in ler_tabelas(html)]
+    raiz = lxml.html.fromstring(html)
+    for elemento in list(raiz.iter(*TAGS_DESCARTADAS, 'table')):
+        elemento.drop_tree()
+    tamanho_pagina = len(raiz.text_content())
+    for elemento in list(raiz.iter()):
+        if not isinstance(elemento.tag, str) or elemento.getparent() is None or elemento.tag in TAGS_ESTRUTURAIS:
+            continue
+        marcadores = f"{elemento.get('class', '')} {elemento.get('id', '')} {elemento.get('role', '')}"
+        if BOILERPLATE.search(marcadores) and len(elemento.text_content()) <= BOILERPLATE_FRACAO_MAXIMA * tamanho_pagina:
+            elemento.drop_tree()
+
+    vistos = set()
+    linhas = []
+    for elemento in raiz.iter():
+        if not isinstance(elemento.tag, str) or elemento.tag not in TAGS_BLOCO:
+            continue
+        # Só o texto "próprio" do elemento: o dos filhos de bloco sai na vez deles
+        partes = [elemento.text or '']
+        partes += [filho.tail or '' for filho in elemento]
+        partes += [filho.text_content() for filho in elemento if isinstance(filho.tag, str) and filho.tag not in TAGS_BLOCO]
+        linha = ' '.join(' '.join(partes).split())
+        if len(linha) > 1 and linha not in vistos:
+            vistos.add(linha)
+            linhas.append(linha)
+
+    texto_tabelas = '\n\n'.join(tabelas)
+    if limite and len(texto_tabelas) >= limite:
+        return _limitar(texto_tabelas, limite)
+    restante = limite - len(texto_tabelas) if limite else None
+    return '\n\n'.join(p for p in (texto_tabelas, _limitar('\n'.join(linhas), restante)) if p)
+
+
+class FerramentasEmCache:
+    """Envolve as ferramentas do toolkit: leituras em cache, navegação só quando necessária.
+
+    `url` é a página em que o agente "está" (a última pedida ao
+    navigate_browser); `_url_carregada` é a que o navegador mostra de fato.
+    Depois de um clique o conteúdo pode mudar sem a URL mudar, então as
+    leituras deixam de usar o cache até a próxima navegação.
+    """
+
+    def __init__(self, ferramentas, browser, cache=None, limite=AGENTE_TEXTO_MAX_CARACTERES):
+        self.ferramentas = {ferramenta.name: ferramenta for ferramenta in ferramentas}
+        self.browser = browser
+        self.cache = cache if cache is not None else obter_cache_ferramentas()
+        self.limite = limite
+        self.url = None
+        self._url_carregada = None
+        self._status = {}
+        self._memoria = {}
+        self._alterada = False
+
+    async def _pagina(self):
+        from langchain_community.tools.playwright.utils import aget_current_page
+        return await aget_current_page(self.browser)
+
+    async def _carregar(self):
+        """Navega de verdade até `url`, se o navegador ainda não estiver nela"""
+        pagina = await self._pagina()
+        if self.url and self._url_carregada != self.url:
+            resposta = await pagina.goto(self.url)
+            contar('agente_navegacoes')
+            self._status[self.url] = resposta.status if resposta else 'unknown'
+            self._url_carregada = self.url
+            self._alterada = False
+        return pagina
+
+    # --- ferramentas ---
+
+    async def navegar(self, url):
+        self.url = url
+        self._alterada = False
+        chave = self.cache.gerar_chave('navigate_browser', {}, url)
+        status = self._status.get(url) or self.cache.obter(chave)
+        if status is None:
+            # Status desconhecido: navega agora (o agente decide o próximo passo por ele)
+            await self._carregar()
+            status = self._status[url]
+            self.cache.gravar(chave, status)
+        return f"Navigating to {url} returned status code {status}"
+
+    async def ler(self, nome, argumentos):
+        cacheavel = self.url is not None and not self._alterada
+        chave = self.cache.gerar_chave(nome, argumentos, self.url or '')
+        if cacheavel:
+            valor = self._memoria.get(chave)
+            if valor is None:
+                valor = self.cache.obter(chave)
+            if valor is not None:
+                contar('agente_cache_acertos')
+                log.debug(f"♻️ {nome} em cache ({self.url})")
+                self._memoria[chave] = valor
+                return valor
+        contar('agente_cache_falhas')
+        pagina = await self._carregar()
+        if nome == 'extract_text':
+            html = await pagina.content()
+            valor = compactar_texto(html, self.limite)
+            contar('agente_caracteres_html', len(html))
+            contar('agente_caracteres_texto', len(valor))
+        else:
+            valor = _limitar(await self.ferramentas[nome]._arun(**argumentos), self.limite)
+        if cacheavel:
+            self._memoria[chave] = valor
+            self.cache.gravar(chave, valor)
+        return valor
+
+    def _leitura(self, nome):
+        async def ler(**argumentos):
+            return await self.ler(nome, argumentos)
+        return ler
+
+    async def clicar(self, selector):
+        await self._carregar()
+        resultado = await self.ferramentas['click_element']._arun(selector=selector)
+        pagina = await self._pagina()
+        self.url = self._url_carregada = pagina.url
+        self._alterada = True
+        return resultado
+
+    async def voltar(self):
+        await self._carregar()
+        resultado = await self.ferramentas['previous_webpage']._arun()
+        pagina = await self._pagina()
+        self.url = self._url_carregada = pagina.url
+        self._alterada = False
+        return resultado
+
+    async def pagina_atual(self):
+        return self.url or (await self._pagina()).url
+
+    def ferramentas_agente(self):
+        """Ferramentas com os mesmos nomes, descrições e argumentos das originais"""
+        from langchain_core.tools import StructuredTool
+        implementacoes = {
+            'navigate_browser': self.navegar,
+            'click_element': self.clicar,
+            'previous_webpage': self.voltar,
+            'current_webpage': self.pagina_atual,
+        }
+        for nome in FERRAMENTAS_LEITURA:
+            implementacoes[nome] = self._leitura(nome)
+        envolvidas = []
+        for nome, ferramenta in self.ferramentas.items():
+            if nome not in implementacoes:
+                envolvidas.append(ferramenta)
+                continue
+            envolvidas.append(StructuredTool.from_function(
+                coroutine=implementacoes[nome], name=nome,
+                description=ferramenta.description, args_schema=ferramenta.args_schema,
+            ))
+        return envolvidas
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def obter_cache_ferramentas():
+    """Cache SQLite das leituras do agente (mesma política de TTL/LRU do cache do LLM)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheLLM(caminho=AGENTE_CACHE_CAMINHO, ttl=AGENTE_CACHE_TTL)
+        return _cache
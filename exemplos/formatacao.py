@@ -0,0 +1,97 @@
+# Conversão dos resultados dos scrapers em DataFrames para exibição.
+# Usado pelo app.py e pelos benchmarks (pandas só é importado ao formatar).
+
+def formatar_tabela_brasileirao(resultado):
+    """Formatar dados do Brasileirão PRESERVANDO a ordem original"""
+    if not resultado:
+        return None
+    
+    # Filtrar apenas dados válidos de times
+    dados_validos = []
+    for item in resultado:
+        if isinstance(item, dict) and item.get('time') and item.get('time') != 'nan' and item.get('time').strip():
+            dados_validos.append(item)
+    
+    if not dados_validos:
+        return None
+    
+    import pandas as pd
+
+    # Converter para DataFrame SEM alterar a ordem
+    df = pd.DataFrame(dados_validos)
+    
+    # Garantir que as colunas existam e tenham valores padrão
+    colunas_esperadas = {
+        'posicao': 0,
+        'time': 'N/A',
+        'jogos': 0,
+        'vitorias': 0,
+        'empates': 0,
+        'derrotas': 0,
+        'gols_pro': 0,
+        'gols_contra': 0,
+        'saldo_gols': 0,
+        'pontos': 0
+    }
+    
+    for col, default_value in colunas_esperadas.items():
+        if col not in df.columns:
+            df[col] = default_value
+        else:
+            # Limpar valores nan e inválidos
+            df[col] = df[col].fillna(default_value)
+            if col != 'time':
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    
+    # Reordenar colunas
+    df = df[list(colunas_esperadas.keys())]
+    
+    # Remover linhas com time inválido
+    df = df[df['time'].str.len() > 2]
+    df = df[df['time'] != 'N/A']
+    
+    # PRESERVAR A ORDEM ORIGINAL - apenas resetar o índice
+    df = df.reset_index(drop=True)
+    
+    # Renomear colunas para exibição
+    df.columns = ['Pos', 'Time', 'J', 'V', 'E', 'D', 'GP', 'GC', 'SG', 'Pts']
+    
+    return df
+
+def formatar_tabela_acoes(resultado):
+    """Formatar dados de ações"""
+    if not resultado:
+        return None
+    
+    # Filtrar apenas dados válidos
+    dados_validos = []
+    for item in resultado:
+        if isinstance(item, dict) and (item.get('simbolo_empresa') or item.get('nome_empresa')):
+            dados_validos.append(item)
+    
+    if not dados_validos:
+        return None
+    
+    import pandas as pd
+    from normalizacao import normalizar_acoes
+    # Preço, variação, volume... viram float64 (coluna inteira de uma vez)
+    df = normalizar_acoes(pd.DataFrame(dados_validos))
+    
+    # Renomear colunas para exibição
+    column_mapping = {
+        'simbolo_empresa': 'Símbolo',
+        'nome_empresa': 'Empresa',
+        'setor_empresa': 'Setor',
+        'valor_mercado': 'Valor de Mercado',
+        'div_yield': 'Div. Yield',
+        'preco': 'Preço',
+        'variacao': 'Variação',
+        'volume': 'Volume',
+        'classificacao_analistas': 'Classificação',
+        'moeda': 'Moeda'
+    }
+    
+    # Renomear apenas as colunas que existem
+    df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
+    
+    return df
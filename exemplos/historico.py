@@ -0,0 +1,163 @@
+"""Histórico colunar (Parquet) de todas as classificações e cotações extraídas.
+
+Cada execução vira um arquivo Parquet em `<HISTORICO_DIRETORIO>/<tipo>/data=AAAA-MM-DD/`
+(partições por dia, no formato hive). As consultas usam pyarrow.dataset
+com leitura por memory-map: só as partições do período pedido, as colunas
+pedidas e as linhas que passam no filtro chegam à memória.
+
+    from historico import serie_time, serie_acao
+    serie_time('Flamengo')            # posição/pontos por rodada
+    serie_acao('PETR4', dias=90)      # preço/volume por dia
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from decouple import config
+from cache_llm import DIRETORIO_PADRAO
+from validacao import converter_inteiro
+from normalizacao import CAMPOS_NUMERICOS_ACOES, CAMPOS_TEXTO_ACOES, numeros
+from instrumentacao import obter_logger, contar, medir
+
+HISTORICO_DIRETORIO = config('HISTORICO_DIRETORIO', default=os.path.join(DIRETORIO_PADRAO, 'historico'))
+HISTORICO_DESATIVADO = config('HISTORICO_DESATIVADO', default=False, cast=bool)
+
+log = obter_logger('historico')
+
+# Colunas tipadas de cada tipo (além de coleta_em, execucao e url)
+COLUNAS_INTEIRAS_CLASSIFICACAO = ['posicao', 'pontos', 'jogos', 'vitorias', 'empates', 'derrotas',
+                                  'gols_pro', 'gols_contra', 'saldo_gols']
+
+
+def _esquema(tipo):
+    import pyarrow as pa
+    comuns = [('coleta_em', pa.timestamp('ms', tz='UTC')), ('execucao', pa.string()), ('url', pa.string())]
+    if tipo == 'classificacao':
+        return pa.schema(comuns + [('time', pa.string())] + [(c, pa.int32()) for c in COLUNAS_INTEIRAS_CLASSIFICACAO])
+    if tipo == 'acoes':
+        return pa.schema(comuns + [(c, pa.string()) for c in CAMPOS_TEXTO_ACOES]
+                         + [(c, pa.float64()) for c in CAMPOS_NUMERICOS_ACOES])
+    return None
+
+def _colunas(tipo, registros):
+    """Valores de cada coluna tipada (ações: números convertidos coluna a coluna)"""
+    if tipo == 'classificacao':
+        colunas = {'time': [r.get('time') for r in registros]}
+        colunas.update({c: [converter_inteiro(r.get(c)) for r in registros] for c in COLUNAS_INTEIRAS_CLASSIFICACAO})
+        return colunas
+    if tipo == 'acoes':
+        colunas = {c: [r.get(c) for r in registros] for c in CAMPOS_TEXTO_ACOES}
+        colunas.update({c: numeros([r.get(c) for r in registros]) for c in CAMPOS_NUMERICOS_ACOES})
+        return colunas
+    return {c: [r.get(c) for r in registros] for c in dict.fromkeys(c for r in registros for c in r)}
+
+
+def registrar(tipo, registros, urls=(), coleta_em=None, diretorio=HISTORICO_DIRETORIO):
+    """Acrescenta o resultado de uma execução ao histórico; devolve o caminho do arquivo (ou None).
+
+    Falhas (pyarrow ausente, disco cheio...) só são registradas no log:
+    o histórico nunca interrompe o scraping.
+    """
+    if HISTORICO_DESATIVADO or not registros:
+        return None
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        coleta_em = coleta_em or datetime.now(timezone.utc)
+        execucao = uuid.uuid4().hex[:12]
+        quantidade = len(registros)
+        colunas = {'coleta_em': [coleta_em] * quantidade, 'execucao': [execucao] * quantidade,
+                   'url': [','.join(sorted(urls))] * quantidade, **_colunas(tipo, registros)}
+        esquema = _esquema(tipo)
+        if esquema is None:
+            tabela = pa.table(colunas)
+        else:
+            # from_pandas: NaN das colunas numéricas vira nulo
+            tabela = pa.table([pa.array(colunas[campo.name], type=campo.type, from_pandas=True) for campo in esquema],
+                              schema=esquema)
+        pasta = os.path.join(diretorio, tipo, f"data={coleta_em:%Y-%m-%d}")
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"{coleta_em:%H%M%S}-{execucao}.parquet")
+        with medir('historico.gravar', log, tipo=tipo, linhas=quantidade):
+            # Escreve em um temporário e renomeia: quem lê nunca vê um arquivo pela metade
+            pq.write_table(tabela, caminho + '.tmp', compression='zstd')
+            os.replace(caminho + '.tmp', caminho)
+        contar('historico_linhas', quantidade)
+        return caminho
+    except Exception as e:
+        log.warning(f"⚠️ Histórico não gravado ({tipo}): {e}")
+        return None
+
+
+def _conjunto(tipo, diretorio):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+    pasta = os.path.join(diretorio, tipo)
+    if not os.path.isdir(pasta):
+        return None
+    particao = pa.schema([('data', pa.string())])
+    esquema = _esquema(tipo)
+    return ds.dataset(
+        pasta, format='parquet', schema=esquema.append(particao.field('data')) if esquema is not None else None,
+        partitioning=ds.partitioning(particao, flavor='hive'),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+        exclude_invalid_files=True,
+    )
+
+def consultar(tipo, colunas=None, filtro=None, desde=None, ate=None, diretorio=HISTORICO_DIRETORIO):
+    """Tabela pyarrow com as linhas de `tipo` no período [desde, ate] (datetimes ou datas).
+
+    Só as partições dos dias do período são abertas; `colunas` limita o
+    que é lido e `filtro` é uma expressão de pyarrow.dataset
+    (ex.: `ds.field('time') == 'Flamengo'`). Sem histórico, devolve None.
+    """
+    import pyarrow.dataset as ds
+    conjunto = _conjunto(tipo, diretorio)
+    if conjunto is None:
+        return None
+    expressao = filtro
+    for limite, comparar in ((desde, lambda campo, valor: campo >= valor), (ate, lambda campo, valor: campo <= valor)):
+        if limite is None:
+            continue
+        # Partição (dia) para descartar arquivos inteiros + horário exato da coleta
+        dia = limite.strftime('%Y-%m-%d')
+        condicao = comparar(ds.field('data'), dia)
+        if isinstance(limite, datetime):
+            condicao = condicao & comparar(ds.field('coleta_em'), limite if limite.tzinfo else limite.replace(tzinfo=timezone.utc))
+        expressao = condicao if expressao is None else expressao & condicao
+    with medir('historico.consultar', log, tipo=tipo):
+        return conjunto.to_table(columns=colunas, filter=expressao)
+
+
+def _inicio(dias):
+    return datetime.now(timezone.utc) - timedelta(days=dias) if dias else None
+
+def _ultima_por(tabela, chave):
+    """Última coleta de cada valor de `chave` (ex.: por rodada ou por dia), em ordem crescente"""
+    if tabela is None or tabela.num_rows == 0:
+        return []
+    linhas = sorted(tabela.to_pylist(), key=lambda linha: linha['coleta_em'])
+    por_chave = {chave(linha): linha for linha in linhas}
+    return [por_chave[valor] for valor in sorted(por_chave)]
+
+def serie_time(time_, dias=None, diretorio=HISTORICO_DIRETORIO):
+    """Posição e pontos de um time por rodada (jogos disputados), última coleta de cada rodada"""
+    import pyarrow.dataset as ds
+    tabela = consultar('classificacao', colunas=['coleta_em', 'jogos', 'posicao', 'pontos', 'saldo_gols'],
+                       filtro=ds.field('time') == time_, desde=_inicio(dias), diretorio=diretorio)
+    return _ultima_por(tabela, lambda linha: linha['jogos'] or 0)
+
+def serie_acao(simbolo, dias=None, campos=('preco', 'variacao', 'volume'), diretorio=HISTORICO_DIRETORIO):
+    """Preço, variação e volume de um ticker por dia (última coleta de cada dia)"""
+    import pyarrow.dataset as ds
+    tabela = consultar('acoes', colunas=['coleta_em', *campos], filtro=ds.field('simbolo_empresa') == simbolo,
+                       desde=_inicio(dias), diretorio=diretorio)
+    return [{**linha, 'dia': linha['coleta_em'].date()} for linha in _ultima_por(tabela, lambda linha: linha['coleta_em'].date())]
+
+def valores_distintos(tipo, coluna, dias=None, diretorio=HISTORICO_DIRETORIO):
+    """Valores de `coluna` presentes no histórico (ex.: times ou tickers para escolher no gráfico)"""
+    import pyarrow.compute as pc
+    tabela = consultar(tipo, colunas=[coluna], desde=_inicio(dias), diretorio=diretorio)
+    if tabela is None or tabela.num_rows == 0:
+        return []
+    return sorted(v for v in pc.unique(tabela[coluna]).to_pylist() if v)
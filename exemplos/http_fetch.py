@@ -0,0 +1,297 @@
+import os, json
+import asyncio
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+from decouple import config
+from instrumentacao import contar
+from resiliencia import (PrazoEsgotado, obter_disjuntor, eh_transitorio, espera_backoff,
+                         retry_after, status_do_erro, restante, verificar_prazo)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+HTTP_ARMAZEM_CAMINHO = config('HTTP_ARMAZEM_CAMINHO', default=os.path.join(DIRETORIO_PADRAO, 'respostas_http.sqlite3'))
+HTTP_MAX_CONEXOES = config('HTTP_MAX_CONEXOES', default=20, cast=int)
+HTTP_MAX_POR_HOST = config('HTTP_MAX_POR_HOST', default=4, cast=int)
+HTTP_TIMEOUT = config('HTTP_TIMEOUT', default=30, cast=int)
+HTTP_KEEPALIVE = config('HTTP_KEEPALIVE', default=60, cast=int)
+HTTP_TENTATIVAS = config('HTTP_TENTATIVAS', default=3, cast=int)  # 429/5xx/timeout repetidos com backoff
+
+HEADERS_PADRAO = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',  # br decodificado pelo aiohttp quando o pacote Brotli está instalado
+}
+
+
+class RespostaHttp:
+    """Resultado de uma busca: conteúdo já descomprimido e se veio de um 304"""
+
+    def __init__(self, url, status, conteudo=b'', nao_modificado=False, erro=None):
+        self.url = url
+        self.status = status
+        self.conteudo = conteudo
+        self.nao_modificado = nao_modificado
+        self.erro = erro
+
+    @property
+    def ok(self):
+        return self.erro is None and self.conteudo is not None
+
+    def __repr__(self):
+        return f'RespostaHttp({self.url!r}, status={self.status}, nao_modificado={self.nao_modificado})'
+
+
+class ArmazemRespostas:
+    """Armazém local (SQLite) com corpo, ETag e Last-Modified de cada URL.
+
+    Também guarda os dados já extraídos de cada URL, para que páginas que
+    voltam como 304 não precisem ser analisadas de novo; os registros de
+    cada trecho (pela impressão digital do texto normalizado), para que só
+    os trechos que mudaram voltem ao LLM; e o último resultado de cada
+    scraper, para comparar uma execução com a anterior.
+    """
+
+    def __init__(self, caminho=HTTP_ARMAZEM_CAMINHO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        if caminho != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS respostas ('
+            ' url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,'
+            ' conteudo BLOB NOT NULL, atualizado_em REAL NOT NULL)'
+        )
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS extraidos ('
+            ' url TEXT NOT NULL, tipo TEXT NOT NULL, dados TEXT NOT NULL,'
+            ' PRIMARY KEY (url, tipo))'
+        )
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS secoes ('
+            ' url TEXT NOT NULL, tipo TEXT NOT NULL, impressao TEXT NOT NULL,'
+            ' dados TEXT NOT NULL, atualizado_em REAL NOT NULL,'
+            ' PRIMARY KEY (url, tipo, impressao))'
+        )
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS instantaneos ('
+            ' chave TEXT NOT NULL, tipo TEXT NOT NULL, dados TEXT NOT NULL,'
+            ' diferencas TEXT NOT NULL, criado_em REAL NOT NULL,'
+            ' PRIMARY KEY (chave, tipo))'
+        )
+        self._conexao.commit()
+
+    def validadores(self, url):
+        """Cabeçalhos condicionais (If-None-Match / If-Modified-Since) para a URL"""
+        with self._lock:
+            linha = self._conexao.execute(
+                'SELECT etag, last_modified FROM respostas WHERE url = ?', (url,)
+            ).fetchone()
+        headers = {}
+        if linha:
+            etag, last_modified = linha
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def ler(self, url):
+        with self._lock:
+            linha = self._conexao.execute('SELECT conteudo FROM respostas WHERE url = ?', (url,)).fetchone()
+        return linha[0] if linha else None
+
+    def gravar(self, url, conteudo, etag=None, last_modified=None):
+        with self._lock:
+            # Uma nova versão da página invalida o que foi extraído da anterior
+            self._conexao.execute('DELETE FROM extraidos WHERE url = ?', (url,))
+            self._conexao.execute(
+                'INSERT OR REPLACE INTO respostas (url, etag, last_modified, conteudo, atualizado_em) VALUES (?, ?, ?, ?, ?)',
+                (url, etag, last_modified, conteudo, time.time())
+            )
+            self._conexao.commit()
+
+    def ler_extraidos(self, url, tipo):
+        with self._lock:
+            linha = self._conexao.execute(
+                'SELECT dados FROM extraidos WHERE url = ? AND tipo = ?', (url, tipo)
+            ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def gravar_extraidos(self, url, tipo, dados):
+        with self._lock:
+            self._conexao.execute(
+                'INSERT OR REPLACE INTO extraidos (url, tipo, dados) VALUES (?, ?, ?)',
+                (url, tipo, json.dumps(dados, ensure_ascii=False))
+            )
+            self._conexao.commit()
+
+    def ler_secao(self, url, tipo, impressao):
+        """Registros já extraídos de um trecho com essa impressão digital (ou None)"""
+        with self._lock:
+            linha = self._conexao.execute(
+                'SELECT dados FROM secoes WHERE url = ? AND tipo = ? AND impressao = ?', (url, tipo, impressao)
+            ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def gravar_secao(self, url, tipo, impressao, dados):
+        with self._lock:
+            self._conexao.execute(
+                'INSERT OR REPLACE INTO secoes (url, tipo, impressao, dados, atualizado_em) VALUES (?, ?, ?, ?, ?)',
+                (url, tipo, impressao, json.dumps(dados, ensure_ascii=False), time.time())
+            )
+            self._conexao.commit()
+
+    def podar_secoes(self, url, tipo, manter):
+        """Remove as impressões da URL que não apareceram na última execução"""
+        manter = list(manter)
+        marcadores = ','.join('?' * len(manter))
+        with self._lock:
+            self._conexao.execute(
+                f'DELETE FROM secoes WHERE url = ? AND tipo = ? AND impressao NOT IN ({marcadores})',
+                (url, tipo, *manter)
+            )
+            self._conexao.commit()
+
+    def ler_instantaneo(self, chave, tipo):
+        """(dados, diferencas, criado_em) do último resultado gravado, ou None"""
+        with self._lock:
+            linha = self._conexao.execute(
+                'SELECT dados, diferencas, criado_em FROM instantaneos WHERE chave = ? AND tipo = ?', (chave, tipo)
+            ).fetchone()
+        return (json.loads(linha[0]), json.loads(linha[1]), linha[2]) if linha else None
+
+    def gravar_instantaneo(self, chave, tipo, dados, diferencas):
+        with self._lock:
+            self._conexao.execute(
+                'INSERT OR REPLACE INTO instantaneos (chave, tipo, dados, diferencas, criado_em) VALUES (?, ?, ?, ?, ?)',
+                (chave, tipo, json.dumps(dados, ensure_ascii=False), json.dumps(diferencas, ensure_ascii=False), time.time())
+            )
+            self._conexao.commit()
+
+
+class ClienteHttp:
+    """Cliente HTTP assíncrono compartilhado pelos scrapers.
+
+    Mantém um event loop próprio em uma thread de fundo e uma única
+    `aiohttp.ClientSession`, de modo que as conexões (keep-alive) são
+    reaproveitadas entre execuções. O pool limita conexões totais e por host.
+    Falhas transitórias (429, 5xx, timeout) são repetidas com backoff e
+    jitter; cada host tem um disjuntor, e um host fora do ar falha na hora.
+    """
+
+    def __init__(self, armazem=None, max_conexoes=HTTP_MAX_CONEXOES, max_por_host=HTTP_MAX_POR_HOST,
+                 timeout=HTTP_TIMEOUT, keepalive=HTTP_KEEPALIVE, tentativas=HTTP_TENTATIVAS):
+        self.armazem = armazem or ArmazemRespostas()
+        self.max_conexoes = max_conexoes
+        self.max_por_host = max_por_host
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.tentativas = max(1, tentativas)
+        self._sessao = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='http-fetch', daemon=True)
+        self._thread.start()
+
+    async def _obter_sessao(self):
+        if self._sessao is None or self._sessao.closed:
+            import aiohttp  # ~250 ms de importação: só quando a primeira busca acontece
+            conector = aiohttp.TCPConnector(
+                limit=self.max_conexoes,
+                limit_per_host=self.max_por_host,
+                keepalive_timeout=self.keepalive,
+            )
+            self._sessao = aiohttp.ClientSession(
+                connector=conector,
+                headers=HEADERS_PADRAO,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                auto_decompress=True,
+            )
+        return self._sessao
+
+    async def _buscar_uma(self, url, revalidar, timeout):
+        import aiohttp
+        sessao = await self._obter_sessao()
+        headers = self.armazem.validadores(url) if revalidar else {}
+        contar('http_requisicoes')
+        async with sessao.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resposta:
+            if resposta.status == 304:
+                conteudo = self.armazem.ler(url)
+                if conteudo is not None:
+                    contar('http_304')
+                    return RespostaHttp(url, 304, conteudo, nao_modificado=True)
+                # Armazém perdeu o corpo: busca incondicional
+                return await self._buscar_uma(url, False, timeout)
+            resposta.raise_for_status()
+            conteudo = await resposta.read()
+            contar('http_bytes', len(conteudo))
+            self.armazem.gravar(url, conteudo, resposta.headers.get('ETag'), resposta.headers.get('Last-Modified'))
+            return RespostaHttp(url, resposta.status, conteudo)
+
+    async def _buscar(self, url, revalidar, fim=None):
+        """Uma URL, repetindo 429/5xx/timeouts com backoff, sem passar de `fim` (time.monotonic)"""
+        disjuntor = obter_disjuntor(f'http:{urlsplit(url).hostname}')
+        for tentativa in range(self.tentativas):
+            timeout = self.timeout if fim is None else min(self.timeout, fim - time.monotonic())
+            teste = False
+            try:
+                if timeout <= 0:
+                    raise PrazoEsgotado('buscar')
+                teste = disjuntor.verificar()
+                resposta = await self._buscar_uma(url, revalidar, timeout)
+                disjuntor.sucesso()
+                return resposta
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and fim is not None and time.monotonic() >= fim:
+                    e = PrazoEsgotado('buscar')
+                transitorio = eh_transitorio(e)
+                if transitorio:
+                    disjuntor.falha()
+                elif isinstance(status_do_erro(e), int):
+                    disjuntor.sucesso()  # o servidor respondeu (404, 403...): o host está de pé
+                espera = espera_backoff(tentativa, retry_after=retry_after(e))
+                if (not transitorio or tentativa == self.tentativas - 1
+                        or (fim is not None and time.monotonic() + espera >= fim)):
+                    contar('http_erros')
+                    return RespostaHttp(url, getattr(e, 'status', None), None, erro=e)
+                contar('http_repeticoes')
+                await asyncio.sleep(espera)
+            finally:
+                if teste:
+                    # Prazo ou cancelamento: o teste do meio-aberto não fica preso
+                    disjuntor.liberar()
+
+    async def _buscar_varias(self, urls, revalidar, fim=None):
+        return await asyncio.gather(*(self._buscar(url, revalidar, fim) for url in urls))
+
+    def buscar(self, urls, revalidar=True):
+        """Busca as URLs em paralelo e devolve uma RespostaHttp por URL, na mesma ordem.
+
+        Dentro de uma execução com prazo (resiliencia.nova_execucao), nenhuma
+        requisição ou espera entre tentativas passa do prazo.
+        """
+        verificar_prazo('buscar')
+        limite = restante()
+        fim = None if limite is None else time.monotonic() + limite
+        futuro = asyncio.run_coroutine_threadsafe(self._buscar_varias(list(urls), revalidar, fim), self._loop)
+        return futuro.result()
+
+    def fechar(self):
+        if self._sessao is not None:
+            asyncio.run_coroutine_threadsafe(self._sessao.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+def obter_cliente():
+    """Cliente HTTP único do processo"""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            _cliente = ClienteHttp()
+        return _cliente
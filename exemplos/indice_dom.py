@@ -0,0 +1,163 @@
+import re
+import lxml.html
+
+# Conteúdo que não aparece como texto da página
+TAGS_IGNORADAS = {'script', 'style', 'noscript', 'template'}
+
+PALAVRAS_CLASSIFICACAO = re.compile(r'classificação|tabela', re.I)
+PALAVRA_ARTILHARIA = 'artilh'
+PALAVRAS_ARTILHARIA = re.compile(r'artilharia|artilheiros|goleadores', re.I)
+
+
+class IndiceDom:
+    """Índice de uma página HTML montado em uma única passada pela árvore (lxml).
+
+    Para cada elemento guarda o pai, a profundidade, o tamanho do texto da
+    subárvore (como em `get_text(separator=' ', strip=True)`), se a sua
+    `.string` (no sentido do BeautifulSoup) casa com as palavras-chave e quais
+    nomes aparecem no seu texto próprio. Assim as seções candidatas saem do
+    índice sem percorrer/serializar a árvore de novo; o texto completo só é
+    montado para as seções escolhidas.
+
+    `html` pode ser o texto ou uma árvore lxml já lida (ex.: a mesma usada
+    pelo ExtratorTabelas), para não fazer o parse da página de novo.
+    """
+
+    def __init__(self, html, palavras=PALAVRAS_CLASSIFICACAO, nomes=(), excluir=PALAVRA_ARTILHARIA):
+        if isinstance(html, IndiceDom):
+            raise TypeError('html já é um IndiceDom')
+        if isinstance(html, lxml.html.HtmlElement):
+            raiz = html
+        else:
+            raiz = lxml.html.fromstring(html) if html else lxml.html.fromstring('<html></html>')
+        self.raiz = raiz.getroottree().getroot()
+        self.nomes = list(nomes)
+        padrao_nomes = re.compile('|'.join(re.escape(n) for n in sorted(self.nomes, key=len, reverse=True)), re.I) if self.nomes else None
+        nome_por_minusculo = {n.lower(): n for n in self.nomes}
+
+        self.elementos = []       # id -> elemento lxml
+        self.tags = []            # id -> tag
+        self.pais = []            # id -> id do pai (-1 na raiz)
+        self.profundidades = []
+        self.tem_palavra = []     # `.string` do elemento casa com `palavras`
+        self.filho_unico = []     # elemento tem um único filho e nenhum outro conteúdo
+        self.qtd_textos = []      # nº de trechos de texto na subárvore
+        self.soma_textos = []     # soma dos tamanhos dos trechos (já com strip)
+        self.tem_excluida = []    # subárvore contém `excluir`
+        self.ids_por_nome = {n: [] for n in self.nomes}
+
+        ids = {}
+        for el in self.raiz.iter():
+            if not isinstance(el.tag, str):
+                continue  # comentários; o "tail" é contado pelo pai
+            pai = el.getparent()
+            id_pai = ids.get(pai, -1) if pai is not None else -1
+            if id_pai == -1 and pai is not None:
+                continue  # descendente de uma tag ignorada
+            ignorado = el.tag in TAGS_IGNORADAS
+            id_el = len(self.elementos)
+            if not ignorado:
+                ids[el] = id_el
+            self.elementos.append(el)
+            self.tags.append(el.tag)
+            self.pais.append(id_pai)
+            self.profundidades.append(self.profundidades[id_pai] + 1 if id_pai >= 0 else 0)
+
+            textos = [] if ignorado else [t.strip() for t in [el.text] + [filho.tail for filho in el] if t and t.strip()]
+            proprio = ' '.join(textos)
+            self.qtd_textos.append(len(textos))
+            self.soma_textos.append(sum(len(t) for t in textos))
+            self.tem_excluida.append(bool(excluir) and excluir in proprio.lower())
+            filhos = list(el)
+            if not ignorado and len(filhos) == 0:
+                self.tem_palavra.append(bool(el.text) and palavras.search(el.text) is not None)
+            else:
+                self.tem_palavra.append(False)
+            unico = (not ignorado and len(filhos) == 1 and isinstance(filhos[0].tag, str)
+                     and not el.text and not filhos[0].tail)
+            self.filho_unico.append(unico)
+            if padrao_nomes is not None and proprio:
+                for encontrado in set(m.group(0).lower() for m in padrao_nomes.finditer(proprio)):
+                    self.ids_por_nome[nome_por_minusculo[encontrado]].append(id_el)
+
+        # Agrega da folha para a raiz: na ordem inversa da pré-ordem os filhos vêm antes do pai
+        for id_el in range(len(self.elementos) - 1, 0, -1):
+            id_pai = self.pais[id_el]
+            if id_pai >= 0:
+                if self.filho_unico[id_pai]:
+                    # `.string` de quem tem um único filho é a `.string` do filho
+                    self.tem_palavra[id_pai] = self.tem_palavra[id_el]
+                self.qtd_textos[id_pai] += self.qtd_textos[id_el]
+                self.soma_textos[id_pai] += self.soma_textos[id_el]
+                self.tem_excluida[id_pai] = self.tem_excluida[id_pai] or self.tem_excluida[id_el]
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def comprimento(self, id_el):
+        """Tamanho de `get_text(separator=' ', strip=True)` do elemento, sem montar o texto"""
+        qtd = self.qtd_textos[id_el]
+        return self.soma_textos[id_el] + max(0, qtd - 1)
+
+    def ancestral(self, id_el, niveis=1):
+        for _ in range(niveis):
+            if id_el < 0:
+                break
+            id_el = self.pais[id_el]
+        return id_el
+
+    def texto(self, id_el):
+        """Texto da subárvore, equivalente a `get_text(separator=' ', strip=True)`"""
+        return ' '.join(_textos(self.elementos[id_el]))
+
+    def com_palavra(self, tags=None):
+        """Ids dos elementos cuja `.string` casa com as palavras-chave"""
+        return [i for i, ok in enumerate(self.tem_palavra) if ok and (tags is None or self.tags[i] in tags)]
+
+    def com_nome(self, nome):
+        """Ids dos elementos cujo texto próprio contém `nome`"""
+        return self.ids_por_nome.get(nome, [])
+
+
+def _textos(el):
+    if el.tag in TAGS_IGNORADAS:
+        return
+    if el.text and el.text.strip():
+        yield el.text.strip()
+    for filho in el:
+        if isinstance(filho.tag, str):
+            yield from _textos(filho)
+        if filho.tail and filho.tail.strip():
+            yield filho.tail.strip()
+
+def descobrir_secoes(indice, tamanho_minimo=200, max_nomes=5):
+    """Textos das seções candidatas à tabela de classificação (ou às palavras do índice).
+
+    1. Pais de div/section/table cuja `.string` cita "classificação"/"tabela"
+       (as `palavras` do IndiceDom);
+    2. se nada for encontrado, o container (avô) do primeiro texto que cita
+       cada um dos primeiros `max_nomes` nomes indexados.
+    Seções curtas ou que mencionam `excluir` (artilharia) são descartadas.
+    """
+    vistos = set()
+    secoes = []
+
+    def aceitar(id_secao):
+        if id_secao < 0 or id_secao in vistos:
+            return False
+        if indice.comprimento(id_secao) <= tamanho_minimo or indice.tem_excluida[id_secao]:
+            return False
+        vistos.add(id_secao)
+        secoes.append(indice.texto(id_secao))
+        return True
+
+    for id_el in indice.com_palavra(tags={'div', 'section', 'table'}):
+        aceitar(indice.ancestral(id_el, 1))
+
+    if not secoes:
+        for nome in indice.nomes[:max_nomes]:
+            for id_el in indice.com_nome(nome):
+                if aceitar(indice.ancestral(id_el, 1)):
+                    break
+
+    return secoes
@@ -0,0 +1,187 @@
+import os, json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from decouple import config
+
+LOG_NIVEL = config('LOG_NIVEL', default='INFO')
+# Arquivo JSONL com todos os eventos (vazio = só em memória)
+INSTRUMENTACAO_JSONL = config('INSTRUMENTACAO_JSONL', default='')
+INSTRUMENTACAO_MAX_EVENTOS = config('INSTRUMENTACAO_MAX_EVENTOS', default=5000, cast=int)
+
+# US$ por 1 milhão de tokens (prompt, resposta)
+PRECOS_MODELOS = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1': (2.00, 8.00),
+}
+
+
+class Metricas:
+    """Contadores e tempos acumulados do processo (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.contadores = {}
+            self.tempos = {}  # nome -> [quantidade, total, máximo]
+            self.inicio = time.time()
+
+    def contar(self, nome, valor=1):
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def cronometrar(self, nome, segundos):
+        with self._lock:
+            quantidade, total, maximo = self.tempos.get(nome, (0, 0.0, 0.0))
+            self.tempos[nome] = (quantidade + 1, total + segundos, max(maximo, segundos))
+
+    def resumo(self):
+        with self._lock:
+            contadores = dict(self.contadores)
+            tempos = {nome: {'quantidade': q, 'total_s': round(t, 3), 'medio_ms': round(t / q * 1000, 1), 'max_ms': round(m * 1000, 1)}
+                      for nome, (q, t, m) in sorted(self.tempos.items())}
+            inicio = self.inicio
+        consultas = contadores.get('cache_llm_acertos', 0) + contadores.get('cache_llm_falhas', 0)
+        contadores['custo_estimado_usd'] = round(contadores.get('custo_estimado_usd', 0.0), 6)
+        return {
+            'desde': inicio,
+            'contadores': contadores,
+            'taxa_acerto_cache_llm': round(contadores.get('cache_llm_acertos', 0) / consultas, 3) if consultas else None,
+            'tempos': tempos,
+        }
+
+
+class _ManipuladorEventos(logging.Handler):
+    """Guarda os eventos (últimos N em memória e, se configurado, em um arquivo JSONL)"""
+
+    def __init__(self, caminho=INSTRUMENTACAO_JSONL, maximo=INSTRUMENTACAO_MAX_EVENTOS):
+        super().__init__(logging.DEBUG)
+        self.eventos = deque(maxlen=maximo)
+        self.caminho = caminho
+        self._arquivo_lock = threading.Lock()
+        if caminho:
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+
+    def emit(self, registro):
+        evento = {
+            'ts': round(registro.created, 3),
+            'nivel': registro.levelname,
+            'origem': registro.name,
+            'mensagem': registro.getMessage(),
+            **getattr(registro, 'dados', {}),
+        }
+        self.eventos.append(evento)
+        if self.caminho:
+            linha = json.dumps(evento, ensure_ascii=False, separators=(',', ':'), default=str)
+            with self._arquivo_lock, open(self.caminho, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(linha + '\n')
+
+
+metricas = Metricas()
+_eventos = _ManipuladorEventos()
+_configurado = False
+_configurar_lock = threading.Lock()
+
+def _configurar():
+    global _configurado
+    with _configurar_lock:
+        if _configurado:
+            return
+        raiz = logging.getLogger('scraping')
+        raiz.setLevel(logging.DEBUG)
+        raiz.propagate = False
+        console = logging.StreamHandler()
+        console.setLevel(getattr(logging, str(LOG_NIVEL).upper(), logging.INFO))
+        console.setFormatter(logging.Formatter('%(message)s'))
+        raiz.addHandler(console)
+        raiz.addHandler(_eventos)
+        _configurado = True
+
+def obter_logger(nome):
+    """Logger 'scraping.<nome>': mensagens no console (LOG_NIVEL) e eventos estruturados"""
+    _configurar()
+    return logging.getLogger(f'scraping.{nome}')
+
+_log = obter_logger('instrumentacao')
+
+
+def contar(nome, valor=1):
+    """Soma `valor` ao contador `nome` (bytes HTTP, chamadas, fallbacks...)"""
+    metricas.contar(nome, valor)
+
+@contextmanager
+def medir(nome, logger=None, nivel=logging.DEBUG, **atributos):
+    """Span de tempo: acumula a duração em `nome` e registra um evento estruturado ao final"""
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        yield atributos
+    except Exception as e:
+        erro = e
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        metricas.cronometrar(nome, duracao)
+        dados = {'evento': 'span', 'span': nome, 'duracao_ms': round(duracao * 1000, 2), **atributos}
+        if erro is not None:
+            dados['erro'] = f'{type(erro).__name__}: {erro}'
+        (logger or _log).log(nivel, f"⏱️ {nome}: {duracao * 1000:.1f} ms", extra={'dados': dados})
+
+def custo_estimado(modelo, tokens_prompt, tokens_resposta):
+    """Custo em US$ pela tabela PRECOS_MODELOS (0 para modelos desconhecidos)"""
+    preco_prompt, preco_resposta = PRECOS_MODELOS.get(modelo, (0.0, 0.0))
+    return (tokens_prompt * preco_prompt + tokens_resposta * preco_resposta) / 1_000_000
+
+def registrar_llm(modelo, tokens_prompt, tokens_resposta, fator_preco=1.0):
+    """Conta uma chamada ao LLM com seus tokens e o custo estimado (`fator_preco` 0.5 na Batch API)"""
+    custo = custo_estimado(modelo, tokens_prompt, tokens_resposta) * fator_preco
+    contar('llm_chamadas')
+    contar('tokens_prompt', tokens_prompt)
+    contar('tokens_resposta', tokens_resposta)
+    contar('custo_estimado_usd', custo)
+    _log.debug(f"🤖 {modelo}: {tokens_prompt} + {tokens_resposta} tokens (US$ {custo:.5f})",
+               extra={'dados': {'evento': 'llm', 'modelo': modelo, 'tokens_prompt': tokens_prompt,
+                                'tokens_resposta': tokens_resposta, 'custo_usd': custo}})
+
+
+class _ContagemVazia:
+    prompt_tokens = 0
+    completion_tokens = 0
+
+@contextmanager
+def chamada_llm(modelo):
+    """Envolve uma chamada ao LLM: span 'llm' + tokens/custo lidos do callback da OpenAI"""
+    try:
+        from langchain_community.callbacks import get_openai_callback
+        contexto = get_openai_callback()
+    except ImportError:
+        from contextlib import nullcontext
+        contexto = nullcontext(_ContagemVazia())
+    with medir('llm', modelo=modelo), contexto as contagem:
+        yield contagem
+    registrar_llm(modelo, contagem.prompt_tokens, contagem.completion_tokens)
+
+def resumo():
+    """Contadores e tempos acumulados desde o início (ou desde `zerar`)"""
+    return metricas.resumo()
+
+def zerar():
+    metricas.zerar()
+    _eventos.eventos.clear()
+
+def eventos():
+    """Eventos recentes (mais antigos primeiro)"""
+    return list(_eventos.eventos)
+
+def exportar_jsonl():
+    """Eventos recentes + uma linha final de resumo, em JSON lines"""
+    linhas = [json.dumps(evento, ensure_ascii=False, separators=(',', ':'), default=str) for evento in eventos()]
+    linhas.append(json.dumps({'evento': 'resumo', **resumo()}, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,227 @@
+"""Scraping em lote: várias competições/listas de ações a partir de um manifesto.
+
+Cada job do manifesto roda em um processo do pool (os processos são
+reaproveitados entre jobs, com clientes HTTP/LLM já aquecidos). Um job que
+passa do tempo limite tem o processo encerrado e substituído. As linhas
+extraídas são gravadas em JSONL compacto (um registro por linha) assim que
+cada job termina.
+
+Manifesto (.jsonl: um objeto por linha; ou texto: `tipo url [nome]` por linha):
+
+    {"tipo": "classificacao", "url": "https://ge.globo.com/futebol/brasileirao-serie-b/", "nome": "serie-b"}
+    acoes https://br.tradingview.com/markets/stocks-brazil/market-movers-large-cap/ big-caps
+    {"tipo": "mercado", "nome": "b3"}
+
+    python exemplos/lote.py manifesto.jsonl --saida resultados.jsonl --processos 4 --timeout 300
+    python exemplos/lote.py manifesto.jsonl --fila --timeout 0   # extração pela Batch API da OpenAI
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import multiprocessing
+from multiprocessing.connection import wait
+from decouple import config
+
+_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _caminho in (_raiz, os.path.join(_raiz, 'exemplos')):
+    if _caminho not in sys.path:
+        sys.path.insert(0, _caminho)
+
+LOTE_PROCESSOS = config('LOTE_PROCESSOS', default=4, cast=int)
+LOTE_TIMEOUT = config('LOTE_TIMEOUT', default=300, cast=float)  # segundos por job
+
+
+class Job:
+    """Uma linha do manifesto"""
+
+    def __init__(self, indice, tipo, urls, nome=None):
+        self.indice = indice
+        self.tipo = tipo
+        self.urls = list(urls)
+        self.nome = nome or f'{tipo}-{indice}'
+
+    def __repr__(self):
+        return f'Job({self.nome!r}, {self.tipo!r}, {len(self.urls)} URL(s))'
+
+
+def ler_manifesto(caminho):
+    """Jobs do manifesto, na ordem do arquivo (linhas vazias e `#` são ignoradas)"""
+    import registro
+    jobs = []
+    with open(caminho, encoding='utf-8') as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            linha = linha.strip()
+            if not linha or linha.startswith('#'):
+                continue
+            if linha.startswith('{'):
+                item = json.loads(linha)
+                tipo, nome = item.get('tipo'), item.get('nome')
+                urls = item.get('urls') or ([item['url']] if item.get('url') else [])
+            else:
+                partes = linha.split()
+                tipo, urls, nome = partes[0], partes[1:2], (partes[2] if len(partes) > 2 else None)
+            if tipo not in registro.SCRAPERS:
+                raise ValueError(f"{caminho}:{numero}: tipo desconhecido {tipo!r} (use {', '.join(registro.SCRAPERS)})")
+            if not urls and tipo not in ('agente', 'consulta', 'mercado'):
+                raise ValueError(f"{caminho}:{numero}: job sem URL")
+            jobs.append(Job(len(jobs), tipo, urls, nome))
+    return jobs
+
+
+def _trabalhador(conexao):
+    """Processo do pool: recebe (indice, tipo, urls), devolve ('ok'|'erro', indice, dados, segundos)"""
+    import registro
+    # Os logs dos scrapers vão para stderr: stdout pode ser a saída JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        while True:
+            try:
+                tarefa = conexao.recv()
+            except EOFError:
+                return
+            if tarefa is None:
+                return
+            indice, tipo, urls = tarefa
+            inicio = time.perf_counter()
+            try:
+                # Sem URLs (agente, mercado), valem as do próprio scraper
+                argumentos = {'urls': urls} if urls and tipo != 'agente' else {}
+                dados = registro.executar(tipo, **argumentos)
+                conexao.send(('ok', indice, dados, time.perf_counter() - inicio))
+            except Exception as e:
+                conexao.send(('erro', indice, f'{type(e).__name__}: {e}', time.perf_counter() - inicio))
+
+
+class _Processo:
+    def __init__(self, contexto):
+        self.conexao, filho = contexto.Pipe()
+        self.processo = contexto.Process(target=_trabalhador, args=(filho,), daemon=True)
+        self.processo.start()
+        filho.close()
+        self.job = None
+        self.inicio = None
+
+    def enviar(self, job):
+        self.job = job
+        self.inicio = time.monotonic()
+        self.conexao.send((job.indice, job.tipo, job.urls))
+
+    def encerrar(self, forcar=False):
+        try:
+            if forcar:
+                self.processo.terminate()
+            else:
+                self.conexao.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.processo.join(5)
+        if self.processo.is_alive():
+            self.processo.kill()
+        self.conexao.close()
+
+
+def executar_lote(jobs, ao_terminar, processos=LOTE_PROCESSOS, timeout=LOTE_TIMEOUT):
+    """Distribui os jobs entre `processos` processos; chama `ao_terminar(job, status, dados, segundos)` por job.
+
+    `status` é 'ok', 'erro' (dados = mensagem) ou 'timeout'.
+    """
+    contexto = multiprocessing.get_context()
+    pendentes = list(jobs)
+    pool = [_Processo(contexto) for _ in range(max(1, min(processos, len(jobs))))]
+    try:
+        while pendentes or any(p.job for p in pool):
+            for p in pool:
+                if p.job is None and pendentes:
+                    p.enviar(pendentes.pop(0))
+            ativos = [p for p in pool if p.job is not None]
+            prontos = wait([p.conexao for p in ativos], timeout=0.5)
+            for p in ativos:
+                job = p.job
+                if p.conexao in prontos:
+                    try:
+                        status, _, dados, segundos = p.conexao.recv()
+                    except (EOFError, OSError):
+                        # Processo morreu no meio do job (ex.: falta de memória)
+                        status, dados, segundos = 'erro', 'processo encerrado inesperadamente', time.monotonic() - p.inicio
+                        pool[pool.index(p)] = _Processo(contexto)
+                        p.encerrar(forcar=True)
+                    p.job = None
+                    ao_terminar(job, status, dados, segundos)
+                elif timeout and time.monotonic() - p.inicio > timeout:
+                    # Não há como interromper o scraper por dentro: troca o processo
+                    pool[pool.index(p)] = _Processo(contexto)
+                    p.encerrar(forcar=True)
+                    ao_terminar(job, 'timeout', None, time.monotonic() - p.inicio)
+    finally:
+        for p in pool:
+            p.encerrar(forcar=p.job is not None)
+
+
+def linhas_do_resultado(job, dados):
+    """Um registro JSONL por linha extraída, identificado pelo job.
+
+    Resultados com várias seções ('brasileirao': {'classificacao': [...],
+    'artilharia': [...]}) também viram uma linha por registro, com a
+    `secao` de onde ele veio.
+    """
+    identificacao = {'job': job.nome, 'tipo': job.tipo, 'url': job.urls[0] if job.urls else None}
+    if isinstance(dados, dict) and dados and all(isinstance(valor, list) for valor in dados.values()):
+        for secao, registros in dados.items():
+            for registro in registros:
+                yield {**identificacao, 'secao': secao, **registro}
+        return
+    if isinstance(dados, dict):
+        dados = [dados]
+    for registro in dados or []:
+        yield {**identificacao, **registro}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('manifesto')
+    parser.add_argument('--saida', default='resultados.jsonl', help="arquivo JSONL ('-' para stdout)")
+    parser.add_argument('--processos', type=int, default=LOTE_PROCESSOS)
+    parser.add_argument('--timeout', type=float, default=LOTE_TIMEOUT, help='segundos por job (0 = sem limite)')
+    parser.add_argument('--fila', action='store_true',
+                        help='extração pela Batch API da OpenAI (metade do preço, até 24h; combine com --timeout 0)')
+    args = parser.parse_args(argumentos)
+    if args.fila:
+        # Lido pelos processos do pool quando importam extracao_lote
+        os.environ['LLM_EXTRACAO_MODO'] = 'fila'
+
+    jobs = ler_manifesto(args.manifesto)
+    print(f"📋 {len(jobs)} jobs, {args.processos} processos, timeout {args.timeout:.0f}s", file=sys.stderr)
+    saida = sys.stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8')
+    resumo = {'ok': 0, 'erro': 0, 'timeout': 0, 'linhas': 0}
+    inicio = time.perf_counter()
+
+    def ao_terminar(job, status, dados, segundos):
+        linhas = 0
+        if status == 'ok':
+            for linha in linhas_do_resultado(job, dados):
+                saida.write(json.dumps(linha, ensure_ascii=False, separators=(',', ':')) + '\n')
+                linhas += 1
+            saida.flush()
+        resumo[status] += 1
+        resumo['linhas'] += linhas
+        taxa = linhas / segundos if segundos else 0.0
+        icone = {'ok': '✅', 'erro': '❌', 'timeout': '⏱️'}[status]
+        detalhe = f" ({dados})" if status == 'erro' else ''
+        print(f"{icone} {job.nome}: {linhas} linhas em {segundos:.1f}s ({taxa:.1f} linhas/s){detalhe}", file=sys.stderr)
+
+    try:
+        executar_lote(jobs, ao_terminar, processos=args.processos, timeout=args.timeout)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    total = time.perf_counter() - inicio
+    print(f"🎯 {resumo['ok']} ok, {resumo['erro']} com erro, {resumo['timeout']} timeout; "
+          f"{resumo['linhas']} linhas em {total:.1f}s ({resumo['linhas'] / total if total else 0:.1f} linhas/s)",
+          file=sys.stderr)
+    return 0 if resumo['erro'] == resumo['timeout'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Conversão vetorizada dos campos numéricos das ações (colunas inteiras de uma vez).
+
+O TradingView mostra '1,23 T BRL', '−2,5%', '12.3 M', '37,50 BRL'... Aqui
+cada coluna passa por operações de string do pandas (regex, rfind,
+replace) e um único `to_numeric`, sem laço em Python por valor.
+
+    numeros(['1,23 T BRL', '−2,5%', '12.3 M'])  # -> [1.23e12, -2.5, 1.23e7]
+"""
+import re
+
+# Valores em porcentagem ficam em pontos percentuais (−2,5% -> -2.5)
+CAMPOS_NUMERICOS_ACOES = ['preco', 'variacao', 'volume', 'valor_mercado', 'div_yield']
+CAMPOS_TEXTO_ACOES = ['simbolo_empresa', 'nome_empresa', 'setor_empresa', 'classificacao_analistas']
+
+SUFIXOS = {'k': 1e3, 'mil': 1e3, 'm': 1e6, 'mi': 1e6, 'mm': 1e6, 'b': 1e9, 'bi': 1e9, 't': 1e12, 'tri': 1e12}
+
+# Menos Unicode, travessões e espaços especiais -> ASCII
+TRADUCAO = str.maketrans({'\u2212': '-', '\u2013': '-', '\u2014': '-', '\u00a0': ' ', '\u202f': ' ', '\u2009': ' '})
+
+# [moeda/símbolo] sinal número [sufixo] [moeda] [%]
+PADRAO = re.compile(
+    r'^[^\d+\-]*?(?P<sinal>[+\-]?)\s*(?P<numero>\d[\d.,\s]*\d|\d)\s*'
+    r'(?P<sufixo>tri|bi|mi|mm|mil|[kmbt])?(?![a-z])\s*(?P<moeda>[a-z]{3})?',
+    re.I,
+)
+
+
+def numeros(valores):
+    """Série float64 com os números de `valores` (NaN onde não houver número)"""
+    import numpy as np
+    import pandas as pd
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype='object')
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64')
+    texto = serie.astype('string').str.translate(TRADUCAO).str.strip()
+    partes = texto.str.extract(PADRAO)
+    numero = partes['numero'].str.replace(' ', '', regex=False)
+
+    # O separador que aparece por último é o decimal; '1.234.567' (só pontos repetidos) é milhar
+    virgula = numero.str.rfind(',')
+    ponto = numero.str.rfind('.')
+    decimal_virgula = (virgula > ponto).fillna(False).astype(bool)
+    so_milhar = ((virgula < 0) & (numero.str.count(r'\.') > 1)).fillna(False).astype(bool)
+    numero = numero.mask(decimal_virgula, numero.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    numero = numero.mask(~decimal_virgula, numero.str.replace(',', '', regex=False))
+    numero = numero.mask(so_milhar, numero.str.replace('.', '', regex=False))
+
+    resultado = pd.to_numeric(numero, errors='coerce').astype('float64')
+    multiplicador = partes['sufixo'].str.lower().map(SUFIXOS).astype('float64').fillna(1.0)
+    sinal = np.where((partes['sinal'] == '-').fillna(False).astype(bool), -1.0, 1.0)
+    # Valores que já são números (37.5, '1e12') valem como estão
+    direto = pd.to_numeric(serie, errors='coerce')
+    return direto.astype('float64').fillna(resultado * multiplicador * sinal)
+
+def moedas(valores):
+    """Código da moeda de cada valor ('BRL', 'USD'...) ou <NA>"""
+    import pandas as pd
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype='object')
+    return serie.astype('string').str.translate(TRADUCAO).str.extract(PADRAO)['moeda'].str.upper()
+
+
+def normalizar_acoes(df):
+    """DataFrame de ações com colunas tipadas: números em float64, textos em string, `moeda` do preço"""
+    import pandas as pd
+    df = df.copy()
+    for campo in CAMPOS_TEXTO_ACOES:
+        if campo in df.columns:
+            df[campo] = df[campo].astype('string').str.strip()
+    if 'preco' in df.columns:
+        df['moeda'] = moedas(df['preco'])
+    campos = [c for c in CAMPOS_NUMERICOS_ACOES if c in df.columns]
+    if campos:
+        # Todas as colunas numéricas em uma série só: cada operação de string roda uma vez
+        convertidos = numeros(pd.concat([df[c].astype('object') for c in campos], ignore_index=True)).to_numpy()
+        for i, campo in enumerate(campos):
+            df[campo] = convertidos[i * len(df):(i + 1) * len(df)]
+    return df
+
+
+def estatisticas_acoes(df):
+    """Estatísticas por coluna numérica (contagem, mínimo, mediana, média, máximo, soma).
+
+    Vale para os nomes dos campos ou para os já renomeados da exibição.
+    """
+    numericas = df.select_dtypes('number')
+    if numericas.empty:
+        return None
+    return numericas.agg(['count', 'min', 'median', 'mean', 'max', 'sum']).T
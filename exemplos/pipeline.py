@@ -0,0 +1,452 @@
+import queue
+import threading
+import time
+from decouple import config
+from instrumentacao import obter_logger, medir, contar
+from resiliencia import Execucao, PrazoEsgotado, CircuitoAberto, execucao_atual, usar_execucao
+
+log = obter_logger('pipeline')
+
+PIPELINE_TAMANHO_FILA = config('PIPELINE_TAMANHO_FILA', default=8, cast=int)
+
+_FIM = object()
+_VAZIO = object()
+
+
+class Pagina:
+    """Página buscada e decodificada, pronta para ser fatiada"""
+
+    def __init__(self, url, html, ordem=None):
+        self.url = url
+        self.html = html
+        self.ordem = ordem  # posição da página entre várias (ex.: listas paginadas)
+
+
+class Trecho:
+    """Unidade que atravessa as etapas de extração.
+
+    Ou traz `texto` ainda a extrair (vai para o LLM), ou `registros` já
+    prontos (tabela HTML, armazém). `ordem` permite devolver o resultado
+    final na ordem da página, mesmo com etapas paralelas. Em pipelines com
+    mais de um schema (ver extracao_lote.ExtratorCombinado), `tipo` diz de
+    qual deles são os registros; um texto sem `tipo` vale para todos.
+    """
+
+    def __init__(self, url, ordem=(), texto=None, tokens=None, registros=None, origem=None, tipo=None):
+        self.url = url
+        self.ordem = ordem
+        self.texto = texto
+        self.tokens = tokens
+        self.registros = registros
+        self.origem = origem
+        self.tipo = tipo
+        self.impressao = None  # hash do texto normalizado (ver etapa_reaproveitar)
+
+    def __repr__(self):
+        conteudo = f'registros={len(self.registros)}' if self.registros is not None else f'texto={len(self.texto or "")}'
+        tipo = f', tipo={self.tipo!r}' if self.tipo else ''
+        return f'Trecho({self.url!r}, ordem={self.ordem}, {conteudo}, origem={self.origem!r}{tipo})'
+
+
+class Etapa:
+    """Etapa do pipeline: `funcao(item)` devolve um iterável (ou gerador) de itens para a próxima.
+
+    Devolver None ou uma lista vazia descarta o item. Com `trabalhadores` > 1
+    a etapa processa vários itens ao mesmo tempo (a ordem de saída deixa de
+    ser a de entrada). Com `lote` > 1, `funcao` recebe uma lista: o primeiro
+    item e os que chegarem em até `espera_lote` segundos, até `lote` itens
+    (`espera_lote` None: junta tudo até o fim da entrada).
+    """
+
+    def __init__(self, nome, funcao, trabalhadores=1, tamanho_fila=PIPELINE_TAMANHO_FILA, lote=1, espera_lote=0.05):
+        self.nome = nome
+        self.funcao = funcao
+        self.trabalhadores = max(1, trabalhadores)
+        self.tamanho_fila = tamanho_fila
+        self.lote = max(1, lote)
+        self.espera_lote = espera_lote
+        # Um trabalhador por vez monta o seu lote (senão cada um pegaria um item só)
+        self.lock_lote = threading.Lock()
+        self.entradas = 0
+        self.saidas = 0
+        self.erros = 0
+        self.tempo = 0.0
+        self.em_andamento = 0
+        self.concluida = False
+
+
+class Pipeline:
+    """Etapas ligadas por filas limitadas, cada uma em suas próprias threads.
+
+    `executar(entradas)` é um gerador: cada item sai assim que passa pela
+    última etapa, sem esperar o restante. As filas limitadas seguram as
+    etapas rápidas quando a seguinte está atrasada. Um erro em um item é
+    registrado e só aquele item é descartado.
+
+    As threads das etapas seguem a execução (resiliencia.Execucao) de quem
+    chamou `executar`: com prazo, ao esgotá-lo o gerador entrega o que já
+    está pronto e para, e cada etapa que ficou para trás (ou que teve erros)
+    aparece em `execucao.relatorio()`.
+    """
+
+    def __init__(self, etapas, nome='pipeline'):
+        self.etapas = list(etapas)
+        self.nome = nome
+        self.execucao = None
+        self._cancelado = threading.Event()
+        self._lock = threading.Lock()
+
+    # --- filas ---
+
+    def _colocar(self, fila, item):
+        while not self._cancelado.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _retirar(self, fila, limite=None):
+        inicio = time.monotonic()
+        while not self._cancelado.is_set():
+            try:
+                return fila.get(timeout=0.1)
+            except queue.Empty:
+                if limite is not None and time.monotonic() - inicio >= limite:
+                    return _VAZIO
+        return _FIM
+
+    def _completar_lote(self, etapa, fila, primeiro):
+        """(itens, fim): `primeiro` + os que chegarem a tempo; `fim` se o marcador de fim apareceu"""
+        itens = [primeiro]
+        limite = None if etapa.espera_lote is None else time.monotonic() + etapa.espera_lote
+        while len(itens) < etapa.lote and not self._cancelado.is_set():
+            restante = 0.1 if limite is None else limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                item = fila.get(timeout=restante)
+            except queue.Empty:
+                if limite is None:
+                    continue
+                break
+            if item is _FIM:
+                return itens, True
+            itens.append(item)
+        return itens, False
+
+    # --- threads ---
+
+    def _na_execucao(self, alvo):
+        def rodar(*args):
+            with usar_execucao(self.execucao):
+                alvo(*args)
+        return rodar
+
+    def _alimentar(self, entradas, saida):
+        try:
+            for item in entradas:
+                if not self._colocar(saida, item):
+                    return
+        finally:
+            self._colocar(saida, _FIM)
+
+    def _trabalhar(self, etapa, entrada, saida, restantes):
+        fim = False
+        while not fim:
+            if etapa.lote > 1:
+                with etapa.lock_lote:
+                    item = self._retirar(entrada)
+                    if item is not _FIM:
+                        item, fim = self._completar_lote(etapa, entrada, item)
+            else:
+                item = self._retirar(entrada)
+            if item is _FIM:
+                # Devolve o marcador para as outras threads da mesma etapa
+                self._colocar(entrada, _FIM)
+                break
+            quantidade = len(item) if etapa.lote > 1 else 1
+            if self.execucao.esgotado:
+                self.execucao.degradar(etapa.nome, 'prazo', f"{quantidade} item(ns) não processados")
+                self._cancelado.set()
+                break
+            with self._lock:
+                etapa.entradas += quantidade
+                etapa.em_andamento += quantidade
+            inicio = time.perf_counter()
+            try:
+                with medir(f'etapa.{etapa.nome}', log, pipeline=self.nome, etapa=etapa.nome):
+                    for resultado in etapa.funcao(item) or ():
+                        if not self._colocar(saida, resultado):
+                            break
+                        with self._lock:
+                            etapa.saidas += 1
+            except Exception as e:
+                with self._lock:
+                    etapa.erros += 1
+                contar('erros_etapa')
+                motivo = 'prazo' if isinstance(e, PrazoEsgotado) else 'disjuntor' if isinstance(e, CircuitoAberto) else 'erro'
+                self.execucao.degradar(etapa.nome, motivo, e)
+                log.error(f"❌ Erro na etapa {etapa.nome}: {e}",
+                          extra={'dados': {'evento': 'erro', 'pipeline': self.nome, 'etapa': etapa.nome}})
+            finally:
+                with self._lock:
+                    etapa.em_andamento -= quantidade
+                    etapa.tempo += time.perf_counter() - inicio
+        if fim:
+            self._colocar(entrada, _FIM)
+        with self._lock:
+            restantes[id(etapa)] -= 1
+            ultima = restantes[id(etapa)] == 0
+            if ultima:
+                etapa.concluida = True
+        if ultima:
+            self._colocar(saida, _FIM)
+
+    def executar(self, entradas, intervalo=None):
+        """Gerador com os itens que saem da última etapa, na ordem em que ficam prontos.
+
+        Com `intervalo` (segundos), emite None sempre que nada fica pronto
+        nesse tempo, para quem consome poder atualizar o progresso.
+        """
+        self._cancelado.clear()
+        self.execucao = execucao_atual() or Execucao(nome=self.nome)
+        filas = [queue.Queue(maxsize=max(1, etapa.tamanho_fila)) for etapa in self.etapas]
+        filas.append(queue.Queue(maxsize=PIPELINE_TAMANHO_FILA))
+        restantes = {id(etapa): etapa.trabalhadores for etapa in self.etapas}
+        threads = [threading.Thread(target=self._na_execucao(self._alimentar), args=(entradas, filas[0]),
+                                    name=f'{self.nome}-entrada', daemon=True)]
+        for i, etapa in enumerate(self.etapas):
+            for n in range(etapa.trabalhadores):
+                threads.append(threading.Thread(target=self._na_execucao(self._trabalhar),
+                                                args=(etapa, filas[i], filas[i + 1], restantes),
+                                                name=f'{self.nome}-{etapa.nome}-{n}', daemon=True))
+        for thread in threads:
+            thread.start()
+        # Com prazo, o consumidor acorda de tempos em tempos para conferi-lo
+        espera = intervalo if intervalo is not None or self.execucao.fim is None else 0.1
+        concluido = False
+        inicio = time.perf_counter()
+        try:
+            while True:
+                item = self._retirar(filas[-1], espera)
+                if item is _FIM:
+                    concluido = not self._cancelado.is_set()
+                    break
+                if item is not _VAZIO:
+                    yield self._entregar(item)
+                elif intervalo is not None:
+                    yield None
+                if self.execucao.esgotado:
+                    # Entrega o que já ficou pronto; as etapas atrasadas vão para o relatório
+                    self._degradar_atrasadas()
+                    yield from self._drenar(filas[-1])
+                    break
+        finally:
+            if not concluido:
+                # Consumidor parou antes do fim (ou cancelou): encerra as etapas que ainda rodam
+                self._cancelado.set()
+            duracao = time.perf_counter() - inicio
+            log.info(f"⏱️ {self.nome}: {duracao:.2f}s" + ('' if concluido else ' (interrompido)'),
+                     extra={'dados': {'evento': 'pipeline', 'pipeline': self.nome, 'concluido': concluido,
+                                      'duracao_ms': round(duracao * 1000, 2), 'etapas': self.estatisticas(),
+                                      'degradacoes': self.execucao.relatorio()['degradacoes']}})
+
+    def _drenar(self, fila):
+        while True:
+            try:
+                item = fila.get_nowait()
+            except queue.Empty:
+                return
+            if item is _FIM:
+                return
+            yield self._entregar(item)
+
+    @staticmethod
+    def _entregar(item):
+        # Linhas por caminho (tabela, llm, armazem, impressao), para o painel de instrumentação
+        if isinstance(item, Trecho) and item.registros and item.origem:
+            contar(f'caminho_{item.origem}', len(item.registros))
+        return item
+
+    def _degradar_atrasadas(self):
+        """Anota a etapa que segurou a execução quando o prazo acabou.
+
+        É a última que ainda trabalhava: as anteriores só estão paradas
+        esperando espaço na fila dela (sem nenhuma trabalhando, a primeira
+        não concluída).
+        """
+        pendentes = [e for e in self.estatisticas() if not e['concluida']]
+        atrasadas = [e for e in pendentes if e['em_andamento']] or pendentes
+        if atrasadas:
+            etapa = atrasadas[-1] if atrasadas[0]['em_andamento'] else atrasadas[0]
+            self.execucao.degradar(etapa['etapa'], 'prazo',
+                                   f"{etapa['em_andamento']} item(ns) em andamento, {etapa['saidas']} prontos")
+
+    def cancelar(self):
+        """Interrompe a execução; as chamadas já em andamento terminam, as próximas não começam"""
+        self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def estatisticas(self):
+        """Contadores por etapa (entradas, saídas, erros, em andamento, tempo)"""
+        with self._lock:
+            return [{
+                'etapa': etapa.nome,
+                'entradas': etapa.entradas,
+                'saidas': etapa.saidas,
+                'erros': etapa.erros,
+                'em_andamento': etapa.em_andamento,
+                'concluida': etapa.concluida,
+                'tempo': round(etapa.tempo, 3),
+            } for etapa in self.etapas]
+
+
+# --- etapas reutilizáveis ---
+
+def etapa_buscar(cliente=None, trabalhadores=4):
+    """URL -> RespostaHttp (pelo cliente HTTP compartilhado; erros são descartados)"""
+    def buscar(url):
+        from http_fetch import obter_cliente
+        resposta = (cliente or obter_cliente()).buscar([url])[0]
+        log.info(f"🌐 Fazendo scraping de: {url}")
+        if not resposta.ok:
+            raise resposta.erro
+        return [resposta]
+    return Etapa('buscar', buscar, trabalhadores=trabalhadores)
+
+def etapa_extrair_lote(extrator, trabalhadores=None):
+    """Trechos com texto -> Trechos com registros, vários trechos por requisição.
+
+    `extrator` é um extracao_lote.ExtratorLote: os trechos que chegam juntos
+    (até `extrator.max_itens`) vão ao LLM em uma só chamada, com as
+    instruções uma vez só. Trechos que já trazem registros passam direto.
+    Com um ExtratorCombinado, cada trecho extraído sai dividido em um
+    trecho por tipo de registro.
+    """
+    from extracao_concorrente import LLM_MAX_CONCORRENCIA
+    from extracao_lote import LLM_LOTE_ESPERA
+
+    def extrair(trechos):
+        pendentes = [trecho for trecho in trechos if trecho.registros is None]
+        divididos = {}
+        if pendentes:
+            for trecho, registros in zip(pendentes, extrator.extrair([trecho.texto for trecho in pendentes])):
+                trecho.origem = trecho.origem or 'llm'
+                if extrator.tipos is None:
+                    trecho.registros = registros or []
+                else:
+                    divididos[id(trecho)] = dividir(trecho, {tipo: (registros or {}).get(tipo) for tipo in extrator.tipos})
+        if not divididos:
+            return trechos
+        return [parte for trecho in trechos for parte in divididos.get(id(trecho), [trecho])]
+
+    if extrator.modo == 'fila':
+        # Um único job da Batch API com todos os trechos da execução
+        return Etapa('extrair', extrair, lote=100_000, espera_lote=None)
+    return Etapa('extrair', extrair, trabalhadores=trabalhadores or LLM_MAX_CONCORRENCIA,
+                 lote=extrator.max_itens, espera_lote=LLM_LOTE_ESPERA)
+
+def etapa_reaproveitar(tipo, cliente=None):
+    """Trecho cujo texto normalizado não mudou desde a última execução recebe os registros de antes.
+
+    Só os trechos novos ou alterados seguem sem registros para o LLM. Com
+    vários tipos (extração combinada), o trecho só é reaproveitado se todos
+    tiverem registros guardados, e sai dividido em um trecho por tipo.
+    """
+    from diferencas import impressao_texto
+    from http_fetch import obter_cliente
+    tipos = [tipo] if isinstance(tipo, str) else list(tipo)
+
+    def reaproveitar(trecho):
+        if trecho.registros is None and trecho.texto:
+            trecho.impressao = impressao_texto(trecho.texto)
+            armazem = (cliente or obter_cliente()).armazem
+            anteriores = {t: armazem.ler_secao(trecho.url, t, trecho.impressao) for t in tipos}
+            if all(registros is not None for registros in anteriores.values()):
+                trecho.origem = 'impressao'
+                contar('trechos_reaproveitados')
+                if not isinstance(tipo, str):
+                    return dividir(trecho, anteriores)
+                trecho.registros = anteriores[tipo]
+        return [trecho]
+    return Etapa('reaproveitar', reaproveitar)
+
+def etapa_memorizar(tipo=None, cliente=None):
+    """Guarda os registros validados de cada trecho extraído, pela impressão do seu texto.
+
+    O tipo gravado é o do próprio trecho, quando ele tiver um (extração combinada).
+    """
+    from http_fetch import obter_cliente
+
+    def memorizar(trecho):
+        if trecho.impressao and trecho.origem != 'impressao':
+            (cliente or obter_cliente()).armazem.gravar_secao(trecho.url, trecho.tipo or tipo, trecho.impressao,
+                                                              trecho.registros)
+        return [trecho]
+    return Etapa('memorizar', memorizar)
+
+def etapa_deduplicar(chave, preferir=None):
+    """Remove registros repetidos (mesma `chave(registro)`) entre todos os trechos.
+
+    Com `preferir(novo, atual)`, um repetido que deve substituir o anterior
+    é emitido de novo; quem consome fica com o último de cada chave.
+    """
+    vistos = {}
+
+    def deduplicar(trecho):
+        novos = []
+        for registro in trecho.registros or []:
+            valor = chave(registro)
+            if valor in vistos and not (preferir and preferir(registro, vistos[valor])):
+                continue
+            vistos[valor] = registro
+            novos.append(registro)
+        # Mesmo sem registros novos o trecho segue: quem consome precisa de todas as impressões
+        trecho.registros = novos
+        return [trecho]
+    return Etapa('deduplicar', deduplicar)
+
+def dividir(trecho, por_tipo):
+    """Um Trecho por tipo a partir de {tipo: registros} extraídos do mesmo texto"""
+    partes = []
+    for tipo, registros in por_tipo.items():
+        parte = Trecho(trecho.url, trecho.ordem, trecho.texto, trecho.tokens, registros or [], trecho.origem, tipo=tipo)
+        parte.impressao = trecho.impressao
+        partes.append(parte)
+    return partes
+
+def do_tipo(trechos, tipo):
+    """Só os trechos de `tipo` (os sem tipo valem para todos)"""
+    return [trecho for trecho in trechos if trecho.tipo in (None, tipo)]
+
+def consolidar(trechos, chave):
+    """Registros finais: o último emitido de cada chave, na ordem da página (`Trecho.ordem`)"""
+    por_chave = {}
+    for trecho in trechos:  # na ordem em que saíram do pipeline
+        for i, registro in enumerate(trecho.registros):
+            por_chave[chave(registro)] = (trecho.ordem, i, registro)
+    return [registro for _, _, registro in sorted(por_chave.values(), key=lambda v: (v[0], v[1]))]
+
+def gravar_extraidos(trechos, tipo, cliente=None):
+    """Guarda no armazém as linhas extraídas de cada URL (reusadas após um 304).
+
+    As impressões de trechos que sumiram da página são descartadas.
+    """
+    from http_fetch import obter_cliente
+    cliente = cliente or obter_cliente()
+    por_url = {}
+    impressoes = {}
+    for trecho in sorted(trechos, key=lambda t: t.ordem):
+        if trecho.origem != 'armazem':
+            por_url.setdefault(trecho.url, []).extend(trecho.registros)
+            impressoes.setdefault(trecho.url, set())
+            if trecho.impressao:
+                impressoes[trecho.url].add(trecho.impressao)
+    for url, dados in por_url.items():
+        cliente.armazem.gravar_extraidos(url, tipo, dados)
+        cliente.armazem.podar_secoes(url, tipo, impressoes[url])
@@ -0,0 +1,226 @@
+import asyncio
+import contextlib
+import threading
+import time
+import concurrent.futures
+from decouple import config
+from resiliencia import PrazoEsgotado, restante
+from instrumentacao import obter_logger, contar
+
+log = obter_logger('navegador')
+
+NAVEGADOR_MAX_PAGINAS = config('NAVEGADOR_MAX_PAGINAS', default=4, cast=int)
+NAVEGADOR_MAX_NAVEGACOES = config('NAVEGADOR_MAX_NAVEGACOES', default=50, cast=int)
+NAVEGADOR_OCIOSO = config('NAVEGADOR_OCIOSO', default=300, cast=int)  # segundos sem uso até fechar
+NAVEGADOR_TIMEOUT = config('NAVEGADOR_TIMEOUT', default=30, cast=int)
+
+# Nada disso é necessário para ler as tabelas
+TIPOS_BLOQUEADOS = {'image', 'media', 'font'}
+DOMINIOS_BLOQUEADOS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'facebook.com/tr', 'scorecardresearch.com', 'hotjar.com', 'criteo.',
+    'taboola.com', 'outbrain.com', 'chartbeat.', 'newrelic.com', 'segment.io',
+)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+class PoolNavegador:
+    """Chromium de longa duração compartilhado pelos scrapers e pelo agente.
+
+    O navegador roda em um event loop próprio (thread de fundo) e é iniciado
+    só no primeiro uso. Limita o número de páginas abertas ao mesmo tempo,
+    recicla o processo depois de `max_navegacoes` navegações (para conter o
+    consumo de memória), fecha-o após `ocioso` segundos sem uso e bloqueia
+    imagens, mídia, fontes e scripts de analytics em todas as páginas.
+    """
+
+    def __init__(self, max_paginas=NAVEGADOR_MAX_PAGINAS, max_navegacoes=NAVEGADOR_MAX_NAVEGACOES,
+                 ocioso=NAVEGADOR_OCIOSO, timeout=NAVEGADOR_TIMEOUT, headless=True):
+        self.max_paginas = max_paginas
+        self.max_navegacoes = max_navegacoes
+        self.ocioso = ocioso
+        self.timeout = timeout
+        self.headless = headless
+        self.navegacoes = 0
+        self.bloqueadas = 0
+        self.inicializacoes = 0
+        self._playwright = None
+        self._navegador = None
+        self._contexto_agente = None
+        self._contexto = None
+        self._em_uso = 0
+        self._ultimo_uso = time.monotonic()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='pool-navegador', daemon=True)
+        self._thread.start()
+        self._semaforo = self._chamar(self._criar_primitivas())
+        self._vigia = asyncio.run_coroutine_threadsafe(self._vigiar_ociosidade(), self._loop)
+
+    def _chamar(self, corrotina, timeout=None):
+        # Dentro de uma execução com prazo, a espera não passa dele (e a corrotina é cancelada)
+        futuro = asyncio.run_coroutine_threadsafe(corrotina, self._loop)
+        try:
+            return futuro.result(restante(timeout))
+        except concurrent.futures.TimeoutError:
+            futuro.cancel()
+            raise PrazoEsgotado('navegador') from None
+
+    async def _criar_primitivas(self):
+        self._lock = asyncio.Lock()
+        self._lock_agente = asyncio.Lock()  # o toolkit usa sempre contexts[0]: um agente por vez
+        return asyncio.Semaphore(self.max_paginas)
+
+    # --- ciclo de vida do navegador ---
+
+    async def _filtrar(self, rota):
+        requisicao = rota.request
+        if requisicao.resource_type in TIPOS_BLOQUEADOS or any(d in requisicao.url for d in DOMINIOS_BLOQUEADOS):
+            self.bloqueadas += 1
+            await rota.abort()
+        else:
+            await rota.continue_()
+
+    async def _novo_contexto(self):
+        contexto = await self._navegador.new_context(user_agent=USER_AGENT, locale='pt-BR')
+        await contexto.route('**/*', self._filtrar)
+        return contexto
+
+    async def _iniciar(self):
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        if self._navegador is None or not self._navegador.is_connected():
+            self._navegador = await self._playwright.chromium.launch(headless=self.headless)
+            # O primeiro contexto é o que o PlayWrightBrowserToolkit usa (browser.contexts[0])
+            self._contexto_agente = await self._novo_contexto()
+            self._contexto = await self._novo_contexto()
+            self.inicializacoes += 1
+
+    async def _fechar_navegador(self):
+        if self._navegador is not None:
+            try:
+                await self._navegador.close()
+            except Exception:
+                pass
+        self._navegador = self._contexto = self._contexto_agente = None
+        self.navegacoes = 0
+
+    async def _adquirir(self):
+        async with self._lock:
+            # Recicla só quando nenhuma página está em uso
+            if self.navegacoes >= self.max_navegacoes and self._em_uso == 0:
+                await self._fechar_navegador()
+            await self._iniciar()
+            self._em_uso += 1
+
+    def _liberar(self):
+        self._em_uso -= 1
+        self.navegacoes += 1
+        self._ultimo_uso = time.monotonic()
+
+    async def _vigiar_ociosidade(self):
+        while True:
+            await asyncio.sleep(max(1, min(30, self.ocioso)))
+            async with self._lock:
+                if (self._navegador is not None and self._em_uso == 0
+                        and time.monotonic() - self._ultimo_uso > self.ocioso):
+                    await self._fechar_navegador()
+
+    # --- operações ---
+
+    @contextlib.asynccontextmanager
+    async def pagina(self):
+        """Página nova no contexto de scraping (conta no limite de páginas abertas); fechada na saída.
+
+        Só pode ser usada dentro do loop do pool (ver `rodar`).
+        """
+        async with self._semaforo:
+            await self._adquirir()
+            pagina = None
+            try:
+                pagina = await self._contexto.new_page()
+                pagina.set_default_timeout(self.timeout * 1000)
+                yield pagina
+            finally:
+                if pagina is not None:
+                    await pagina.close()
+                self._liberar()
+
+    async def _renderizar(self, url, esperar):
+        async with self.pagina() as pagina:
+            await pagina.goto(url, wait_until=esperar, timeout=self.timeout * 1000)
+            html = await pagina.content()
+            contar('navegador_paginas')
+            contar('navegador_bytes', len(html.encode('utf-8')))
+            return html
+
+    async def _renderizar_varias(self, urls, esperar):
+        resultados = await asyncio.gather(*(self._renderizar(url, esperar) for url in urls), return_exceptions=True)
+        htmls = []
+        for url, resultado in zip(urls, resultados):
+            if isinstance(resultado, Exception):
+                log.error(f"❌ Erro ao renderizar {url}: {resultado}")
+                htmls.append('')
+            else:
+                htmls.append(resultado)
+        return htmls
+
+    def renderizar(self, urls, esperar='domcontentloaded'):
+        """HTML renderizado de cada URL (string vazia em caso de erro), na mesma ordem"""
+        return self._chamar(self._renderizar_varias(list(urls), esperar))
+
+    def rodar(self, corrotina):
+        """Executa a corrotina no loop do pool e devolve o resultado (para quem abre páginas com `pagina()`)"""
+        return self._chamar(corrotina)
+
+    async def _executar(self, funcao):
+        async with self._lock_agente, self._semaforo:
+            await self._adquirir()
+            try:
+                return await funcao(self._navegador)
+            finally:
+                # Páginas abertas pela função (ex.: agente) não ficam vivas entre execuções
+                for pagina in list(self._contexto_agente.pages) if self._contexto_agente else []:
+                    await pagina.close()
+                self._liberar()
+
+    def executar(self, funcao):
+        """Executa `await funcao(navegador)` no loop do pool e devolve o resultado.
+
+        Usado pelo agente: as ferramentas do PlayWrightBrowserToolkit precisam
+        rodar no mesmo loop em que o navegador assíncrono foi criado.
+        """
+        return self._chamar(self._executar(funcao))
+
+    def estatisticas(self):
+        return {
+            'ativo': self._navegador is not None,
+            'paginas_em_uso': self._em_uso,
+            'navegacoes': self.navegacoes,
+            'requisicoes_bloqueadas': self.bloqueadas,
+            'inicializacoes': self.inicializacoes,
+        }
+
+    def fechar(self):
+        self._vigia.cancel()
+
+        async def encerrar():
+            await self._fechar_navegador()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        self._chamar(encerrar())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def obter_pool():
+    """Pool de navegador único do processo"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PoolNavegador()
+        return _pool
@@ -0,0 +1,142 @@
+"""Rastreamento de listas longas no navegador do pool: "carregar mais", rolagem infinita e paginação.
+
+Cada lista ocupa uma página do pool (o limite de páginas abertas vale
+para todas as listas juntas). Na página, o rastreador clica no botão de
+"carregar mais" (ou rola até o fim, se não houver botão) enquanto
+aparecerem chaves novas (ex.: símbolos das ações); depois segue o link
+`rel="next"`, se existir. As chaves já vistas valem para todas as listas
+da mesma execução: uma lista que só repete o que as outras trouxeram
+para logo na primeira rodada.
+
+    rastreador = Rastreador(lambda html: simbolos_da_tabela(html))
+    paginas = rastreador.rastrear('https://br.tradingview.com/markets/stocks-brazil/market-movers-all-stocks/')
+"""
+from urllib.parse import urljoin
+import lxml.html
+from decouple import config
+from pool_navegador import obter_pool
+from resiliencia import PrazoEsgotado, degradar
+from instrumentacao import obter_logger, contar
+
+RASTREADOR_MAX_PAGINAS = config('RASTREADOR_MAX_PAGINAS', default=20, cast=int)  # links "próxima" por lista
+RASTREADOR_MAX_CARREGAMENTOS = config('RASTREADOR_MAX_CARREGAMENTOS', default=40, cast=int)  # cliques/rolagens por página
+RASTREADOR_ESPERA = config('RASTREADOR_ESPERA', default=5, cast=float)  # segundos esperando novas linhas
+
+# Botões de "carregar mais" (TradingView e variações comuns), na ordem de tentativa
+SELETORES_CARREGAR_MAIS = (
+    'button:has-text("Carregar mais")',
+    'button:has-text("Load more")',
+    'button:has-text("Mostrar mais")',
+    '[class*="loadButton"]',
+    '[data-name="load-more"]',
+)
+
+# Verdadeiro quando a tabela passa de `n` linhas
+MAIS_LINHAS = "n => document.querySelectorAll('tr').length > n"
+CONTAR_LINHAS = "() => document.querySelectorAll('tr').length"
+ROLAR_FIM = "() => window.scrollTo(0, document.body.scrollHeight)"
+
+log = obter_logger('rastreador')
+
+
+def proxima_pagina(html, url):
+    """URL absoluta do link `rel="next"` da página (ou None)"""
+    if not html:
+        return None
+    raiz = lxml.html.fromstring(html)
+    links = raiz.xpath('//a[@rel="next"]/@href | //link[@rel="next"]/@href')
+    return urljoin(url, links[0].strip()) if links and links[0].strip() else None
+
+
+class Rastreador:
+    """Rastreia listas pelo pool de navegador, parando quando não aparecem chaves novas.
+
+    `chaves(html)` devolve o conjunto de chaves das linhas presentes no HTML
+    (ex.: os símbolos). `vistas` é compartilhado entre as listas da execução
+    e só é alterado no loop do pool.
+    """
+
+    def __init__(self, chaves, pool=None, max_paginas=RASTREADOR_MAX_PAGINAS,
+                 max_carregamentos=RASTREADOR_MAX_CARREGAMENTOS, espera=RASTREADOR_ESPERA,
+                 seletores=SELETORES_CARREGAR_MAIS):
+        self.chaves = chaves
+        self.pool = pool
+        self.max_paginas = max_paginas
+        self.max_carregamentos = max_carregamentos
+        self.espera = espera
+        self.seletores = seletores
+        self.vistas = set()
+
+    def _novas(self, html):
+        """Quantas chaves do HTML ainda não tinham aparecido (e passam a contar como vistas)"""
+        novas = self.chaves(html) - self.vistas
+        self.vistas |= novas
+        return len(novas)
+
+    async def _botao(self, pagina):
+        for seletor in self.seletores:
+            try:
+                botao = await pagina.query_selector(seletor)
+                if botao is not None and await botao.is_visible():
+                    return botao
+            except Exception:
+                continue
+        return None
+
+    async def _carregar_mais(self, pagina):
+        """Clica em "carregar mais" (ou rola até o fim) e espera novas linhas; False se nada mudou"""
+        linhas = await pagina.evaluate(CONTAR_LINHAS)
+        botao = await self._botao(pagina)
+        try:
+            if botao is not None:
+                await botao.click()
+            else:
+                await pagina.evaluate(ROLAR_FIM)
+            await pagina.wait_for_function(MAIS_LINHAS, arg=linhas, timeout=self.espera * 1000)
+            return True
+        except Exception:
+            return False
+
+    async def _expandir(self, pagina, url):
+        """HTML da página depois de carregar todas as linhas que trazem chaves novas"""
+        html = await pagina.content()
+        novas = self._novas(html)
+        carregamentos = 0
+        while novas and carregamentos < self.max_carregamentos and await self._carregar_mais(pagina):
+            carregamentos += 1
+            html = await pagina.content()
+            novas = self._novas(html)
+            log.debug(f"➕ {url}: +{novas} chaves (carregamento {carregamentos})")
+        return html, carregamentos
+
+    async def _rastrear(self, url):
+        paginas = []
+        pool = self.pool or obter_pool()
+        async with pool.pagina() as pagina:
+            while url and len(paginas) < self.max_paginas:
+                antes = len(self.vistas)
+                await pagina.goto(url, wait_until='domcontentloaded')
+                html, carregamentos = await self._expandir(pagina, url)
+                contar('navegador_paginas')
+                contar('navegador_bytes', len(html.encode('utf-8')))
+                novas = len(self.vistas) - antes
+                log.info(f"🕸️ {url}: {novas} chaves novas, {carregamentos} carregamentos")
+                if not novas and (paginas or self.chaves(html)):
+                    # Só repete o que já foi visto: não vale nem mandar para a extração
+                    break
+                paginas.append((url, html))
+                if not novas:
+                    break
+                proxima = proxima_pagina(html, url)
+                url = proxima if proxima not in (u for u, _ in paginas) else None
+        return paginas
+
+    def rastrear(self, url):
+        """[(url da página, HTML expandido)] de uma lista, na ordem da paginação"""
+        pool = self.pool or obter_pool()
+        try:
+            return pool.rodar(self._rastrear(url))
+        except Exception as e:
+            log.error(f"❌ Erro ao rastrear {url}: {e}")
+            degradar('rastrear', 'prazo' if isinstance(e, PrazoEsgotado) else 'erro', f"{url}: {e}")
+            return []
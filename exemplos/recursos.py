@@ -0,0 +1,26 @@
+import os
+from functools import lru_cache
+
+# Instâncias únicas por processo: todos os scrapers (e todas as sessões do
+# Streamlit) compartilham os mesmos clientes em vez de recriá-los a cada uso.
+
+def configurar_api_key():
+    """Lê OPENAI_API_KEY do .env se ainda não estiver no ambiente"""
+    if 'OPENAI_API_KEY' not in os.environ:
+        from decouple import config
+        api_key = config('OPENAI_API_KEY', default=None)
+        if api_key:
+            os.environ['OPENAI_API_KEY'] = api_key
+
+@lru_cache(maxsize=None)
+def obter_llm(modelo='gpt-4o-mini', temperatura=0):
+    """Cliente ChatOpenAI compartilhado por modelo/temperatura (criado no primeiro uso)"""
+    from langchain_openai import ChatOpenAI
+    configurar_api_key()
+    return ChatOpenAI(model=modelo, temperature=temperatura)
+
+@lru_cache(maxsize=None)
+def obter_encoder_modelo(modelo='gpt-4o-mini'):
+    """Encoder tiktoken do modelo, compartilhado"""
+    import tiktoken
+    return tiktoken.encoding_for_model(modelo)
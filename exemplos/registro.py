@@ -0,0 +1,83 @@
+import importlib
+import threading
+
+# Tipo de scraping -> (módulo, função, argumentos lidos do próprio módulo).
+# Nada é importado aqui: o módulo (e com ele langchain, lxml, tiktoken, o
+# cliente do LLM...) só é carregado na primeira execução daquele tipo.
+SCRAPERS = {
+    'classificacao': ('exemplo1_brasileirao', 'scrape_with_playwright', {'schema': 'schema'}),
+    # Artilharia da mesma execução (busca e leitura da página) que a classificação
+    'artilharia': ('exemplo1_brasileirao', 'scrape_artilharia', {}),
+    # As duas juntas: {'classificacao': [...], 'artilharia': [...]}
+    'brasileirao': ('exemplo1_brasileirao', 'scrape_brasileirao', {}),
+    'acoes': ('exemplo2_acoes', 'scrape_with_playwright', {'schema': 'schema'}),
+    # Todas as listas de ações da B3, rastreadas no navegador (carregar mais/paginação)
+    'mercado': ('exemplo2_acoes', 'scrape_mercado', {'schema': 'schema'}),
+    'agente': ('exemplo3_agente', 'executar_agente', {}),
+    # Responde pela classificação; o agente só é chamado se a tabela não bastar
+    'consulta': ('consultas', 'responder', {}),
+}
+
+# Tipos que também podem rodar em modo incremental:
+# (módulo, montar_pipeline, finalizar, argumentos lidos do próprio módulo)
+PIPELINES = {
+    'classificacao': ('exemplo1_brasileirao', 'montar_pipeline', 'finalizar', {}),
+    'brasileirao': ('exemplo1_brasileirao', 'montar_pipeline', 'finalizar_brasileirao', {}),
+    'acoes': ('exemplo2_acoes', 'montar_pipeline', 'finalizar', {'schema': 'schema'}),
+    'mercado': ('exemplo2_acoes', 'montar_pipeline_mercado', 'finalizar_mercado', {'schema': 'schema'}),
+}
+
+_carregados = {}
+_lock = threading.Lock()
+
+
+def carregar(tipo):
+    """Função do scraper `tipo`, importando o módulo no primeiro uso"""
+    with _lock:
+        if tipo not in _carregados:
+            if tipo not in SCRAPERS:
+                raise KeyError(f"Tipo de scraping desconhecido: {tipo}")
+            nome_modulo, nome_funcao, argumentos = SCRAPERS[tipo]
+            modulo = importlib.import_module(nome_modulo)
+            padrao = {nome: getattr(modulo, atributo) for nome, atributo in argumentos.items()}
+            _carregados[tipo] = (getattr(modulo, nome_funcao), padrao)
+        return _carregados[tipo]
+
+
+def executar(tipo, **kwargs):
+    """Executa o scraper `tipo` (kwargs sobrescrevem os argumentos padrão)"""
+    funcao, padrao = carregar(tipo)
+    return funcao(**{**padrao, **kwargs})
+
+
+def executar_com_relatorio(tipo, prazo=None, **kwargs):
+    """(resultado, relatório) de `executar(tipo, ...)` dentro de `prazo` segundos.
+
+    O relatório (resiliencia.Execucao.relatorio) diz quanto tempo levou e
+    quais etapas degradaram: prazo esgotado, disjuntor aberto, erro ou
+    último resultado válido no lugar do extraído.
+    """
+    from resiliencia import nova_execucao
+    with nova_execucao(prazo, nome=tipo) as execucao:
+        resultado = executar(tipo, **kwargs)
+    return resultado, execucao.relatorio()
+
+
+def montar(tipo, urls, **kwargs):
+    """(pipeline, finalizar) do scraper `tipo`, para consumir os trechos conforme ficam prontos.
+
+    `finalizar(trechos, parcial=True)` monta a tabela parcial; sem `parcial`
+    (e com `urls=urls`), o resultado final (igual ao de `executar(tipo, ...)`).
+    """
+    if tipo not in PIPELINES:
+        raise KeyError(f"Tipo sem modo incremental: {tipo}")
+    nome_modulo, nome_montar, nome_finalizar, argumentos = PIPELINES[tipo]
+    modulo = importlib.import_module(nome_modulo)
+    padrao = {nome: getattr(modulo, atributo) for nome, atributo in argumentos.items()}
+    pipeline = getattr(modulo, nome_montar)(list(urls), **{**padrao, **kwargs})
+    return pipeline, getattr(modulo, nome_finalizar)
+
+
+def carregados():
+    """Tipos cujos módulos já foram importados"""
+    return sorted(_carregados)
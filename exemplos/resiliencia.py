@@ -0,0 +1,343 @@
+"""Resiliência das execuções: prazo por execução, backoff com jitter, disjuntores e chamadas em paralelo (hedge).
+
+Uma `Execucao` carrega o prazo total de um scraping e anota cada etapa
+que degradou (prazo esgotado, disjuntor aberto, erro, último resultado
+válido no lugar do extraído). Ela é da thread que a criou; o Pipeline a
+repassa para as threads de cada etapa, de modo que qualquer chamada
+(HTTP, LLM, navegador) consegue saber quanto tempo ainda resta.
+
+    with nova_execucao(60, 'classificacao') as execucao:
+        resultado = registro.executar('classificacao', urls=urls)
+    execucao.relatorio()   # {'degradada': True, 'degradacoes': [{'etapa': 'extrair', 'motivo': 'prazo', ...}]}
+
+Falhas transitórias (429, 5xx, timeouts, conexão) são repetidas com
+backoff exponencial e jitter, sem passar do prazo. Cada host e cada
+modelo tem um disjuntor: depois de `DISJUNTOR_FALHAS` falhas seguidas as
+chamadas falham na hora por `DISJUNTOR_ABERTO` segundos, e então uma
+única chamada de teste decide se ele fecha de novo.
+"""
+import time
+import random
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from decouple import config
+from instrumentacao import obter_logger, contar
+
+EXECUCAO_PRAZO = config('EXECUCAO_PRAZO', default=0, cast=float)  # segundos por execução (0 = sem prazo)
+BACKOFF_BASE = config('BACKOFF_BASE', default=1.0, cast=float)  # segundos antes da 2ª tentativa
+BACKOFF_MAXIMO = config('BACKOFF_MAXIMO', default=30.0, cast=float)
+DISJUNTOR_FALHAS = config('DISJUNTOR_FALHAS', default=5, cast=int)  # falhas seguidas para abrir
+DISJUNTOR_ABERTO = config('DISJUNTOR_ABERTO', default=30.0, cast=float)  # segundos aberto antes do teste
+LLM_HEDGE_APOS = config('LLM_HEDGE_APOS', default=0, cast=float)  # segundos até a cópia da chamada (0 = sem hedge)
+HEDGE_MAX_THREADS = config('HEDGE_MAX_THREADS', default=16, cast=int)
+
+log = obter_logger('resiliencia')
+
+
+class PrazoEsgotado(TimeoutError):
+    """O prazo da execução acabou antes da etapa terminar"""
+
+    def __init__(self, etapa=None):
+        super().__init__(f"Prazo da execução esgotado{f' em {etapa}' if etapa else ''}")
+        self.etapa = etapa
+
+
+class CircuitoAberto(RuntimeError):
+    """O disjuntor do host/modelo está aberto: a chamada nem é feita"""
+
+    def __init__(self, nome, segundos):
+        super().__init__(f"Disjuntor {nome} aberto (novo teste em {segundos:.0f}s)")
+        self.nome = nome
+        self.segundos = segundos
+
+
+# --- prazo e relatório de degradação ---
+
+class Execucao:
+    """Prazo e degradações de uma execução (um scraping, do início ao resultado)"""
+
+    def __init__(self, prazo=None, nome='execucao'):
+        self.nome = nome
+        self.prazo = prazo or None
+        self.inicio = time.monotonic()
+        self.fim = self.inicio + prazo if prazo else None
+        self.degradacoes = []
+        self._lock = threading.Lock()
+
+    def restante(self, padrao=None):
+        """Segundos até o prazo (no máximo `padrao`); sem prazo, `padrao`"""
+        if self.fim is None:
+            return padrao
+        restante = max(0.0, self.fim - time.monotonic())
+        return restante if padrao is None else min(padrao, restante)
+
+    @property
+    def esgotado(self):
+        return self.fim is not None and time.monotonic() >= self.fim
+
+    def verificar(self, etapa=None):
+        if self.esgotado:
+            raise PrazoEsgotado(etapa)
+
+    def degradar(self, etapa, motivo, detalhe='', secao=None):
+        """Anota que `etapa` degradou (`motivo`: prazo, disjuntor, erro, ultimo_valido...).
+
+        Com `secao`, só aquela parte do resultado degradou (ex.: a artilharia
+        que sai junto com a classificação); sem ela, a execução inteira.
+        """
+        with self._lock:
+            if any(d['etapa'] == etapa and d['motivo'] == motivo for d in self.degradacoes):
+                return  # uma vez por etapa e motivo: o relatório não vira um log
+            self.degradacoes.append({'etapa': etapa, 'motivo': motivo, 'detalhe': str(detalhe)[:300],
+                                     'secao': secao, 'em_s': round(time.monotonic() - self.inicio, 2)})
+        contar(f'degradacao_{motivo}')
+        log.warning(f"⚠️ {self.nome}: etapa {etapa} degradou ({motivo}){f': {detalhe}' if detalhe else ''}",
+                    extra={'dados': {'evento': 'degradacao', 'execucao': self.nome, 'etapa': etapa, 'motivo': motivo}})
+
+    def degradada(self, secao=None):
+        """Se a execução degradou como um todo (ou, com `secao`, naquela seção)"""
+        with self._lock:
+            return any(d['secao'] is None or d['secao'] == secao for d in self.degradacoes)
+
+    def relatorio(self):
+        """`degradada` vale para o resultado principal; as degradações só de uma seção vêm na lista, com `secao`"""
+        with self._lock:
+            degradacoes = list(self.degradacoes)
+        return {
+            'execucao': self.nome,
+            'prazo_s': self.prazo,
+            'duracao_s': round(time.monotonic() - self.inicio, 2),
+            'degradada': any(d['secao'] is None for d in degradacoes),
+            'degradacoes': degradacoes,
+        }
+
+
+_local = threading.local()
+
+def execucao_atual():
+    """Execução da thread atual (ou None fora de uma)"""
+    return getattr(_local, 'execucao', None)
+
+@contextmanager
+def usar_execucao(execucao):
+    """Torna `execucao` a atual nesta thread (as threads do Pipeline repassam a do chamador)"""
+    anterior = execucao_atual()
+    _local.execucao = execucao
+    try:
+        yield execucao
+    finally:
+        _local.execucao = anterior
+
+@contextmanager
+def nova_execucao(prazo=EXECUCAO_PRAZO, nome='execucao'):
+    """Nova execução com `prazo` segundos (None/0 = sem prazo), atual nesta thread"""
+    with usar_execucao(Execucao(prazo, nome)) as execucao:
+        yield execucao
+
+def restante(padrao=None):
+    """Segundos que restam à execução atual (no máximo `padrao`)"""
+    execucao = execucao_atual()
+    return padrao if execucao is None else execucao.restante(padrao)
+
+def verificar_prazo(etapa=None):
+    """PrazoEsgotado se a execução atual já passou do prazo"""
+    execucao = execucao_atual()
+    if execucao is not None:
+        execucao.verificar(etapa)
+
+def degradar(etapa, motivo, detalhe='', secao=None):
+    """Anota a degradação na execução atual (fora de uma, só no log)"""
+    execucao = execucao_atual()
+    if execucao is not None:
+        execucao.degradar(etapa, motivo, detalhe, secao)
+    else:
+        contar(f'degradacao_{motivo}')
+        log.warning(f"⚠️ Etapa {etapa} degradou ({motivo}){f': {detalhe}' if detalhe else ''}")
+
+def degradada(secao=None):
+    """Se a execução atual degradou (como um todo ou em `secao`); fora de uma execução, False"""
+    execucao = execucao_atual()
+    return execucao is not None and execucao.degradada(secao)
+
+
+# --- backoff ---
+
+def status_do_erro(erro):
+    """Status HTTP de erros do aiohttp/httpx/OpenAI (ou None)"""
+    status = getattr(erro, 'status_code', None) or getattr(erro, 'status', None)
+    return status or getattr(getattr(erro, 'response', None), 'status_code', None)
+
+def eh_transitorio(erro):
+    """429, 5xx, timeouts e falhas de conexão: vale tentar de novo (um 4xx comum, não)"""
+    if isinstance(erro, (PrazoEsgotado, CircuitoAberto)):
+        return False
+    status = status_do_erro(erro)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    nome = type(erro).__name__
+    return isinstance(erro, (TimeoutError, ConnectionError)) or any(
+        parte in nome for parte in ('Timeout', 'Connection', 'RateLimit', 'ServerError', 'Unavailable'))
+
+def espera_backoff(tentativa, base=BACKOFF_BASE, maximo=BACKOFF_MAXIMO, retry_after=None):
+    """Segundos antes da tentativa seguinte: exponencial com jitter total (ou o Retry-After do servidor)"""
+    try:
+        if retry_after is not None:
+            return min(maximo, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    return random.uniform(0, min(maximo, base * (2 ** tentativa)))
+
+def retry_after(erro):
+    """Retry-After (segundos) pedido pelo servidor no erro, se houver"""
+    valor = getattr(erro, 'retry_after', None)
+    if valor is None:
+        headers = getattr(erro, 'headers', None) or getattr(getattr(erro, 'response', None), 'headers', None)
+        valor = headers.get('Retry-After') if headers else None
+    return valor
+
+
+# --- disjuntores ---
+
+class Disjuntor:
+    """Circuit breaker: fechado → aberto após falhas seguidas → meio-aberto (uma chamada de teste)"""
+
+    def __init__(self, nome, falhas=DISJUNTOR_FALHAS, aberto=DISJUNTOR_ABERTO):
+        self.nome = nome
+        self.limite_falhas = falhas
+        self.tempo_aberto = aberto
+        self.estado = 'fechado'
+        self.falhas = 0
+        self._aberto_em = 0.0
+        self._testando = False
+        self._lock = threading.Lock()
+
+    def _permitir(self):
+        """(permitida, é a chamada de teste do meio-aberto)"""
+        with self._lock:
+            if self.estado == 'aberto' and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+                self.estado = 'meio-aberto'
+                self._testando = False
+            if self.estado == 'fechado':
+                return True, False
+            if self.estado == 'meio-aberto' and not self._testando:
+                self._testando = True
+                return True, True
+            return False, False
+
+    def permitir(self):
+        """True se a chamada pode ser feita (no meio-aberto, só a de teste)"""
+        return self._permitir()[0]
+
+    def verificar(self):
+        """CircuitoAberto se a chamada for recusada; True se ela for a chamada de teste.
+
+        Quem recebe True precisa chamar `liberar()` ao terminar (num finally),
+        além de `sucesso()`/`falha()` quando houver veredito.
+        """
+        permitida, teste = self._permitir()
+        if not permitida:
+            contar('disjuntor_recusas')
+            raise CircuitoAberto(self.nome, max(0.0, self.tempo_aberto - (time.monotonic() - self._aberto_em)))
+        return teste
+
+    def liberar(self):
+        """A chamada de teste terminou sem veredito (prazo, cancelamento): a próxima pode testar"""
+        with self._lock:
+            self._testando = False
+
+    def sucesso(self):
+        with self._lock:
+            if self.estado != 'fechado':
+                log.info(f"✅ Disjuntor {self.nome} fechado")
+            self.estado = 'fechado'
+            self.falhas = 0
+            self._testando = False
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            if self.estado == 'meio-aberto' or (self.estado == 'fechado' and self.falhas >= self.limite_falhas):
+                self.estado = 'aberto'
+                self._aberto_em = time.monotonic()
+                self._testando = False
+                contar('disjuntor_aberturas')
+                log.warning(f"🔌 Disjuntor {self.nome} aberto por {self.tempo_aberto:.0f}s ({self.falhas} falhas)")
+
+    def __repr__(self):
+        return f'Disjuntor({self.nome!r}, {self.estado}, falhas={self.falhas})'
+
+
+_disjuntores = {}
+_disjuntores_lock = threading.Lock()
+
+def obter_disjuntor(nome):
+    """Disjuntor único do processo para `nome` (ex.: 'http:ge.globo.com', 'llm:gpt-4o-mini')"""
+    with _disjuntores_lock:
+        if nome not in _disjuntores:
+            _disjuntores[nome] = Disjuntor(nome)
+        return _disjuntores[nome]
+
+def estado_disjuntores():
+    """{nome: estado} de todos os disjuntores já usados"""
+    with _disjuntores_lock:
+        disjuntores = list(_disjuntores.values())
+    return {d.nome: d.estado for d in disjuntores}
+
+
+# --- chamadas com prazo e hedge ---
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _obter_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_THREADS, thread_name_prefix='hedge')
+        return _executor
+
+def chamar_com_prazo(funcao, limite=None, hedge_apos=None, etapa=None, antes_da_copia=None):
+    """`funcao()` esperando no máximo `limite` segundos; com `hedge_apos`, uma cópia se a primeira demorar.
+
+    Vale a resposta que chegar primeiro (um erro só vale se a outra cópia
+    também falhar). Uma chamada que passa do limite continua em segundo
+    plano, mas o resultado é descartado e quem chamou recebe PrazoEsgotado.
+    `antes_da_copia()` decide na hora se a cópia sai (ex.: há saldo no
+    limitador de taxa); False segue esperando só a primeira.
+    """
+    if limite is None and not hedge_apos:
+        return funcao()
+    execucao = execucao_atual()
+
+    def rodar():
+        with usar_execucao(execucao):
+            return funcao()
+
+    executor = _obter_executor()
+    fim = None if limite is None else time.monotonic() + limite
+    pendentes = {executor.submit(rodar)}
+    hedge = bool(hedge_apos) and (limite is None or hedge_apos < limite)
+    erro = None
+    while pendentes:
+        espera = None if fim is None else max(0.0, fim - time.monotonic())
+        if hedge:
+            espera = hedge_apos if espera is None else min(espera, hedge_apos)
+        feitos, pendentes = wait(pendentes, timeout=espera, return_when=FIRST_COMPLETED)
+        for futuro in feitos:
+            if futuro.exception() is None:
+                return futuro.result()
+            erro = futuro.exception()
+        if hedge and not feitos:
+            # A primeira demorou além do normal: dispara a cópia
+            hedge = False
+            if antes_da_copia is None or antes_da_copia():
+                contar('llm_hedges')
+                pendentes.add(executor.submit(rodar))
+            else:
+                contar('llm_hedges_recusados')
+            continue
+        hedge = False
+        if not feitos and fim is not None and time.monotonic() >= fim:
+            raise PrazoEsgotado(etapa)
+    raise erro
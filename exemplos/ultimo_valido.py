@@ -0,0 +1,147 @@
+"""Último resultado válido de cada scraping, servido na hora enquanto uma nova extração roda em segundo plano.
+
+Cada tipo (e conjunto de URLs) tem um arquivo JSON em
+`<ULTIMO_VALIDO_DIRETORIO>/<tipo>-<hash das URLs>.json`, gravado só por
+uma execução completa e sem degradação (ex.: classificação com os 20
+times) e sempre por escrita em temporário + os.replace: quem lê nunca vê
+um arquivo pela metade. Uma extração que falha ou vem incompleta serve
+esse resultado (com a idade dele), nunca dados inventados.
+
+    instantaneo = servir('classificacao', urls, atualizar)  # na hora; revalida em segundo plano se velho
+    instantaneo.dados, descrever_idade(instantaneo.idade)    # [...], 'há 12 min'
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from decouple import config
+from cache_llm import DIRETORIO_PADRAO
+from resiliencia import EXECUCAO_PRAZO, degradada, nova_execucao
+from instrumentacao import obter_logger, contar
+
+ULTIMO_VALIDO_DIRETORIO = config('ULTIMO_VALIDO_DIRETORIO', default=os.path.join(DIRETORIO_PADRAO, 'ultimo_valido'))
+ULTIMO_VALIDO_MAX_IDADE = config('ULTIMO_VALIDO_MAX_IDADE', default=5 * 60, cast=int)  # segundos até revalidar
+
+log = obter_logger('ultimo_valido')
+
+
+class Instantaneo:
+    """Resultado válido gravado: dados, URLs de origem e quando foi extraído"""
+
+    def __init__(self, tipo, urls, dados, gravado_em):
+        self.tipo = tipo
+        self.urls = urls
+        self.dados = dados
+        self.gravado_em = gravado_em
+
+    @property
+    def idade(self):
+        """Segundos desde a extração"""
+        return max(0.0, time.time() - self.gravado_em)
+
+    def __repr__(self):
+        return f'Instantaneo({self.tipo!r}, {len(self.dados)} registros, {descrever_idade(self.idade)})'
+
+
+def _caminho(tipo, urls, diretorio):
+    chave = hashlib.sha256('|'.join(sorted(urls or ())).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(diretorio, f'{tipo}-{chave}.json')
+
+def ler(tipo, urls=(), diretorio=ULTIMO_VALIDO_DIRETORIO):
+    """Último resultado válido de `tipo` para essas URLs (ou None)"""
+    try:
+        with open(_caminho(tipo, urls, diretorio), encoding='utf-8') as arquivo:
+            conteudo = json.load(arquivo)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f"⚠️ Último resultado de {tipo} ilegível: {e}")
+        return None
+    return Instantaneo(tipo, conteudo['urls'], conteudo['dados'], conteudo['gravado_em'])
+
+def gravar(tipo, urls, dados, diretorio=ULTIMO_VALIDO_DIRETORIO):
+    """Troca o último resultado válido de `tipo` por `dados` (atomicamente); devolve se gravou.
+
+    Resultado de uma execução degradada (prazo, erro, disjuntor) não é
+    gravado: ele pode estar incompleto. Uma degradação só de outra seção
+    (ex.: artilharia sem dados) não impede gravar a classificação.
+    """
+    if not dados or degradada(tipo):
+        return False
+    caminho = _caminho(tipo, urls, diretorio)
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as saida:
+            json.dump({'tipo': tipo, 'urls': sorted(urls or ()), 'dados': dados, 'gravado_em': time.time()},
+                      saida, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        log.warning(f"⚠️ Último resultado de {tipo} não gravado: {e}")
+        return False
+    contar('ultimo_valido_gravacoes')
+    return True
+
+
+_revalidando = set()
+_revalidando_lock = threading.Lock()
+
+def revalidando(tipo, urls=()):
+    """Se há uma nova extração de `tipo` para essas URLs rodando em segundo plano"""
+    with _revalidando_lock:
+        return (tipo, tuple(sorted(urls or ()))) in _revalidando
+
+def revalidar(tipo, urls, atualizar, prazo=EXECUCAO_PRAZO):
+    """Roda `atualizar()` em uma thread de fundo (uma por tipo/URLs); devolve se disparou.
+
+    `atualizar` é o próprio scraping: é ele que grava o novo resultado
+    válido ao terminar. Falhas ficam no log e o resultado anterior continua.
+    """
+    chave = (tipo, tuple(sorted(urls or ())))
+    with _revalidando_lock:
+        if chave in _revalidando:
+            return False
+        _revalidando.add(chave)
+
+    def rodar():
+        try:
+            with nova_execucao(prazo, nome=f'revalidar-{tipo}') as execucao:
+                atualizar()
+            relatorio = execucao.relatorio()
+            etapas = ', '.join(d['etapa'] for d in relatorio['degradacoes'])
+            log.info(f"🔄 {tipo} revalidado em {relatorio['duracao_s']:.1f}s"
+                     + (f" (degradado: {etapas}; resultado anterior mantido)" if etapas else ''))
+        except Exception as e:
+            log.error(f"❌ Erro ao revalidar {tipo}: {e}")
+        finally:
+            with _revalidando_lock:
+                _revalidando.discard(chave)
+
+    contar('ultimo_valido_revalidacoes')
+    threading.Thread(target=rodar, name=f'revalidar-{tipo}', daemon=True).start()
+    return True
+
+def servir(tipo, urls, atualizar, max_idade=ULTIMO_VALIDO_MAX_IDADE, diretorio=ULTIMO_VALIDO_DIRETORIO):
+    """Stale-while-revalidate: o último resultado válido na hora (ou None, se não houver).
+
+    Se ele tiver mais de `max_idade` segundos, `atualizar()` roda em
+    segundo plano e a próxima leitura já pega o resultado novo.
+    """
+    instantaneo = ler(tipo, urls, diretorio)
+    if instantaneo is None:
+        return None
+    contar('ultimo_valido_servidos')
+    if instantaneo.idade > max_idade:
+        revalidar(tipo, urls, atualizar)
+    return instantaneo
+
+def descrever_idade(segundos):
+    """'agora há pouco', 'há 12 min', 'há 3 h', 'há 2 dias'"""
+    if segundos < 60:
+        return 'agora há pouco'
+    if segundos < 3600:
+        return f'há {segundos // 60:.0f} min'
+    if segundos < 2 * 86400:
+        return f'há {segundos // 3600:.0f} h'
+    return f'há {segundos // 86400:.0f} dias'
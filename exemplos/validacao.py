@@ -0,0 +1,190 @@
+import re
+import math
+import unicodedata
+
+NUMERO_INTEIRO = re.compile(r'^[+\-]?\d{1,3}(?:[.\s]\d{3})+$|^[+\-]?\d+$')
+MENOS_UNICODE = str.maketrans({'\u2212': '-', '\u2013': '-', '\u2014': '-', '\u00a0': ' '})
+
+
+def dobrar_acentos(texto):
+    """Minúsculas e sem acentos: 'Atlético-MG' -> 'atletico-mg'"""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower().strip()
+
+def converter_numero(valor):
+    """Número em formato brasileiro ou internacional -> float (None se inválido).
+
+    Aceita '1,5', '-2.75', '1.234,5', '1,234.5', '+3', '−2' (menos Unicode).
+    """
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = str(valor or '').translate(MENOS_UNICODE).strip().replace(' ', '').lstrip('+')
+    if ',' in texto and '.' in texto:
+        # O separador que aparece por último é o decimal
+        if texto.rfind(',') > texto.rfind('.'):
+            texto = texto.replace('.', '').replace(',', '.')
+        else:
+            texto = texto.replace(',', '')
+    else:
+        texto = texto.replace(',', '.')
+    try:
+        numero = float(texto)
+    except ValueError:
+        return None
+    return numero if math.isfinite(numero) else None
+
+def converter_inteiro(valor):
+    """'12', '+3', '−2', '1.234', 12.0 -> int (None se não for inteiro)"""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor
+    texto = str(valor if valor is not None else '').translate(MENOS_UNICODE).strip()
+    if NUMERO_INTEIRO.match(texto):
+        # Pontos/espaços entre grupos de 3 dígitos são separadores de milhar
+        sinal = -1 if texto.startswith('-') else 1
+        return sinal * int(re.sub(r'\D', '', texto))
+    numero = converter_numero(texto)
+    if numero is not None and math.isfinite(numero) and numero == int(numero):
+        return int(numero)
+    return None
+
+
+class IndiceNomes:
+    """Resolve nomes extraídos para os nomes oficiais.
+
+    As chaves (nomes oficiais e apelidos) são comparadas sem acentos e sem
+    diferença de maiúsculas; uma única regex com todas as chaves encontra um
+    nome oficial dentro do texto extraído, e um índice por palavra resolve o
+    caso contrário ('Atlético' -> 'Atlético-MG'). Resultados ficam em memória.
+    """
+
+    def __init__(self, oficiais, aliases=None, excluidos=()):
+        self.oficiais = list(oficiais)
+        self._por_chave = {dobrar_acentos(nome): nome for nome in self.oficiais}
+        for apelido, oficial in (aliases or {}).items():
+            self._por_chave[dobrar_acentos(apelido)] = oficial
+        self._padrao = self._compilar(self._por_chave)
+        self._por_palavra = {}
+        for chave, oficial in self._por_chave.items():
+            for palavra in re.findall(r'\w+', chave):
+                if len(palavra) >= 3:
+                    self._por_palavra.setdefault(palavra, set()).add(oficial)
+        self._padrao_excluidos = self._compilar({dobrar_acentos(n): n for n in excluidos})
+        self._memoria = {}
+
+    @staticmethod
+    def _compilar(chaves):
+        if not chaves:
+            return None
+        alternativas = '|'.join(re.escape(c) for c in sorted(chaves, key=len, reverse=True))
+        return re.compile(rf'(?<!\w)(?:{alternativas})(?!\w)')
+
+    def excluido(self, nome):
+        """True se o nome cita um dos nomes excluídos (ex.: jogadores)"""
+        return self._padrao_excluidos is not None and self._padrao_excluidos.search(dobrar_acentos(nome)) is not None
+
+    def encontrar(self, texto):
+        """Nomes oficiais citados em `texto`, na ordem em que aparecem (sem repetição)"""
+        if self._padrao is None:
+            return []
+        encontrados = []
+        for encontrado in self._padrao.finditer(dobrar_acentos(texto)):
+            oficial = self._por_chave[encontrado.group(0)]
+            if oficial not in encontrados:
+                encontrados.append(oficial)
+        return encontrados
+
+    def resolver(self, nome):
+        """Nome oficial correspondente ou None"""
+        chave = dobrar_acentos(nome)
+        if chave in self._memoria:
+            return self._memoria[chave]
+        oficial = self._por_chave.get(chave)
+        if oficial is None and self._padrao is not None:
+            for encontrado in self._padrao.finditer(chave):
+                # 'Botafogo-SP' cita 'Botafogo', mas o sufixo indica outro clube
+                if not re.match(r'-\w', chave[encontrado.end():]):
+                    oficial = self._por_chave[encontrado.group(0)]
+                    break
+        if oficial is None:
+            # Nome extraído é parte de um nome oficial ('Atlético' em 'Atlético-MG')
+            candidatos = set()
+            for palavra in re.findall(r'\w+', chave):
+                candidatos |= self._por_palavra.get(palavra, set())
+            candidatos = {c for c in candidatos if chave in dobrar_acentos(c)}
+            if not candidatos and len(chave) >= 4:
+                candidatos = {o for c, o in self._por_chave.items() if chave in c}
+            if len(candidatos) == 1:
+                oficial = candidatos.pop()
+        self._memoria[chave] = oficial
+        return oficial
+
+
+class ValidadorSchema:
+    """Conversores por campo compilados uma vez a partir de um schema"""
+
+    def __init__(self, schema, limites=None, padrao_numerico=0):
+        self.campos = list(schema.get('properties', {}))
+        self.conversores = {}
+        for campo, propriedades in schema.get('properties', {}).items():
+            minimo, maximo = (limites or {}).get(campo, (None, None))
+            self.conversores[campo] = self._compilar(propriedades.get('type', 'string'), minimo, maximo, padrao_numerico)
+
+    @staticmethod
+    def _compilar(tipo, minimo, maximo, padrao):
+        if tipo in ('integer', 'number'):
+            converter = converter_inteiro if tipo == 'integer' else converter_numero
+
+            def conversor(valor):
+                numero = converter(valor)
+                if numero is None:
+                    numero = padrao
+                if minimo is not None:
+                    numero = max(minimo, numero)
+                if maximo is not None:
+                    numero = min(maximo, numero)
+                return numero
+            return conversor
+        return lambda valor: '' if valor is None else str(valor).strip()
+
+    def converter(self, item):
+        """Um registro com todos os campos do schema, na ordem do schema"""
+        return {campo: self.conversores[campo](item.get(campo)) for campo in self.campos}
+
+    def validar_lote(self, itens, campo_nome=None, indice=None):
+        """Valida um lote inteiro de registros de uma vez.
+
+        Com `indice`, o valor de `campo_nome` é resolvido para o nome oficial
+        e registros com nomes excluídos ou desconhecidos são rejeitados.
+        Retorna (aceitos, rejeitados), onde rejeitados é [(nome, motivo)].
+        """
+        aceitos = []
+        rejeitados = []
+        for item in itens:
+            if not isinstance(item, dict):
+                continue
+            if campo_nome and indice is not None:
+                nome = str(item.get(campo_nome) or '').strip()
+                if not nome:
+                    continue
+                if indice.excluido(nome):
+                    rejeitados.append((nome, 'excluído'))
+                    continue
+                oficial = indice.resolver(nome)
+                if oficial is None:
+                    rejeitados.append((nome, 'desconhecido'))
+                    continue
+                registro = self.converter(item)
+                registro[campo_nome] = oficial
+            else:
+                registro = self.converter(item)
+            aceitos.append(registro)
+        return aceitos, rejeitados
+
+
+def compilar_schema(schema, limites=None, padrao_numerico=0):
+    """Atalho para ValidadorSchema(schema, limites)"""
+    return ValidadorSchema(schema, limites=limites, padrao_numerico=padrao_numerico)
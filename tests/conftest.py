@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Os módulos ficam em exemplos/ (e artilharia.py na raiz), como nos scripts e no app
+_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _caminho in (_raiz, os.path.join(_raiz, 'exemplos')):
+    if _caminho not in sys.path:
+        sys.path.insert(0, _caminho)
+
+# Nada de cache persistente do LLM entre testes
+os.environ.setdefault('LLM_CACHE_DESATIVADO', 'True')
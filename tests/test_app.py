@@ -0,0 +1,62 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+import registro
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+class Interrompido(Exception):
+    """Faz o papel da exceção com que o Streamlit para um rerun quando outro botão é clicado"""
+
+
+class PipelineFalso:
+    cancelado = False
+
+    def __init__(self, interromper=True):
+        self.interromper = interromper
+
+    def executar(self, entradas, intervalo=None):
+        yield None
+        if self.interromper:
+            raise Interrompido()
+
+    def estatisticas(self):
+        return []
+
+    def cancelar(self):
+        self.cancelado = True
+
+
+def _botao(app, rotulo):
+    return next(botao for botao in app.button if botao.label == rotulo)
+
+
+def _executar(monkeypatch, pipeline):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-teste-' + 'x' * 40)
+    monkeypatch.setattr(registro, 'montar', lambda tipo, urls, **kwargs: (pipeline, lambda trechos, **kw: []))
+    app = AppTest.from_file(APP, default_timeout=30)
+    app.run()
+    next(caixa for caixa in app.checkbox if caixa.label.startswith('🔄 Forçar')).check()
+    _botao(app, '🚀 Executar').click().run()
+    return app
+
+
+def test_pipeline_concluido_sai_da_sessao(monkeypatch):
+    app = _executar(monkeypatch, PipelineFalso(interromper=False))
+    assert not app.exception
+    assert 'pipeline_ativo' not in app.session_state
+
+
+def test_cancelar_encontra_o_pipeline_do_rerun_interrompido(monkeypatch):
+    pipeline = PipelineFalso()
+    app = _executar(monkeypatch, pipeline)
+    # O rerun foi interrompido no meio da execução: o pipeline continua na sessão
+    assert app.session_state['pipeline_ativo'] is pipeline
+
+    _botao(app, '⏹️ Cancelar').click().run()
+
+    assert pipeline.cancelado
+    assert 'pipeline_ativo' not in app.session_state
+    assert any('cancelada' in aviso.value for aviso in app.warning)
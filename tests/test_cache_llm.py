@@ -0,0 +1,71 @@
+import pytest
+
+import cache_llm
+from cache_llm import CacheLLM
+
+SCHEMA = {'properties': {'time': {'type': 'string'}, 'pontos': {'type': 'integer'}}}
+
+
+class Relogio:
+    """time.time() controlado pelo teste"""
+
+    def __init__(self):
+        self.agora = 1_000_000.0
+
+    def time(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(cache_llm, 'time', relogio)
+    return relogio
+
+
+def criar(tmp_path, **kwargs):
+    # conftest desativa o cache global: aqui ele é criado direto, ligado
+    return CacheLLM(caminho=str(tmp_path / 'llm_cache.sqlite3'), desativado=False, **kwargs)
+
+
+def test_chave_estavel_e_sensivel_a_modelo_schema_e_texto():
+    chave = CacheLLM.gerar_chave('gpt-4o-mini', SCHEMA, 'Flamengo | 70')
+
+    # A ordem das chaves do schema não muda a chave
+    assert CacheLLM.gerar_chave('gpt-4o-mini', dict(reversed(SCHEMA.items())), 'Flamengo | 70') == chave
+    assert len({chave,
+                CacheLLM.gerar_chave('gpt-4o', SCHEMA, 'Flamengo | 70'),
+                CacheLLM.gerar_chave('gpt-4o-mini', {'properties': {}}, 'Flamengo | 70'),
+                CacheLLM.gerar_chave('gpt-4o-mini', SCHEMA, 'Flamengo | 71')}) == 4
+
+
+def test_entrada_expira_depois_do_ttl(tmp_path, relogio):
+    cache = criar(tmp_path, ttl=60)
+    cache.gravar('a', {'itens': [1]})
+
+    relogio.agora += 59
+    assert cache.obter('a') == {'itens': [1]}
+    relogio.agora += 2
+    assert cache.obter('a') is None
+    estatisticas = cache.estatisticas()
+    assert estatisticas['expirados'] == 1 and estatisticas['entradas'] == 0
+
+
+def test_passar_da_capacidade_remove_a_menos_usada(tmp_path, relogio):
+    cache = criar(tmp_path, max_entradas=2)
+    cache.gravar('a', 1)
+    relogio.agora += 1
+    cache.gravar('b', 2)
+    relogio.agora += 1
+    assert cache.obter('a') == 1  # 'a' passa a ser a mais recente
+    relogio.agora += 1
+    cache.gravar('c', 3)
+
+    assert cache.obter('b') is None
+    assert cache.obter('a') == 1 and cache.obter('c') == 3
+    assert cache.estatisticas()['removidos'] == 1
+
+
+def test_cache_persiste_no_arquivo(tmp_path, relogio):
+    criar(tmp_path).gravar('a', {'itens': []})
+    assert criar(tmp_path).obter('a') == {'itens': []}
@@ -0,0 +1,48 @@
+import pytest
+
+import consultas
+import exemplo3_agente
+
+TABELA = [
+    {'posicao': 1, 'time': 'Palmeiras', 'pontos': 60, 'jogos': 28},
+    {'posicao': 2, 'time': 'Flamengo', 'pontos': 57, 'jogos': 28},
+    {'posicao': 3, 'time': 'Vasco', 'pontos': 40, 'jogos': 28},
+]
+
+
+@pytest.mark.parametrize('pergunta, resposta', [
+    ('Em que posição está o Flamengo?', 'Flamengo está em 2º com 57 pontos em 28 jogos.'),
+    ('Quantos pontos tem o Vasco?', 'Vasco está em 3º com 40 pontos em 28 jogos.'),
+    ('Onde está o Palmeiras?', 'Palmeiras está em 1º com 60 pontos em 28 jogos.'),
+])
+def test_posicao_de_um_time_citado_sai_da_tabela(pergunta, resposta):
+    assert consultas.responder_pela_tabela(pergunta, TABELA) == resposta
+
+
+@pytest.mark.parametrize('pergunta', [
+    'Quem é o artilheiro do Flamengo?',
+    'Quando é o próximo jogo do Palmeiras?',
+    'Qual o placar de Flamengo x Vasco?',
+])
+def test_pergunta_sobre_time_que_a_tabela_nao_responde_vai_para_o_agente(pergunta, monkeypatch):
+    agente = []
+
+    def executar_agente(pergunta, **kwargs):
+        agente.append(pergunta)
+        return {'input': pergunta, 'output': 'resposta do agente'}
+
+    monkeypatch.setattr(exemplo3_agente, 'executar_agente', executar_agente)
+
+    assert consultas.responder_pela_tabela(pergunta, TABELA) is None
+    resultado = consultas.responder(pergunta, tabela=TABELA)
+    assert resultado['origem'] == 'agente' and resultado['output'] == 'resposta do agente'
+    assert agente == [pergunta]
+
+
+def test_responder_pela_tabela_nao_chama_o_agente(monkeypatch):
+    monkeypatch.setattr(exemplo3_agente, 'executar_agente', lambda *a, **k: pytest.fail('agente chamado'))
+
+    resultado = consultas.responder('Quem é o líder?', tabela=TABELA)
+
+    assert resultado['origem'] == 'tabela' and resultado['fonte'] == 'informada'
+    assert resultado['output'] == 'O líder é Palmeiras (1º, 60 pontos).'
@@ -0,0 +1,63 @@
+import diferencas
+from http_fetch import ArmazemRespostas
+from pipeline import Etapa, Pipeline, Trecho, etapa_memorizar, etapa_reaproveitar
+
+URL = 'https://exemplo/classificacao'
+
+
+class ClienteFalso:
+    def __init__(self):
+        self.armazem = ArmazemRespostas(':memory:')
+
+
+def pipeline(cliente, texto, extraidos):
+    def fatiar(url):
+        return [Trecho(url, (0,), texto=texto)]
+
+    def extrair(trecho):
+        # LLM falso: uma linha 'time | pontos' por registro
+        if trecho.registros is None:
+            extraidos.append(trecho.texto)
+            trecho.registros = [{'time': time_, 'pontos': int(pontos)}
+                                for time_, pontos in (linha.split(' | ') for linha in trecho.texto.splitlines())]
+            trecho.origem = 'llm'
+        return [trecho]
+
+    return Pipeline([Etapa('fatiar', fatiar), etapa_reaproveitar('classificacao', cliente),
+                     Etapa('extrair', extrair), etapa_memorizar('classificacao', cliente)])
+
+
+def executar(cliente, texto, extraidos):
+    trechos = list(pipeline(cliente, texto, extraidos).executar([URL]))
+    return trechos, [registro for trecho in trechos for registro in trecho.registros]
+
+
+def test_pagina_igual_nao_volta_a_extracao_e_linha_alterada_aparece_na_diferenca():
+    cliente, extraidos = ClienteFalso(), []
+    campos = ['pontos']
+    chave = lambda registro: registro['time']
+
+    _, dados = executar(cliente, 'Flamengo | 70\nPalmeiras | 68', extraidos)
+    assert diferencas.registrar_instantaneo(cliente.armazem, 'classificacao', [URL], dados, chave, campos) == []
+
+    # Mesmo texto, só com espaços e maiúsculas diferentes: registros da execução anterior
+    trechos, dados = executar(cliente, 'FLAMENGO  |  70\nPalmeiras | 68 ', extraidos)
+    assert len(extraidos) == 1 and [t.origem for t in trechos] == ['impressao']
+    assert diferencas.registrar_instantaneo(cliente.armazem, 'classificacao', [URL], dados, chave, campos) == []
+
+    trechos, dados = executar(cliente, 'Flamengo | 73\nPalmeiras | 68', extraidos)
+    assert len(extraidos) == 2 and [t.origem for t in trechos] == ['llm']
+    mudancas = diferencas.registrar_instantaneo(cliente.armazem, 'classificacao', [URL], dados, chave, campos)
+    assert mudancas == [{'chave': 'Flamengo', 'mudanca': 'alterado',
+                         'campos': {'pontos': {'antes': 70, 'depois': 73, 'delta': 3}}}]
+    assert diferencas.descrever(mudancas[0]) == 'Flamengo: pontos 70 → 73 (+3)'
+    assert diferencas.ultimas_diferencas(cliente.armazem, 'classificacao', [URL]) == mudancas
+
+
+def test_comparar_aponta_registros_novos_e_removidos():
+    anteriores = [{'time': 'Flamengo', 'pontos': 70}, {'time': 'Sport', 'pontos': 20}]
+    atuais = [{'time': 'Flamengo', 'pontos': 70}, {'time': 'Mirassol', 'pontos': 40}]
+
+    mudancas = diferencas.comparar(anteriores, atuais, lambda registro: registro['time'], ['pontos'])
+
+    assert [(m['chave'], m['mudanca']) for m in mudancas] == [('Mirassol', 'novo'), ('Sport', 'removido')]
@@ -0,0 +1,117 @@
+import re
+import threading
+import time
+
+import pytest
+
+import extracao_concorrente
+import extracao_lote
+import instrumentacao
+from extracao_concorrente import LimitadorTaxa, chamar_com_limite
+from extracao_lote import ExtratorLote
+from resiliencia import Execucao, PrazoEsgotado, usar_execucao
+
+SCHEMA = {'properties': {'nome': {'type': 'string'}}}
+
+
+class Erro429(Exception):
+    status_code = 429
+
+
+class Erro400(Exception):
+    status_code = 400
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    # Backoff imediato: o teste verifica as repetições, não o tempo de espera
+    monkeypatch.setattr(extracao_concorrente, 'espera_backoff', lambda *args, **kwargs: 0)
+    instrumentacao.zerar()
+
+
+def llm_falso(falhas_429):
+    """chamar_estruturado falso: as primeiras `falhas_429` chamadas recebem 429; depois ecoa cada trecho"""
+    chamadas = []
+    lock = threading.Lock()
+
+    def chamar(modelo, esquema, mensagens):
+        with lock:
+            chamadas.append(mensagens)
+            if len(chamadas) <= falhas_429:
+                raise Erro429('rate limit')
+        trechos = re.findall(r'<trecho id="(\d+)">\n(.*?)\n</trecho>', mensagens[-1]['content'], re.S)
+        # Resposta fora de ordem: quem reordena é o extrator
+        return {'itens': [{'id': id_, 'registros': [{'nome': texto}]} for id_, texto in reversed(trechos)]}
+
+    return chamar, chamadas
+
+
+def test_chamar_com_limite_repete_429_e_para_em_erro_permanente():
+    tentativas = []
+
+    def funcao(texto):
+        tentativas.append(texto)
+        if len(tentativas) < 3:
+            raise Erro429()
+        return texto.upper()
+
+    assert chamar_com_limite(funcao, 'abc', LimitadorTaxa(rpm=1000, tpm=10**6)) == 'ABC'
+    assert len(tentativas) == 3
+    assert instrumentacao.resumo()['contadores']['llm_limite_429'] == 2
+
+    permanentes = []
+
+    def invalida(texto):
+        permanentes.append(texto)
+        raise Erro400()
+
+    with pytest.raises(Erro400):
+        chamar_com_limite(invalida, 'abc', LimitadorTaxa(rpm=1000, tpm=10**6))
+    assert len(permanentes) == 1
+
+
+def test_extrator_lote_mantem_ordem_com_429(monkeypatch):
+    chamar, chamadas = llm_falso(falhas_429=2)
+    monkeypatch.setattr(extracao_lote, 'chamar_estruturado', chamar)
+    extrator = ExtratorLote('modelo-teste-ordem', SCHEMA, 'Extraia os nomes.', max_itens=2,
+                            limitador=LimitadorTaxa(rpm=1000, tpm=10**6))
+
+    textos = [f'texto {i}' for i in range(5)]
+    resultados = extrator.extrair(textos)
+
+    assert resultados == [[{'nome': texto}] for texto in textos]
+    # 3 lotes (2 + 2 + 1) e as 2 tentativas recusadas com 429
+    assert len(chamadas) == 5
+    assert instrumentacao.resumo()['contadores']['llm_lotes'] == 3
+
+
+def test_limitador_segura_requisicoes_acima_do_rpm():
+    limitador = LimitadorTaxa(rpm=600, tpm=10**6)  # 10 por segundo, balde de 600
+    limitador._requisicoes = 1.0
+    limitador.aguardar()
+    inicio = time.monotonic()
+    limitador.aguardar()
+    # Sem saldo, a segunda requisição espera ~1/10 s até o balde repor uma
+    assert time.monotonic() - inicio >= 0.08
+
+
+def test_limitador_respeita_tpm():
+    limitador = LimitadorTaxa(rpm=1000, tpm=600)  # 10 tokens por segundo
+    limitador.aguardar(tokens=600)
+    with pytest.raises(PrazoEsgotado):
+        # 300 tokens levariam ~30 s: com 0,2 s de prazo, falha na hora em vez de dormir
+        limitador.aguardar(tokens=300, fim=time.monotonic() + 0.2)
+
+
+def test_espera_do_429_nao_passa_do_prazo(monkeypatch):
+    monkeypatch.setattr(extracao_concorrente, 'espera_backoff', lambda *args, **kwargs: 60)
+    chamadas = []
+
+    def funcao(texto):
+        chamadas.append(texto)
+        raise Erro429()
+
+    with usar_execucao(Execucao(5, 'teste')):
+        with pytest.raises(PrazoEsgotado):
+            chamar_com_limite(funcao, 'abc', LimitadorTaxa(rpm=1000, tpm=10**6))
+    assert len(chamadas) == 1
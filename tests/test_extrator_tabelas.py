@@ -0,0 +1,83 @@
+from exemplo1_brasileirao import TIMES_CLASSIFICACAO, extrator_artilharia, extrator_classificacao
+from extrator_tabelas import separar_varios
+from indice_dom import IndiceDom, descobrir_secoes
+
+CLASSIFICACAO = """
+<table>
+  <tr><th>#</th><th>Equipe</th><th>Pts</th><th>PJ</th><th>V</th><th>E</th><th>D</th><th>Gols Pró</th><th>GC</th><th>Saldo de gols</th></tr>
+  <tr><td>1º</td><td>Flamengo</td><td>70</td><td>30</td><td>21</td><td>7</td><td>2</td><td>60</td><td>18</td><td>42</td></tr>
+  <tr><td>2º</td><td>Palmeiras</td><td>68</td><td>30</td><td>21</td><td>5</td><td>4</td><td>52</td><td>22</td><td>30</td></tr>
+  <tr><td>3º</td><td>Cruzeiro</td><td>—</td><td>30</td><td>17</td><td>8</td><td>5</td><td>45</td><td>24</td><td>21</td></tr>
+</table>
+"""
+
+ARTILHARIA = """
+<table>
+  <tr><th>Pos</th><th>Atleta</th><th>Clube</th><th>Gols</th></tr>
+  <tr><td>1</td><td>Pedro</td><td>Flamengo</td><td>15</td></tr>
+  <tr><td>2</td><td>Vegetti</td><td>Vasco</td><td>12</td></tr>
+</table>
+"""
+
+
+def test_sinonimos_do_cabecalho_mapeiam_as_colunas():
+    resultado, pendentes = extrator_classificacao.separar(CLASSIFICACAO)
+
+    assert resultado.linhas[0] == {'posicao': 1, 'time': 'Flamengo', 'pontos': 70, 'jogos': 30, 'vitorias': 21,
+                                   'empates': 7, 'derrotas': 2, 'gols_pro': 60, 'gols_contra': 18, 'saldo_gols': 42}
+    assert [linha['time'] for linha in resultado.linhas] == ['Flamengo', 'Palmeiras']
+    assert resultado.contagem == {'tabela': 2, 'llm': 0}
+    # Só a linha que não converteu vai para o LLM, com o cabeçalho para contexto
+    assert pendentes == ['# | Equipe | Pts | PJ | V | E | D | Gols Pró | GC | Saldo de gols\n'
+                         '3º | Cruzeiro | — | 30 | 17 | 8 | 5 | 45 | 24 | 21']
+
+
+def test_tabela_mapeada_em_parte_fica_inteira_para_o_llm():
+    html = ('<table><tr><th>Clube</th><th>Pts</th><th>Aproveitamento</th></tr>'
+            '<tr><td>Flamengo</td><td>70</td><td>77%</td></tr></table>')
+
+    resultado, pendentes = extrator_classificacao.separar(html)
+
+    assert resultado.linhas == []
+    assert pendentes == ['Clube | Pts | Aproveitamento\nFlamengo | 70 | 77%']
+    _, tabelas = extrator_classificacao.separar(html, como_tabelas=True)
+    assert [tabela.cabecalho for tabela in tabelas] == [['Clube', 'Pts', 'Aproveitamento']]
+
+
+def test_pagina_com_varias_tabelas_cada_uma_vai_para_o_seu_extrator():
+    html = f'<html><body>{CLASSIFICACAO}{ARTILHARIA}</body></html>'
+
+    separados = separar_varios(html, {'classificacao': extrator_classificacao, 'artilharia': extrator_artilharia})
+
+    classificacao, pendentes_classificacao = separados['classificacao']
+    artilharia, pendentes_artilharia = separados['artilharia']
+    assert [linha['time'] for linha in classificacao.linhas] == ['Flamengo', 'Palmeiras']
+    assert artilharia.linhas == [{'posicao': 1, 'jogador': 'Pedro', 'time': 'Flamengo', 'gols': 15},
+                                 {'posicao': 2, 'jogador': 'Vegetti', 'time': 'Vasco', 'gols': 12}]
+    # A tabela da artilharia não vira pendente da classificação (nem o contrário)
+    assert len(pendentes_classificacao) == 1 and 'Cruzeiro' in pendentes_classificacao[0]
+    assert pendentes_artilharia == []
+
+
+def test_indice_dom_mede_textos_e_acha_palavras_e_nomes():
+    html = ('<html><body><div><h2>Tabela</h2><p>Flamengo lidera, <b>Palmeiras</b> vem atrás</p>'
+            '<script>var Santos = 1;</script></div></body></html>')
+    indice = IndiceDom(html, nomes=['Flamengo', 'Palmeiras', 'Santos'])
+
+    div = indice.tags.index('div')
+    assert indice.texto(div) == 'Tabela Flamengo lidera, Palmeiras vem atrás'
+    assert all(indice.comprimento(i) == len(indice.texto(i)) for i in range(len(indice)))
+    assert [indice.tags[i] for i in indice.com_palavra()] == ['h2']
+    assert [indice.tags[i] for i in indice.com_nome('Palmeiras')] == ['b']
+    assert indice.com_nome('Santos') == []  # script não é texto da página
+
+
+def test_descobrir_secoes_descarta_a_artilharia():
+    linhas = ''.join(f'<li>{time_} 10 pontos</li>' for time_ in TIMES_CLASSIFICACAO)
+    html = (f'<html><body><section><div>Classificação</div><ul>{linhas}</ul></section>'
+            f'<section><div>Tabela da artilharia</div><ul>{linhas}</ul></section></body></html>')
+
+    secoes = descobrir_secoes(IndiceDom(html, nomes=TIMES_CLASSIFICACAO))
+
+    assert len(secoes) == 1
+    assert secoes[0].startswith('Classificação Flamengo 10 pontos')
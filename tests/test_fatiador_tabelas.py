@@ -0,0 +1,61 @@
+import pytest
+
+import exemplo1_brasileirao
+import exemplo2_acoes
+import fatiador_tabelas
+from pipeline import Pagina
+
+
+class EncoderAproximado:
+    def encode(self, texto):
+        return [0] * (len(texto) // 4 + 1)
+
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch):
+    # Sem rede o tiktoken não baixa o vocabulário: ~4 caracteres por token basta aqui
+    monkeypatch.setattr(fatiador_tabelas, 'obter_encoder_modelo', lambda modelo=None: EncoderAproximado())
+    return EncoderAproximado()
+
+
+def tabela_acoes(cabecalho, quantidade):
+    linhas = ''.join(f'<tr><td>PAPEL{i:03d}</td><td>{i},00 BRL</td><td>+1,0%</td><td>1,5 M</td></tr>'
+                     for i in range(quantidade))
+    return (f'<table><tr><th>{cabecalho}</th><th>Preço</th><th>Variação %</th><th>Volume</th></tr>'
+            f'{linhas}</table>')
+
+
+def test_tabela_pendente_grande_vai_ao_llm_em_blocos_no_orcamento(encoder):
+    # Cabeçalho sem sinônimo: a tabela inteira fica pendente
+    html = f'<html><body>{tabela_acoes("Papel", 200)}</body></html>'
+    extrator = exemplo2_acoes.criar_extrator(exemplo2_acoes.schema)
+
+    trechos = exemplo2_acoes.trechos_da_pagina(extrator, Pagina('https://exemplo/acoes', html), (0,), max_tokens=300)
+
+    assert len(trechos) > 1 and all(t.registros is None for t in trechos)
+    assert all(t.tokens <= 300 and len(encoder.encode(t.texto)) <= t.tokens for t in trechos)
+    assert all(t.texto.startswith('Papel | Preço | Variação % | Volume\n') for t in trechos)
+    linhas = [linha for t in trechos for linha in t.texto.split('\n')[1:]]
+    assert linhas == [f'PAPEL{i:03d} | {i},00 BRL | +1,0% | 1,5 M' for i in range(200)]
+
+
+def test_fatiar_pagina_combinada_manda_as_pendentes_em_blocos_no_orcamento(encoder):
+    # Classificação sem colunas suficientes (pendente) + artilharia mapeada direto
+    linhas = ''.join(f'<tr><td>Time {i:03d}</td><td>{i}</td><td>{i % 100}%</td></tr>' for i in range(150))
+    html = ('<html><body><table><tr><th>Clube</th><th>Pts</th><th>Aproveitamento</th></tr>'
+            f'{linhas}</table>'
+            '<table><tr><th>Pos</th><th>Atleta</th><th>Clube</th><th>Gols</th></tr>'
+            '<tr><td>1</td><td>Pedro</td><td>Flamengo</td><td>15</td></tr></table></body></html>')
+
+    trechos = list(exemplo1_brasileirao.fatiar_pagina(Pagina('https://exemplo/tabela', html), max_tokens=200))
+
+    diretos = {t.tipo: t.registros for t in trechos if t.origem == 'tabela'}
+    assert diretos == {'classificacao': [], 'artilharia': [{'posicao': 1, 'jogador': 'Pedro', 'time': 'Flamengo', 'gols': 15}]}
+    blocos = [t for t in trechos if t.registros is None]
+    assert len(blocos) > 1 and all(t.tipo is None and t.origem != 'secao' for t in blocos)
+    assert all(t.tokens <= 200 and len(encoder.encode(t.texto)) <= t.tokens for t in blocos)
+    assert all(t.texto.startswith('Clube | Pts | Aproveitamento\n') for t in blocos)
+    # Linhas inteiras, cada uma uma vez, na ordem da página
+    assert [linha for t in blocos for linha in t.texto.split('\n')[1:]] == [
+        f'Time {i:03d} | {i} | {i % 100}%' for i in range(150)]
+    assert [t.ordem for t in blocos] == [(0, i) for i in range(1, len(blocos) + 1)]
@@ -0,0 +1,22 @@
+from ferramentas_agente import compactar_texto
+
+
+def test_classe_de_layout_no_main_nao_descarta_o_conteudo():
+    html = '<html><body><main class="social-layout"><p>Flamengo 70 pontos</p></main></body></html>'
+    assert compactar_texto(html) == 'Flamengo 70 pontos'
+
+
+def test_wrappers_com_classe_de_boilerplate_mantem_o_conteudo():
+    html = ('<html><body class="has-cookie-banner"><div class="page menu-open"><div class="conteudo">'
+            '<h1>Classificação</h1><p>Flamengo 70 pontos</p><p>Palmeiras 68 pontos</p></div>'
+            '<div class="cookie-banner">Aceite os cookies</div></div></body></html>')
+    texto = compactar_texto(html)
+    assert 'Flamengo 70 pontos' in texto and 'Palmeiras 68 pontos' in texto
+    assert 'cookies' not in texto
+
+
+def test_menus_e_rodapes_sao_descartados():
+    html = ('<html><body><nav>Início Times</nav><div id="menu">Login Cadastro</div>'
+            '<p>O Flamengo venceu o Palmeiras por 2 a 1 e abriu vantagem na liderança do campeonato.</p>'
+            '<footer>© Globo</footer></body></html>')
+    assert compactar_texto(html) == 'O Flamengo venceu o Palmeiras por 2 a 1 e abriu vantagem na liderança do campeonato.'
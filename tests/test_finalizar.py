@@ -0,0 +1,33 @@
+import exemplo2_acoes
+from pipeline import Trecho
+from resiliencia import nova_execucao, degradar
+
+
+def _trechos():
+    return [Trecho('https://exemplo/acoes', (0,), registros=[{'simbolo_empresa': 'PETR4', 'preco': 38.5}])]
+
+
+def _registros(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(exemplo2_acoes, 'gravar_extraidos', lambda *a, **k: None)
+    monkeypatch.setattr(exemplo2_acoes, 'obter_cliente', lambda: type('Cliente', (), {'armazem': None})())
+    monkeypatch.setattr(exemplo2_acoes, 'registrar_instantaneo', lambda *a, **k: chamadas.append('instantaneo') or [])
+    monkeypatch.setattr(exemplo2_acoes, 'registrar_historico', lambda *a, **k: chamadas.append('historico'))
+    monkeypatch.setattr(exemplo2_acoes, 'gravar_ultimo_valido', lambda *a, **k: chamadas.append('ultimo_valido'))
+    return chamadas
+
+
+def test_execucao_degradada_nao_entra_no_instantaneo_nem_no_historico(monkeypatch):
+    chamadas = _registros(monkeypatch)
+    with nova_execucao(nome='teste'):
+        degradar('buscar', 'prazo', 'lista cortada')
+        resultado = exemplo2_acoes.finalizar(_trechos(), urls=['https://exemplo/acoes'])
+    assert resultado == [{'simbolo_empresa': 'PETR4', 'preco': 38.5}]
+    assert 'instantaneo' not in chamadas and 'historico' not in chamadas
+
+
+def test_execucao_completa_registra_instantaneo_e_historico(monkeypatch):
+    chamadas = _registros(monkeypatch)
+    with nova_execucao(nome='teste'):
+        exemplo2_acoes.finalizar(_trechos(), urls=['https://exemplo/acoes'])
+    assert chamadas == ['instantaneo', 'historico', 'ultimo_valido']
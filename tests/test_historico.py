@@ -0,0 +1,54 @@
+from datetime import date, datetime, timezone
+
+import pyarrow.dataset as ds
+
+import historico
+
+URLS = ['https://ge.globo.com/futebol/brasileirao-serie-a/']
+
+
+def classificacao(pontos_flamengo, jogos):
+    return [{'posicao': 1, 'time': 'Flamengo', 'pontos': pontos_flamengo, 'jogos': jogos},
+            {'posicao': 2, 'time': 'Palmeiras', 'pontos': '68', 'jogos': jogos}]
+
+
+def test_historico_grava_particoes_por_dia_e_le_so_o_periodo_pedido(tmp_path):
+    dia1 = datetime(2025, 10, 1, 12, 0, tzinfo=timezone.utc)
+    dia2 = datetime(2025, 10, 8, 12, 0, tzinfo=timezone.utc)
+    caminhos = [historico.registrar('classificacao', classificacao(70, 30), URLS, coleta_em=dia1, diretorio=tmp_path),
+                historico.registrar('classificacao', classificacao(73, 31), URLS, coleta_em=dia2, diretorio=tmp_path)]
+
+    assert sorted(p.name for p in (tmp_path / 'classificacao').iterdir()) == ['data=2025-10-01', 'data=2025-10-08']
+    assert all(caminho and caminho.endswith('.parquet') for caminho in caminhos)
+
+    tabela = historico.consultar('classificacao', colunas=['time', 'pontos', 'coleta_em', 'data'],
+                                 desde=date(2025, 10, 5), diretorio=tmp_path)
+    assert tabela.num_rows == 2
+    assert set(tabela['data'].to_pylist()) == {'2025-10-08'}
+    assert tabela['pontos'].type == 'int32'  # '68' (texto) convertido na gravação
+    assert sorted(tabela['pontos'].to_pylist()) == [68, 73]
+
+    flamengo = historico.consultar('classificacao', colunas=['pontos'], filtro=ds.field('time') == 'Flamengo',
+                                   diretorio=tmp_path)
+    assert flamengo['pontos'].to_pylist() == [70, 73]
+    assert [(linha['jogos'], linha['pontos']) for linha in historico.serie_time('Flamengo', diretorio=tmp_path)] == [
+        (30, 70), (31, 73)]
+    assert historico.valores_distintos('classificacao', 'time', diretorio=tmp_path) == ['Flamengo', 'Palmeiras']
+
+
+def test_historico_de_acoes_guarda_numeros_tipados(tmp_path):
+    coleta_em = datetime(2025, 10, 1, 18, 0, tzinfo=timezone.utc)
+    historico.registrar('acoes', [{'simbolo_empresa': 'PETR4', 'preco': '38,50 BRL', 'volume': '1,5 M'},
+                                  {'simbolo_empresa': 'VALE3', 'preco': '—', 'volume': None}],
+                        URLS, coleta_em=coleta_em, diretorio=tmp_path)
+
+    assert historico.serie_acao('PETR4', diretorio=tmp_path) == [
+        {'coleta_em': coleta_em, 'preco': 38.5, 'variacao': None, 'volume': 1.5e6, 'dia': date(2025, 10, 1)}]
+    vale = historico.consultar('acoes', colunas=['preco'], filtro=ds.field('simbolo_empresa') == 'VALE3',
+                               diretorio=tmp_path)
+    assert vale['preco'].to_pylist() == [None]
+
+
+def test_sem_historico_consultar_devolve_none(tmp_path):
+    assert historico.consultar('classificacao', diretorio=tmp_path) is None
+    assert historico.serie_time('Flamengo', diretorio=tmp_path) == []
@@ -0,0 +1,97 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import exemplo2_acoes
+import extracao_lote
+import fatiador_tabelas
+import http_fetch
+import instrumentacao
+from http_fetch import ArmazemRespostas, ClienteHttp
+
+ETAG = '"v1"'
+# Cabeçalhos sem sinônimo no extrator: a tabela vai em blocos para o LLM
+PAGINA = ('<html><body><table><tr><th>Papel</th><th>Cotação do dia</th></tr>'
+          + ''.join(f'<tr><td>{simbolo}</td><td>{preco}</td></tr>'
+                    for simbolo, preco in [('PETR4', '38,50'), ('VALE3', '60,10'), ('ITUB4', '33,20')])
+          + '</table></body></html>').encode('utf-8')
+
+
+class EncoderAproximado:
+    """~4 caracteres por token (sem rede, o tiktoken não baixa o encoding)"""
+
+    def encode(self, texto):
+        return [0] * (len(texto) // 4 + 1)
+
+
+@pytest.fixture
+def servidor():
+    """Servidor local com ETag: responde 304 quando o If-None-Match confere"""
+    pedidos = []
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            pedidos.append(dict(self.headers))
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.send_header('ETag', ETAG)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGINA)))
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            self.wfile.write(PAGINA)
+
+        def log_message(self, *args):
+            pass
+
+    http = ThreadingHTTPServer(('127.0.0.1', 0), Manipulador)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{http.server_port}/acoes', pedidos
+    http.shutdown()
+    http.server_close()
+
+
+def test_segunda_busca_revalida_com_etag_e_nao_chama_o_llm(servidor, monkeypatch):
+    url, pedidos = servidor
+    cliente = ClienteHttp(armazem=ArmazemRespostas(':memory:'))
+    monkeypatch.setattr(http_fetch, '_cliente', cliente)
+    monkeypatch.setattr(fatiador_tabelas, 'obter_encoder_modelo', lambda modelo=None: EncoderAproximado())
+    monkeypatch.setattr(exemplo2_acoes, 'registrar_historico', lambda *a, **k: None)
+    monkeypatch.setattr(exemplo2_acoes, 'gravar_ultimo_valido', lambda *a, **k: None)
+
+    chamadas = []
+
+    def chamar_estruturado(modelo, esquema, mensagens):
+        chamadas.append(mensagens)
+        trechos = re.findall(r'<trecho id="([^"]+)">\n(.*?)\n</trecho>', mensagens[-1]['content'], re.S)
+        return {'itens': [{'id': id_, 'registros': [{'simbolo_empresa': s} for s in re.findall(r'[A-Z]{4}\d', texto)]}
+                          for id_, texto in trechos]}
+
+    monkeypatch.setattr(extracao_lote, 'chamar_estruturado', chamar_estruturado)
+
+    instrumentacao.zerar()
+
+    def executar():
+        trechos = list(exemplo2_acoes.montar_pipeline([url], exemplo2_acoes.schema, cliente=cliente).executar([url]))
+        return trechos, exemplo2_acoes.finalizar(trechos, urls=[url])
+
+    try:
+        _, primeira = executar()
+        assert chamadas, 'a primeira busca deveria passar pelo LLM'
+        chamadas.clear()
+
+        trechos, segunda = executar()
+    finally:
+        cliente.fechar()
+
+    assert 'If-None-Match' not in pedidos[0]
+    assert pedidos[1].get('If-None-Match') == ETAG
+    assert instrumentacao.resumo()['contadores'].get('http_304') == 1
+    assert [t.origem for t in trechos] == ['armazem']
+    assert chamadas == []
+    assert [r['simbolo_empresa'] for r in segunda] == [r['simbolo_empresa'] for r in primeira] == ['PETR4', 'VALE3', 'ITUB4']
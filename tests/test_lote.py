@@ -0,0 +1,82 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import registro
+from lote import Job, executar_lote, linhas_do_resultado, main
+
+# O scraper falso chega aos processos do pool pelo fork (com spawn, eles importariam o verdadeiro)
+fork = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='precisa de processos por fork')
+
+
+def test_brasileirao_vira_uma_linha_por_registro_de_cada_secao():
+    job = Job(0, 'brasileirao', ['https://ge.globo.com/futebol/brasileirao-serie-a/'], 'serie-a')
+    dados = {
+        'classificacao': [{'posicao': 1, 'time': 'Flamengo'}, {'posicao': 2, 'time': 'Cruzeiro'}],
+        'artilharia': [{'posicao': 1, 'jogador': 'Arrascaeta', 'gols': 11}],
+    }
+
+    linhas = list(linhas_do_resultado(job, dados))
+
+    assert [linha['secao'] for linha in linhas] == ['classificacao', 'classificacao', 'artilharia']
+    assert linhas[0] == {'job': 'serie-a', 'tipo': 'brasileirao', 'url': job.urls[0],
+                         'secao': 'classificacao', 'posicao': 1, 'time': 'Flamengo'}
+    assert linhas[2]['jogador'] == 'Arrascaeta'
+
+
+def test_lista_e_registro_unico_nao_ganham_secao():
+    job = Job(1, 'acoes', ['https://exemplo/acoes'])
+    assert [linha['simbolo'] for linha in linhas_do_resultado(job, [{'simbolo': 'PETR4'}, {'simbolo': 'VALE3'}])] == ['PETR4', 'VALE3']
+    assert list(linhas_do_resultado(job, {'resposta': 'Flamengo'})) == [
+        {'job': 'acoes-1', 'tipo': 'acoes', 'url': 'https://exemplo/acoes', 'resposta': 'Flamengo'}]
+    assert list(linhas_do_resultado(job, None)) == []
+
+
+def _scraper_falso(tipo, urls=None, **kwargs):
+    """registro.executar falso (herdado pelos processos do pool via fork)"""
+    url = urls[0]
+    if url.endswith('/lenta'):
+        time.sleep(30)
+    if url.endswith('/quebra'):
+        os._exit(1)
+    if url.endswith('/erro'):
+        raise ValueError('página sem tabela')
+    return [{'simbolo': f'{url.rsplit("/", 1)[-1].upper()}{i}', 'pid': os.getpid()} for i in range(3)]
+
+
+@fork
+def test_executar_lote_reporta_ok_erro_timeout_e_processo_morto(monkeypatch):
+    monkeypatch.setattr(registro, 'executar', _scraper_falso)
+    jobs = [Job(i, 'acoes', [f'https://exemplo/{nome}']) for i, nome in enumerate(['a', 'erro', 'lenta', 'quebra', 'b'])]
+    terminados = {}
+
+    inicio = time.monotonic()
+    executar_lote(jobs, lambda job, status, dados, segundos: terminados.update({job.urls[0]: (status, dados)}),
+                  processos=2, timeout=1)
+
+    assert time.monotonic() - inicio < 10
+    assert {url.rsplit('/', 1)[-1]: status for url, (status, _) in terminados.items()} == {
+        'a': 'ok', 'erro': 'erro', 'lenta': 'timeout', 'quebra': 'erro', 'b': 'ok'}
+    assert 'ValueError' in terminados['https://exemplo/erro'][1]
+    assert [r['simbolo'] for r in terminados['https://exemplo/b'][1]] == ['B0', 'B1', 'B2']
+    # Os jobs rodam nos processos do pool, não no de quem chamou
+    assert terminados['https://exemplo/a'][1][0]['pid'] != os.getpid()
+
+
+@fork
+def test_main_grava_uma_linha_jsonl_por_registro(monkeypatch, tmp_path):
+    monkeypatch.setattr(registro, 'executar', _scraper_falso)
+    manifesto = tmp_path / 'manifesto.txt'
+    manifesto.write_text('# ações\nacoes https://exemplo/a lista-a\n'
+                         '{"tipo": "acoes", "url": "https://exemplo/b", "nome": "lista-b"}\n', encoding='utf-8')
+    saida = tmp_path / 'resultados.jsonl'
+
+    assert main([str(manifesto), '--saida', str(saida), '--processos', '2', '--timeout', '10']) == 0
+
+    linhas = [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+    assert sorted((linha['job'], linha['simbolo']) for linha in linhas) == [
+        ('lista-a', 'A0'), ('lista-a', 'A1'), ('lista-a', 'A2'), ('lista-b', 'B0'), ('lista-b', 'B1'), ('lista-b', 'B2')]
+    assert all(linha['tipo'] == 'acoes' and linha['url'].startswith('https://exemplo/') for linha in linhas)
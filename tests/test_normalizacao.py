@@ -0,0 +1,41 @@
+import math
+
+import pandas as pd
+
+from normalizacao import estatisticas_acoes, moedas, normalizar_acoes, numeros
+
+
+def test_numeros_com_sufixo_sinal_e_separadores():
+    valores = ['1,23 T BRL', '−2,5%', '12.3 M', '37,50 BRL', '1.234.567', '1,234.5', '+0,8%', '3 mil', 'R$ 1,2 bi']
+    assert numeros(valores).tolist() == [1.23e12, -2.5, 1.23e7, 37.5, 1234567.0, 1234.5, 0.8, 3000.0, 1.2e9]
+
+
+def test_numeros_sem_numero_viram_nan_e_numeros_passam_direto():
+    resultado = numeros(['R$', '—', '', None, 37.5, '1e12'])
+    assert [math.isnan(v) for v in resultado[:4]] == [True] * 4
+    assert resultado[4:].tolist() == [37.5, 1e12]
+    assert numeros(pd.Series([1, 2])).dtype == 'float64'
+
+
+def test_moedas():
+    resultado = moedas(['37,50 BRL', '1,2 B usd', 'R$', None, '−0,8%'])
+    assert resultado[:2].tolist() == ['BRL', 'USD']
+    assert resultado[2:].isna().all()
+
+
+def test_normalizar_acoes_tipa_as_colunas_sem_mexer_no_original():
+    df = pd.DataFrame([
+        {'simbolo_empresa': ' PETR4 ', 'preco': '38,50 BRL', 'variacao': '−1,2%', 'valor_mercado': '500 B BRL'},
+        {'simbolo_empresa': 'VALE3', 'preco': '60,10 BRL', 'variacao': '+0,5%', 'valor_mercado': None},
+    ])
+
+    normalizado = normalizar_acoes(df)
+
+    assert df['preco'].tolist() == ['38,50 BRL', '60,10 BRL']
+    assert normalizado['simbolo_empresa'].tolist() == ['PETR4', 'VALE3']
+    assert normalizado['moeda'].tolist() == ['BRL', 'BRL']
+    assert normalizado['preco'].tolist() == [38.5, 60.1]
+    assert normalizado['variacao'].tolist() == [-1.2, 0.5]
+    assert normalizado['valor_mercado'][0] == 5e11 and math.isnan(normalizado['valor_mercado'][1])
+    estatisticas = estatisticas_acoes(normalizado)
+    assert estatisticas.loc['preco', 'count'] == 2 and estatisticas.loc['valor_mercado', 'count'] == 1
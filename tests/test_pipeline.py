@@ -0,0 +1,107 @@
+import itertools
+import threading
+import time
+
+import instrumentacao
+from pipeline import Etapa, Pipeline, Trecho, consolidar
+from resiliencia import nova_execucao
+
+
+def _threads(nome):
+    return [t for t in threading.enumerate() if t.name.startswith(f'{nome}-')]
+
+def _esperar_threads(nome, limite=2.0):
+    fim = time.monotonic() + limite
+    while _threads(nome) and time.monotonic() < fim:
+        time.sleep(0.02)
+    return _threads(nome)
+
+
+def test_ordem_final_e_a_da_pagina_mesmo_com_etapa_paralela():
+    def extrair(i):
+        # Os primeiros demoram mais: saem do pipeline depois dos últimos
+        time.sleep((6 - i) * 0.01)
+        return [Trecho('https://exemplo/', (i,), registros=[{'time': f'T{i}'}])]
+
+    trechos = list(Pipeline([Etapa('extrair', extrair, trabalhadores=6)], nome='ordem').executar(range(6)))
+
+    assert [t.ordem for t in trechos] != sorted(t.ordem for t in trechos)
+    assert consolidar(trechos, chave=lambda r: r['time']) == [{'time': f'T{i}'} for i in range(6)]
+
+
+def test_erro_em_um_item_descarta_so_ele():
+    def extrair(i):
+        if i == 2:
+            raise ValueError('resposta inválida')
+        return [i]
+
+    with nova_execucao(nome='teste') as execucao:
+        saida = sorted(Pipeline([Etapa('extrair', extrair)], nome='erro').executar(range(5)))
+
+    assert saida == [0, 1, 3, 4]
+    assert [(d['etapa'], d['motivo']) for d in execucao.relatorio()['degradacoes']] == [('extrair', 'erro')]
+
+
+def test_cancelar_para_as_etapas_e_filas_limitadas_seguram_a_entrada():
+    lidos = []
+
+    def entradas():
+        for i in itertools.count():
+            lidos.append(i)
+            yield i
+
+    def lenta(i):
+        time.sleep(0.02)
+        return [i]
+
+    pipeline = Pipeline([Etapa('rapida', lambda i: [i], tamanho_fila=2),
+                         Etapa('lenta', lenta, tamanho_fila=2)], nome='cancelar')
+    saida = []
+    for item in pipeline.executar(entradas()):
+        saida.append(item)
+        if len(saida) == 3:
+            pipeline.cancelar()
+
+    assert pipeline.cancelado
+    assert saida[:3] == [0, 1, 2]
+    assert not _esperar_threads('cancelar')
+    # Entrada infinita: só foi lido o que cabe nas filas, e não tudo
+    assert len(lidos) < 20
+
+
+def test_prazo_entrega_o_que_ficou_pronto_e_aponta_a_etapa_atrasada():
+    def lenta(i):
+        time.sleep(0.1)
+        return [i]
+
+    pipeline = Pipeline([Etapa('fatiar', lambda i: [i]), Etapa('extrair', lenta)], nome='prazo')
+    inicio = time.monotonic()
+    with nova_execucao(0.35, nome='teste') as execucao:
+        saida = list(pipeline.executar(range(20)))
+    duracao = time.monotonic() - inicio
+
+    assert saida == list(range(len(saida))) and 0 < len(saida) < 20
+    assert duracao < 1.0
+    relatorio = execucao.relatorio()
+    assert relatorio['degradada']
+    assert ('extrair', 'prazo') in [(d['etapa'], d['motivo']) for d in relatorio['degradacoes']]
+    assert not _esperar_threads('prazo')
+
+
+def test_linhas_contadas_por_caminho():
+    def fatiar(url):
+        return [Trecho(url, (0,), registros=[{'time': 'A'}, {'time': 'B'}], origem='tabela'),
+                Trecho(url, (1,), texto='resto da página')]
+
+    def extrair(trecho):
+        if trecho.registros is None:
+            trecho.registros, trecho.origem = [{'time': 'C'}], 'llm'
+        return [trecho]
+
+    instrumentacao.zerar()
+    trechos = list(Pipeline([Etapa('fatiar', fatiar), Etapa('extrair', extrair)]).executar(['https://exemplo/']))
+
+    assert len(trechos) == 2
+    contadores = instrumentacao.resumo()['contadores']
+    assert contadores['caminho_tabela'] == 2
+    assert contadores['caminho_llm'] == 1
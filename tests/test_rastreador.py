@@ -0,0 +1,142 @@
+import asyncio
+import contextlib
+import re
+
+import pytest
+
+import exemplo2_acoes
+import extracao_lote
+import fatiador_tabelas
+import http_fetch
+from http_fetch import ArmazemRespostas, ClienteHttp
+from rastreador import Rastreador
+
+# Listas falsas: lotes de símbolos que aparecem a cada "carregar mais", e o link rel="next"
+SITE = {
+    'https://lista/a': {'lotes': [['AAAA3', 'BBBB4'], ['CCCC3']], 'proxima': '/a?page=2'},
+    # Cabeçalho sem sinônimo: a página 2 vai em blocos para o LLM
+    'https://lista/a?page=2': {'lotes': [['DDDD3']], 'cabecalho': 'Papel'},
+    # Só repete o que a lista A já trouxe
+    'https://lista/b': {'lotes': [['CCCC3', 'AAAA3']]},
+}
+PRECOS = {'AAAA3': '10,00 BRL', 'BBBB4': '20,00 BRL', 'CCCC3': '30,00 BRL', 'DDDD3': '40,00 BRL'}
+
+
+def simbolos(html):
+    return set(re.findall(r'[A-Z]{4}\d', html))
+
+
+class BotaoFalso:
+    def __init__(self, pagina):
+        self.pagina = pagina
+
+    async def is_visible(self):
+        return True
+
+    async def click(self):
+        self.pagina.carregados += 1
+
+
+class PaginaFalsa:
+    """O que o rastreador usa de uma página do Playwright"""
+
+    def __init__(self, visitas):
+        self.visitas = visitas
+        self.url = None
+        self.carregados = 0
+
+    @property
+    def lista(self):
+        return SITE[self.url]
+
+    def _simbolos(self):
+        return [s for lote in self.lista['lotes'][:self.carregados] for s in lote]
+
+    async def goto(self, url, wait_until=None):
+        self.visitas.append(url)
+        self.url, self.carregados = url, 1
+
+    async def content(self):
+        linhas = ''.join(f'<tr><td>{s}</td><td>{PRECOS[s]}</td><td>+1,0%</td><td>1,5 M</td></tr>' for s in self._simbolos())
+        proxima = f'<a rel="next" href="{self.lista["proxima"]}">Próxima</a>' if self.lista.get('proxima') else ''
+        return (f'<html><body><table><tr><th>{self.lista.get("cabecalho", "Símbolo")}</th><th>Preço</th><th>Variação %</th><th>Volume</th></tr>'
+                f'{linhas}</table>{proxima}</body></html>')
+
+    async def evaluate(self, script, arg=None):
+        return len(self._simbolos()) + 1  # linhas <tr>, com a do cabeçalho (rolar até o fim não faz nada)
+
+    async def query_selector(self, seletor):
+        tem_mais = self.carregados < len(self.lista['lotes'])
+        return BotaoFalso(self) if tem_mais and 'Carregar mais' in seletor else None
+
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        if len(self._simbolos()) + 1 <= arg:
+            raise TimeoutError('nenhuma linha nova')
+
+
+class PoolFalso:
+    """O que o rastreador usa do pool de navegador"""
+
+    def __init__(self):
+        self.visitas = []
+
+    @contextlib.asynccontextmanager
+    async def pagina(self):
+        yield PaginaFalsa(self.visitas)
+
+    def rodar(self, corrotina):
+        return asyncio.run(corrotina)
+
+
+def test_rastreador_carrega_mais_segue_proxima_e_para_sem_chaves_novas():
+    pool = PoolFalso()
+    rastreador = Rastreador(simbolos, pool=pool, espera=0.01)
+
+    paginas_a = rastreador.rastrear('https://lista/a')
+    paginas_b = rastreador.rastrear('https://lista/b')
+
+    assert [url for url, _ in paginas_a] == ['https://lista/a', 'https://lista/a?page=2']
+    assert simbolos(paginas_a[0][1]) == {'AAAA3', 'BBBB4', 'CCCC3'}  # depois do "carregar mais"
+    # A lista B só repete símbolos já vistos: visitada, mas nada vai para a extração
+    assert paginas_b == []
+    assert pool.visitas == ['https://lista/a', 'https://lista/a?page=2', 'https://lista/b']
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    cliente = ClienteHttp(armazem=ArmazemRespostas(':memory:'))
+    monkeypatch.setattr(http_fetch, '_cliente', cliente)
+    monkeypatch.setattr(exemplo2_acoes, 'registrar_historico', lambda *a, **k: None)
+    monkeypatch.setattr(exemplo2_acoes, 'gravar_ultimo_valido', lambda *a, **k: None)
+    yield cliente
+    cliente.fechar()
+
+
+def test_mercado_une_as_listas_pela_tabela_e_pelo_llm(cliente, monkeypatch):
+    class EncoderAproximado:
+        def encode(self, texto):
+            return [0] * (len(texto) // 4 + 1)
+
+    monkeypatch.setattr(fatiador_tabelas, 'obter_encoder_modelo', lambda modelo=None: EncoderAproximado())
+    chamadas = []
+
+    def chamar_estruturado(modelo, esquema, mensagens):
+        chamadas.append(mensagens)
+        trechos = re.findall(r'<trecho id="([^"]+)">\n(.*?)\n</trecho>', mensagens[-1]['content'], re.S)
+        return {'itens': [{'id': id_, 'registros': [{'simbolo_empresa': s, 'preco': PRECOS[s]}
+                                                    for s in re.findall(r'[A-Z]{4}\d', texto)]}
+                          for id_, texto in trechos]}
+
+    monkeypatch.setattr(extracao_lote, 'chamar_estruturado', chamar_estruturado)
+    urls = ['https://lista/a', 'https://lista/b']
+    rastreador = Rastreador(simbolos, pool=PoolFalso(), espera=0.01)
+
+    trechos = list(exemplo2_acoes.montar_pipeline_mercado(urls, exemplo2_acoes.schema, rastreador=rastreador)
+                   .executar(urls))
+    resultado = exemplo2_acoes.finalizar_mercado(trechos, urls=urls)
+
+    # Cada símbolo uma vez, na ordem da primeira lista/página em que aparece
+    assert [r['simbolo_empresa'] for r in resultado] == ['AAAA3', 'BBBB4', 'CCCC3', 'DDDD3']
+    assert [r['preco'] for r in resultado] == [PRECOS[r['simbolo_empresa']] for r in resultado]
+    assert len(chamadas) == 1 and 'DDDD3' in chamadas[0][-1]['content']
+    assert {t.origem for t in trechos if t.registros} == {'tabela', 'llm'}
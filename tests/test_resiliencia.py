@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import instrumentacao
+import resiliencia
+from extracao_concorrente import LimitadorTaxa, chamar_com_limite
+from http_fetch import ArmazemRespostas, ClienteHttp
+from resiliencia import Disjuntor, Execucao, PrazoEsgotado, usar_execucao
+
+
+class Erro404(Exception):
+    status_code = 404
+
+
+def meio_aberto(nome='teste'):
+    """Disjuntor que acabou de abrir e já aceita a chamada de teste"""
+    disjuntor = Disjuntor(nome, falhas=1, aberto=0)
+    disjuntor.falha()
+    return disjuntor
+
+
+def limitador():
+    return LimitadorTaxa(rpm=1000, tpm=10**6)
+
+
+def test_teste_do_meio_aberto_com_erro_permanente_fecha_o_disjuntor():
+    disjuntor = meio_aberto()
+
+    def nao_encontrado(texto):
+        raise Erro404()
+
+    with pytest.raises(Erro404):
+        chamar_com_limite(nao_encontrado, 'abc', limitador(), disjuntor=disjuntor)
+
+    # A API respondeu: o modelo está de pé
+    assert disjuntor.estado == 'fechado'
+    assert [disjuntor.permitir() for _ in range(3)] == [True, True, True]
+
+
+def test_teste_do_meio_aberto_que_estoura_o_prazo_libera_o_proximo_teste():
+    disjuntor = meio_aberto()
+
+    def lenta(texto):
+        time.sleep(0.5)
+        return texto
+
+    with usar_execucao(Execucao(0.1, 'teste')):
+        with pytest.raises(PrazoEsgotado):
+            chamar_com_limite(lenta, 'abc', limitador(), disjuntor=disjuntor)
+
+    # Sem veredito: continua meio-aberto, mas a próxima chamada pode testar
+    assert disjuntor.estado == 'meio-aberto'
+    assert disjuntor.permitir() and not disjuntor.permitir()
+
+
+def test_busca_com_404_no_meio_aberto_fecha_o_disjuntor_do_host(monkeypatch):
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    monkeypatch.setattr(resiliencia, '_disjuntores', {'http:127.0.0.1': meio_aberto('http:127.0.0.1')})
+    cliente = ClienteHttp(armazem=ArmazemRespostas(':memory:'))
+    try:
+        resposta = cliente.buscar([f'http://127.0.0.1:{servidor.server_port}/sumiu'])[0]
+    finally:
+        cliente.fechar()
+        servidor.shutdown()
+        servidor.server_close()
+
+    assert resposta.status == 404 and not resposta.ok
+    assert resiliencia.estado_disjuntores()['http:127.0.0.1'] == 'fechado'
+
+
+@pytest.mark.parametrize('saldo, chamadas_esperadas', [(1, 1), (1000, 2)])
+def test_copia_do_hedge_respeita_o_limitador(saldo, chamadas_esperadas):
+    chamadas = []
+
+    def lenta(texto):
+        chamadas.append(texto)
+        time.sleep(0.2)
+        return texto
+
+    balde = LimitadorTaxa(rpm=saldo, tpm=10**6)
+    instrumentacao.zerar()
+    assert chamar_com_limite(lenta, 'abc', balde, hedge_apos=0.05) == 'abc'
+
+    # Com uma requisição só no balde, a cópia não sai
+    assert len(chamadas) == chamadas_esperadas
+    contadores = instrumentacao.resumo()['contadores']
+    assert contadores.get('llm_hedges_recusados', 0) == (1 if chamadas_esperadas == 1 else 0)
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import instrumentacao
+import ultimo_valido
+from resiliencia import nova_execucao, degradar
+
+
+def test_degradacao_so_da_artilharia_nao_impede_gravar_a_classificacao(tmp_path):
+    urls = ['https://ge.globo.com/futebol/brasileirao-serie-a/']
+    with nova_execucao(nome='teste') as execucao:
+        degradar('artilharia', 'incompleto', '0 artilheiros extraídos', secao='artilharia')
+        assert ultimo_valido.gravar('classificacao', urls, [{'time': 'Flamengo'}], diretorio=tmp_path)
+        assert not ultimo_valido.gravar('artilharia', urls, [{'jogador': 'Pedro'}], diretorio=tmp_path)
+    relatorio = execucao.relatorio()
+    assert not relatorio['degradada']
+    assert relatorio['degradacoes'][0]['secao'] == 'artilharia'
+    assert ultimo_valido.ler('classificacao', urls, diretorio=tmp_path).dados == [{'time': 'Flamengo'}]
+
+
+def test_degradacao_da_execucao_impede_gravar(tmp_path):
+    with nova_execucao(nome='teste') as execucao:
+        degradar('buscar', 'prazo')
+        assert not ultimo_valido.gravar('classificacao', ['u'], [{'time': 'Flamengo'}], diretorio=tmp_path)
+    assert execucao.relatorio()['degradada']
+
+
+def test_servir_entrega_o_velho_e_revalida_uma_vez_em_segundo_plano(tmp_path):
+    urls = ['https://ge.globo.com/futebol/brasileirao-serie-a/']
+    assert ultimo_valido.gravar('classificacao', urls, [{'time': 'Flamengo'}], diretorio=tmp_path)
+    liberar = threading.Event()
+    chamadas = []
+
+    def atualizar():
+        # Scraping falso: segura a revalidação até o teste liberar e grava o novo resultado
+        chamadas.append(threading.current_thread().name)
+        liberar.wait(5)
+        ultimo_valido.gravar('classificacao', urls, [{'time': 'Palmeiras'}], diretorio=tmp_path)
+
+    instrumentacao.zerar()
+    servidos = []
+    leitores = [threading.Thread(target=lambda: servidos.append(
+        ultimo_valido.servir('classificacao', urls, atualizar, max_idade=0, diretorio=tmp_path)))
+        for _ in range(8)]
+    for leitor in leitores:
+        leitor.start()
+    for leitor in leitores:
+        leitor.join()
+
+    # Todas as leituras velhas saem na hora, com uma única revalidação em andamento
+    assert [instantaneo.dados for instantaneo in servidos] == [[{'time': 'Flamengo'}]] * 8
+    assert ultimo_valido.revalidando('classificacao', urls)
+    assert instrumentacao.resumo()['contadores']['ultimo_valido_revalidacoes'] == 1
+
+    liberar.set()
+    limite = time.monotonic() + 5
+    while ultimo_valido.revalidando('classificacao', urls) and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    assert chamadas == ['revalidar-classificacao']
+    novo = ultimo_valido.servir('classificacao', urls, atualizar, diretorio=tmp_path)
+    assert novo.dados == [{'time': 'Palmeiras'}] and novo.idade < 60
+    assert len(chamadas) == 1  # recente: nada a revalidar
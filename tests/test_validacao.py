@@ -0,0 +1,29 @@
+import pytest
+
+from exemplo1_brasileirao import indice_times
+from validacao import IndiceNomes
+
+
+@pytest.mark.parametrize('nome, oficial', [
+    ('Sao Paulo', 'São Paulo'),
+    ('GREMIO', 'Grêmio'),
+    ('Galo', 'Atlético-MG'),
+    ('Atlético Mineiro', 'Atlético-MG'),
+    ('Red Bull Bragantino', 'Bragantino'),
+    ('Atletico', 'Atlético-MG'),  # parte do nome oficial
+    ('Flamengo RJ', 'Flamengo'),
+])
+def test_resolver_por_acentos_aliases_e_partes_do_nome(nome, oficial):
+    assert indice_times.resolver(nome) == oficial
+
+
+@pytest.mark.parametrize('nome', ['Atlético-GO', 'Botafogo-SP', 'Goiás'])
+def test_resolver_nao_troca_um_clube_por_outro(nome):
+    assert indice_times.resolver(nome) is None
+
+
+def test_resolver_nome_ambiguo_devolve_none():
+    indice = IndiceNomes(['Atlético-MG', 'Atlético-GO', 'Athletico-PR'])
+
+    assert indice.resolver('Atlético') is None
+    assert indice.resolver('Atlético-GO') == 'Atlético-GO'